@@ -1,18 +1,21 @@
 import uuid
 import os
 from datetime import datetime
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
+import io
+from flask import Blueprint, Response, render_template, request, redirect, url_for, flash, current_app
 from werkzeug.utils import secure_filename
 from app.models import PropertyRepository, BasePriceRepository # Assuming BasePriceRepository exists
 from app.services.ml_service import ml_service
+from app.services.property_io import build_property_fields, import_properties, export_properties
 
 admin_bp = Blueprint('admin', __name__)
 
 @admin_bp.route('/')
 def admin_panel():
     """Admin panel dashboard"""
-    properties = PropertyRepository.load_properties()
-    return render_template('admin/dashboard.html', properties=properties)
+    return render_template('admin/dashboard.html',
+                           stats=PropertyRepository.stats(),
+                           recent_properties=PropertyRepository.recent_properties(5))
 
 @admin_bp.route('/properties')
 def properties():
@@ -36,29 +39,7 @@ def add_property():
         # Create property data
         property_data = {
             'id': str(uuid.uuid4()),
-            'judul_properti': request.form.get('judul_properti'),
-            'kelurahan': request.form.get('kelurahan'),
-            'kecamatan': request.form.get('kecamatan'),
-            'alamat': request.form.get('alamat'),
-            'luas_tanah': int(request.form.get('luas_tanah') or 0),
-            'luas_bangunan': int(request.form.get('luas_bangunan') or 0),
-            'kamar_tidur': int(request.form.get('kamar_tidur') or 2),
-            'kamar_mandi': int(request.form.get('kamar_mandi') or 1),
-            'carport': int(request.form.get('carport', 0) or 0),
-            'tahun_dibangun': int(request.form.get('tahun_dibangun') or 2020),
-            'lantai': int(request.form.get('lantai', 1) or 1),
-            'kota': request.form.get('kota'),
-            'harga': float(request.form.get('harga') or 0) if request.form.get('harga') else None,
-            'latitude': float(request.form.get('latitude') or 0) if request.form.get('latitude') else None,
-            'longitude': float(request.form.get('longitude') or 0) if request.form.get('longitude') else None,
-            'jarak_sekolah': float(request.form.get('jarak_sekolah', 1000) or 1000),
-            'jarak_rs': float(request.form.get('jarak_rs', 2000) or 2000),
-            'jarak_pasar': float(request.form.get('jarak_pasar', 1500) or 1500),
-            'jenis_jalan': request.form.get('jenis_jalan'),
-            'kondisi': request.form.get('kondisi'),
-            'sertifikat': request.form.get('sertifikat'),
-            'nama_penjual': request.form.get('nama_penjual', ''),
-            'nomor_penjual': request.form.get('nomor_penjual', ''),
+            **build_property_fields(request.form),
             'image': image_filename,
             'created_at': datetime.now().isoformat(),
             'status': 'available'
@@ -67,8 +48,8 @@ def add_property():
         # Save property
         PropertyRepository.add_property(property_data)
 
-        # Retrain ML model with new data
-        ml_service.train_model()
+        # Retrain ML model with new data in the background
+        ml_service.request_retrain()
 
         flash('Property added successfully!')
 
@@ -77,6 +58,43 @@ def add_property():
 
     return redirect(url_for('admin.admin_panel'))
 
+@admin_bp.route('/import_properties', methods=['POST'])
+def import_properties_upload():
+    """Bulk import listings from an uploaded CSV or NDJSON file"""
+    file = request.files.get('file')
+    if not file or not file.filename:
+        flash('Please choose a CSV or NDJSON file to import')
+        return redirect(url_for('admin.properties'))
+
+    fmt = 'csv' if file.filename.lower().endswith('.csv') else 'ndjson'
+    skip_invalid = request.form.get('skip_invalid') == 'on'
+    try:
+        stream = io.TextIOWrapper(file.stream, encoding='utf-8-sig')
+        result = import_properties(stream, fmt, skip_invalid=skip_invalid)
+    except Exception as e:
+        flash(f'Error importing properties: {str(e)}')
+        return redirect(url_for('admin.properties'))
+
+    if result['errors']:
+        shown = '; '.join(result['errors'][:5])
+        more = f" (+{len(result['errors']) - 5} more)" if len(result['errors']) > 5 else ''
+        flash(f"{len(result['errors'])} invalid rows: {shown}{more}")
+    flash(f"Imported {result['imported']} properties")
+    return redirect(url_for('admin.properties'))
+
+@admin_bp.route('/export_properties')
+def export_properties_download():
+    """Stream all listings as CSV or NDJSON"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return {'success': False, 'error': 'format must be csv or ndjson'}, 400
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(
+        export_properties(fmt),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=properties.{fmt}'}
+    )
+
 @admin_bp.route('/edit_property/<property_id>')
 def edit_property(property_id):
     """Show edit property form"""
@@ -107,37 +125,15 @@ def update_property(property_id):
 
         # Create updated property data
         updated_data = {
-            'judul_properti': request.form.get('judul_properti'),
-            'kelurahan': request.form.get('kelurahan'),
-            'kecamatan': request.form.get('kecamatan'),
-            'alamat': request.form.get('alamat'),
-            'luas_tanah': int(request.form.get('luas_tanah') or 0),
-            'luas_bangunan': int(request.form.get('luas_bangunan') or 0),
-            'kamar_tidur': int(request.form.get('kamar_tidur') or 2),
-            'kamar_mandi': int(request.form.get('kamar_mandi') or 1),
-            'carport': int(request.form.get('carport', 0) or 0),
-            'tahun_dibangun': int(request.form.get('tahun_dibangun') or 2020),
-            'lantai': int(request.form.get('lantai', 1) or 1),
-            'kota': request.form.get('kota'),
-            'harga': float(request.form.get('harga') or 0) if request.form.get('harga') else None,
-            'latitude': float(request.form.get('latitude') or 0) if request.form.get('latitude') else None,
-            'longitude': float(request.form.get('longitude') or 0) if request.form.get('longitude') else None,
-            'jarak_sekolah': float(request.form.get('jarak_sekolah', 1000) or 1000),
-            'jarak_rs': float(request.form.get('jarak_rs', 2000) or 2000),
-            'jarak_pasar': float(request.form.get('jarak_pasar', 1500) or 1500),
-            'jenis_jalan': request.form.get('jenis_jalan'),
-            'kondisi': request.form.get('kondisi'),
-            'sertifikat': request.form.get('sertifikat'),
-            'nama_penjual': request.form.get('nama_penjual', ''),
-            'nomor_penjual': request.form.get('nomor_penjual', ''),
+            **build_property_fields(request.form),
             'image': image_filename,
             'status': request.form.get('status', 'available')
         }
 
         # Update property
         if PropertyRepository.update_property(property_id, updated_data):
-            # Retrain ML model with updated data
-            ml_service.train_model()
+            # Retrain ML model with updated data in the background
+            ml_service.request_retrain()
             flash('Property updated successfully!')
         else:
             flash('Failed to update property')
@@ -151,8 +147,8 @@ def update_property(property_id):
 def delete_property(property_id):
     """Delete property"""
     if PropertyRepository.delete_property(property_id):
-        # Retrain model
-        ml_service.train_model()
+        # Retrain model in the background
+        ml_service.request_retrain()
         flash('Property deleted successfully!')
     else:
         flash('Property not found')
@@ -203,8 +199,8 @@ def update_base_prices():
         }
 
         if BasePriceRepository.save_base_prices(updated_data):
-            # Retrain ML model with new base prices
-            ml_service.train_model()
+            # Retrain ML model with new base prices in the background
+            ml_service.request_retrain()
             return {'success': True, 'message': 'Base prices updated successfully!'}
         else:
             return {'success': False, 'error': 'Failed to update base prices'}
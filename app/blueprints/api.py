@@ -1,15 +1,82 @@
-from flask import Blueprint, jsonify, request
+import hashlib
+import json
+from flask import Blueprint, Response, jsonify, request
+from app.config import Config
 from app.models import PropertyRepository
-from app.services.ai_service import AIPropertySearch
+from app.services.ai_service import AIPropertySearch, gemini_calls, prompt_stats, recommendation_cache
 from app.services.ml_service import ml_service
+from app.utils.search_utils import search_criteria_cache_info
 
 api_bp = Blueprint('api', __name__)
 
+def _project_one(prop, fields):
+    """Keep only the requested fields of one property"""
+    if not fields:
+        return prop
+    return {k: prop[k] for k in fields if k in prop}
+
+def _project(properties, fields):
+    """Keep only the requested fields of each property"""
+    if not fields:
+        return properties
+    return [_project_one(p, fields) for p in properties]
+
 @api_bp.route('/properties')
 def get_properties():
-    """API endpoint for properties"""
-    properties = PropertyRepository.load_properties()
-    return jsonify(properties)
+    """API endpoint for properties
+    
+    Query parameters:
+    - limit / cursor: page through the catalog; the response becomes
+      {"properties": [...], "next_cursor": ...}
+    - fields: comma separated list of fields to return (e.g. id,harga,kelurahan)
+    - format=ndjson: stream every property as one JSON object per line
+    Without limit/cursor the full list is returned as before. Responses carry
+    an ETag derived from the data version so pollers get 304 Not Modified.
+    """
+    # Read the version before the data: a racing write then only makes the
+    # body newer than its tag, never older
+    version = PropertyRepository.data_version()
+    etag = hashlib.sha1(f"{version}|{request.query_string.decode()}".encode()).hexdigest()
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    
+    if request.args.get('format') == 'ndjson':
+        properties = PropertyRepository.load_properties()
+        
+        def generate():
+            # Project as records are written, so only one copy exists at a time
+            for prop in properties:
+                yield json.dumps(_project_one(prop, fields)) + '\n'
+        
+        response = Response(generate(), mimetype='application/x-ndjson')
+    elif 'limit' in request.args or 'cursor' in request.args:
+        limit = request.args.get('limit', Config.API_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, Config.API_MAX_PAGE_SIZE))
+        try:
+            page, next_cursor = PropertyRepository.page_properties(request.args.get('cursor'), limit)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        response = jsonify({'properties': _project(page, fields), 'next_cursor': next_cursor})
+    else:
+        response = jsonify(_project(PropertyRepository.load_properties(), fields))
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@api_bp.route('/cache_stats')
+def cache_stats():
+    """API endpoint for in-process cache counters"""
+    return jsonify({
+        'properties': PropertyRepository.cache_info(),
+        'predictions': ml_service.cache_info(),
+        'recommendations': recommendation_cache.info(),
+        'search_criteria': search_criteria_cache_info()
+    })
 
 @api_bp.route('/search_properties', methods=['POST'])
 def search_properties():
@@ -38,6 +105,27 @@ def search_properties():
             'error': str(e)
         })
 
+@api_bp.route('/model_status')
+def model_status():
+    """Background training state and the version of the model in use"""
+    return jsonify(ml_service.training_status())
+
+@api_bp.route('/ai_status')
+def ai_status():
+    """Gemini call counters: timeouts, late answers, latency and search prompt size percentiles"""
+    info = gemini_calls.info()
+    info['search_prompts'] = prompt_stats.info()
+    return jsonify(info)
+
+@api_bp.route('/model_selection', methods=['GET', 'POST'])
+def model_selection():
+    """POST starts a background cross-validation run; GET reports on it"""
+    if request.method == 'POST':
+        if not ml_service.request_model_selection():
+            return jsonify({'error': 'Model selection is already running'}), 409
+        return jsonify(ml_service.selection_status()), 202
+    return jsonify(ml_service.selection_status())
+
 @api_bp.route('/predict', methods=['POST'])
 def predict_price():
     """API endpoint for price prediction"""
@@ -57,4 +145,32 @@ def predict_price():
     except Exception as e:
         return jsonify({
             'error': f'Prediction failed: {str(e)}'
-        }), 500
\ No newline at end of file
+        }), 500
+
+@api_bp.route('/predict_batch', methods=['POST'])
+def predict_price_batch():
+    """API endpoint for pricing many properties in one call
+
+    Accepts a JSON list of property objects (or {"properties": [...]}) and
+    returns one entry per input row, in order; rows that cannot be priced
+    come back as null.
+    """
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('properties')
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        return jsonify({'error': 'Expected a JSON list of property objects'}), 400
+    if len(data) > Config.PREDICT_BATCH_MAX_ROWS:
+        return jsonify({'error': f'At most {Config.PREDICT_BATCH_MAX_ROWS} rows per request'}), 413
+    try:
+        predictions = ml_service.predict_prices(data)
+    except Exception as e:
+        return jsonify({
+            'error': f'Prediction failed: {str(e)}'
+        }), 500
+    return jsonify({
+        'predictions': [
+            {'prediction': prediction, 'formatted': f"Rp {prediction:,.0f}"} if prediction is not None else None
+            for prediction in predictions
+        ]
+    })
@@ -15,20 +15,12 @@ def index():
 @main_bp.route('/properties')
 def properties():
     """Property listings page"""
-    properties = PropertyRepository.load_properties()
-    
     # Apply filters
     budget_min = request.args.get('budget_min', type=int)
     budget_max = request.args.get('budget_max', type=int)
     kamar_tidur = request.args.get('kamar_tidur', type=int)
     
-    filtered_properties = properties
-    if budget_min:
-        filtered_properties = [p for p in filtered_properties if p.get('harga', 0) >= budget_min]
-    if budget_max:
-        filtered_properties = [p for p in filtered_properties if p.get('harga', 0) <= budget_max]
-    if kamar_tidur:
-        filtered_properties = [p for p in filtered_properties if p.get('kamar_tidur', 0) >= kamar_tidur]
+    filtered_properties = PropertyRepository.query_properties(budget_min, budget_max, kamar_tidur)
     
     return render_template('properties.html', properties=filtered_properties)
 
@@ -42,8 +34,7 @@ def property_detail(property_id):
         return redirect(url_for('main.properties'))
     
     # Get similar properties
-    all_properties = PropertyRepository.load_properties()
-    similar_properties = [p for p in all_properties if p['id'] != property_id][:3]
+    similar_properties = PropertyRepository.other_properties(property_id, 3)
     
     return render_template('property_detail.html', property=property_data, similar_properties=similar_properties)
 
@@ -0,0 +1,105 @@
+import sys
+import click
+from app.config import Config
+
+
+def register_commands(app):
+    """Register maintenance commands on the Flask CLI (``flask --app main ...``)"""
+
+    @app.cli.command('migrate-properties')
+    @click.option('--source', default=Config.PROPERTIES_FILE, show_default=True,
+                  help='Properties JSON file to migrate')
+    @click.option('--database-url', default=Config.DATABASE_URL, show_default=True,
+                  help='Target SQLAlchemy database URL')
+    @click.option('--force', is_flag=True, help='Overwrite a non-empty properties table')
+    def migrate_properties(source, database_url, force):
+        """Copy properties from the JSON file into the SQL backend"""
+        from app.storage.sql_store import migrate_json_to_sql
+        try:
+            count = migrate_json_to_sql(source, database_url, force=force)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        click.echo(f'Migrated {count} properties to {database_url}')
+
+    @app.cli.command('import-properties')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']),
+                  help='Input format (default: from the file extension)')
+    @click.option('--skip-invalid', is_flag=True, help='Import valid rows even if some rows are invalid')
+    @click.option('--no-retrain', is_flag=True, help='Do not retrain the price model afterwards')
+    def import_properties_command(path, fmt, skip_invalid, no_retrain):
+        """Bulk import listings from a CSV or NDJSON file"""
+        from app.services.property_io import import_properties
+        fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            try:
+                result = import_properties(f, fmt, skip_invalid=skip_invalid, retrain=False)
+            except ValueError as e:
+                raise click.ClickException(str(e))
+        for error in result['errors']:
+            click.echo(error, err=True)
+        click.echo(f"Imported {result['imported']} properties")
+        if result['imported'] and not no_retrain:
+            # The background trainer would die with this process; fit inline
+            from app.services.ml_service import ml_service
+            ml_service.train_model()
+        if result['errors'] and not skip_invalid:
+            raise click.ClickException('Nothing imported because of invalid rows (use --skip-invalid)')
+
+    @app.cli.command('export-properties')
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default='csv', show_default=True)
+    @click.option('--output', '-o', type=click.Path(dir_okay=False), help='Output file (default: stdout)')
+    def export_properties_command(fmt, output):
+        """Stream all listings as CSV or NDJSON"""
+        from app.services.property_io import export_properties
+        out = open(output, 'w', newline='') if output else sys.stdout
+        try:
+            for chunk in export_properties(fmt):
+                out.write(chunk)
+        finally:
+            if output:
+                out.close()
+
+    @app.cli.command('select-model')
+    @click.option('--folds', type=int, help='Cross-validation folds (default: MODEL_SELECTION_FOLDS)')
+    @click.option('--workers', type=int, help='Worker processes (default: all cores)')
+    def select_model_command(folds, workers):
+        """Cross-validate candidate price models and activate the best"""
+        from app.services.ml_service import ml_service
+        report = ml_service.run_model_selection(folds=folds, max_workers=workers)
+        if report is None:
+            raise click.ClickException('Not enough training data')
+        click.echo(f"{report['rows']} rows, {report['folds']} folds")
+        for result in report['results']:
+            click.echo(f"{'*' if result is report['best'] else ' '} {result['name']:<70} "
+                       f"MAE {result['mae']:>14,.0f}  R2 {result['r2']:6.3f}  "
+                       f"fit {result['fit_seconds']:6.2f}s  1 row {result['single_predict_ms']:6.2f}ms")
+
+    @app.cli.command('model-versions')
+    def model_versions_command():
+        """List stored price model versions"""
+        from app.services.ml_service import ml_service
+        for meta in ml_service.list_model_versions():
+            metrics = ', '.join(f'{k}={v:.4g}' for k, v in meta.get('metrics', {}).items())
+            click.echo(f"{'*' if meta['active'] else ' '} {meta['version']}  "
+                       f"{meta.get('training_rows')} rows  {metrics}")
+
+    @app.cli.command('model-activate')
+    @click.argument('version')
+    def model_activate_command(version):
+        """Make a stored price model version active"""
+        from app.services.ml_service import ml_service
+        try:
+            ml_service.activate_model(version)
+        except KeyError as e:
+            raise click.ClickException(str(e.args[0]))
+        click.echo(f'Activated {version}')
+
+    @app.cli.command('model-rollback')
+    def model_rollback_command():
+        """Reactivate the price model version before the active one"""
+        from app.services.ml_service import ml_service
+        version = ml_service.rollback_model()
+        if version is None:
+            raise click.ClickException('No older model version to roll back to')
+        click.echo(f'Rolled back to {version}')
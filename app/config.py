@@ -13,7 +13,47 @@ class Config:
     UPLOAD_FOLDER = 'static/images'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
 
+    # Data storage configuration
+    PROPERTIES_FILE = 'data/properties.json'
+    BASE_PRICES_FILE = 'data/base_prices.json'
+    # 'json' rewrites the whole file per change, 'journal' appends to a log,
+    # 'sql' stores properties in DATABASE_URL (SQLite unless configured)
+    PROPERTY_BACKEND = os.getenv('PROPERTY_BACKEND', 'json')
+    DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///data/properties.db')
+    PROPERTIES_JOURNAL_FILE = 'data/properties.journal'
+    JOURNAL_COMPACT_THRESHOLD = int(os.getenv('JOURNAL_COMPACT_THRESHOLD', '500'))
+    JOURNAL_COMPACT_INTERVAL = float(os.getenv('JOURNAL_COMPACT_INTERVAL', '300'))
+    JOURNAL_FSYNC = os.getenv('JOURNAL_FSYNC', 'true').lower() != 'false'
+
+    # /api/properties paging
+    API_PAGE_SIZE = 50
+    API_MAX_PAGE_SIZE = 500
+
     # ML Model configuration
+    MODEL_FILE = 'models/price_model.pkl'  # pre-registry single model, still loaded if present
+    MODEL_REGISTRY_DIR = 'models/registry'
+    MODEL_REGISTRY_KEEP = int(os.getenv('MODEL_REGISTRY_KEEP', '10'))
+    # Cross-validation folds and worker processes (0 = all cores) for model selection
+    MODEL_SELECTION_FOLDS = int(os.getenv('MODEL_SELECTION_FOLDS', '5'))
+    MODEL_SELECTION_WORKERS = int(os.getenv('MODEL_SELECTION_WORKERS', '0'))
+    # Only promote candidates predicting one row within this many ms (0 = no limit)
+    MODEL_SELECTION_MAX_PREDICT_MS = float(os.getenv('MODEL_SELECTION_MAX_PREDICT_MS', '0'))
+    # Extend the active forest with trees for changed rows instead of refitting
+    INCREMENTAL_TRAINING = os.getenv('INCREMENTAL_TRAINING', 'true').lower() != 'false'
+    # Full rebuild after this many incremental fits, or once rows changed since
+    # the last full fit exceed this fraction of the catalog
+    INCREMENTAL_MAX_STEPS = int(os.getenv('INCREMENTAL_MAX_STEPS', '20'))
+    INCREMENTAL_MAX_DRIFT = float(os.getenv('INCREMENTAL_MAX_DRIFT', '0.2'))
+    # Unchanged rows mixed into each incremental fit
+    INCREMENTAL_REPLAY_ROWS = int(os.getenv('INCREMENTAL_REPLAY_ROWS', '200'))
+    # Seconds without new edits before a requested retrain starts
+    RETRAIN_DELAY = float(os.getenv('RETRAIN_DELAY', '5'))
+    # Predict small batches with the flattened forest instead of sklearn
+    ML_COMPILED_INFERENCE = os.getenv('ML_COMPILED_INFERENCE', 'true').lower() != 'false'
+    # Entries kept in the in-process prediction cache (0 disables it)
+    PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '4096'))
+    # Upper bound on rows per /api/predict_batch request
+    PREDICT_BATCH_MAX_ROWS = int(os.getenv('PREDICT_BATCH_MAX_ROWS', '10000'))
     FEATURE_COLUMNS = [
         'luas_tanah', 'luas_bangunan', 'kamar_tidur', 'kamar_mandi', 
         'carport', 'tahun_dibangun', 'lantai', 'jarak_sekolah', 'jarak_rs', 
@@ -22,6 +62,23 @@ class Config:
 
     # Gemini AI configuration
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+    GEMINI_MODEL = 'gemini-2.5-flash'
+    # Search recommendation cache: entries, lifetime in seconds, and an
+    # optional directory that keeps answers across restarts ('' = memory only)
+    AI_CACHE_SIZE = int(os.getenv('AI_CACHE_SIZE', '512'))
+    AI_CACHE_TTL = float(os.getenv('AI_CACHE_TTL', '3600'))
+    AI_CACHE_DIR = os.getenv('AI_CACHE_DIR', '')
+    # Seconds a request waits for Gemini before answering without it, and
+    # threads making Gemini calls per process
+    AI_SEARCH_TIMEOUT = float(os.getenv('AI_SEARCH_TIMEOUT', '3'))
+    AI_CHAT_TIMEOUT = float(os.getenv('AI_CHAT_TIMEOUT', '15'))
+    AI_MAX_WORKERS = int(os.getenv('AI_MAX_WORKERS', '4'))
+    # Best-ranked search matches offered to Gemini, and shown without it
+    SEARCH_TOP_K = int(os.getenv('SEARCH_TOP_K', '10'))
+    SEARCH_RESULTS = int(os.getenv('SEARCH_RESULTS', '5'))
+    # Estimated token budget of a search prompt; lower-ranked candidates
+    # are left out once it is spent
+    AI_PROMPT_MAX_TOKENS = int(os.getenv('AI_PROMPT_MAX_TOKENS', '2000'))
 
     # Google Maps configuration
     GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY')
@@ -1,78 +1,151 @@
 import json
 import os
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from app.config import Config
+from app.storage.files import FileLock, VersionStamp, atomic_write_json
+from app.storage.json_store import JsonPropertyStore
+from app.storage.journal_store import JournalPropertyStore
+
+def _create_property_store():
+    """Build the property store selected by Config.PROPERTY_BACKEND"""
+    if Config.PROPERTY_BACKEND == 'sql':
+        from app.storage.sql_store import SqlPropertyStore
+        os.makedirs('data', exist_ok=True)
+        return SqlPropertyStore(Config.DATABASE_URL)
+    if Config.PROPERTY_BACKEND == 'journal':
+        return JournalPropertyStore(
+            Config.PROPERTIES_FILE,
+            Config.PROPERTIES_JOURNAL_FILE,
+            compact_threshold=Config.JOURNAL_COMPACT_THRESHOLD,
+            compact_interval=Config.JOURNAL_COMPACT_INTERVAL,
+            fsync=Config.JOURNAL_FSYNC
+        )
+    return JsonPropertyStore(Config.PROPERTIES_FILE)
+
+# Shared snapshot of the property data, reused across requests
+_property_store = _create_property_store()
 
 class PropertyRepository:
     """Handle property data operations"""
     
     @staticmethod
     def load_properties() -> List[Dict]:
-        """Load properties from JSON file"""
-        try:
-            with open('data/properties.json', 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
+        """Load properties from the cached JSON snapshot"""
+        return _property_store.load()
     
     @staticmethod
     def save_properties(properties: List[Dict]) -> None:
         """Save properties to JSON file"""
-        with open('data/properties.json', 'w') as f:
-            json.dump(properties, f, indent=2)
+        _property_store.save(properties)
+    
+    @staticmethod
+    def data_version() -> str:
+        """Opaque token that changes whenever property data changes"""
+        return _property_store.data_version()
+    
+    @staticmethod
+    def page_properties(cursor: Optional[str], limit: int) -> Tuple[List[Dict], Optional[str]]:
+        """One page of properties after an opaque cursor, plus the next cursor"""
+        return _property_store.page(cursor, limit)
+    
+    @staticmethod
+    def query_properties(budget_min: Optional[int] = None, budget_max: Optional[int] = None,
+                         min_kamar_tidur: Optional[int] = None) -> List[Dict]:
+        """Properties matching the listing page filters"""
+        return _property_store.query(budget_min, budget_max, min_kamar_tidur)
+    
+    @staticmethod
+    def top_matches(criteria: Dict[str, Any], k: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """The k matches ranked best for the query's preferences, and how many matched"""
+        return _property_store.top_matches(criteria, k)
+    
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        """Dashboard aggregates: counts by status, average price, per-kelurahan rows"""
+        return _property_store.stats()
+    
+    @staticmethod
+    def recent_properties(limit: int = 5) -> List[Dict]:
+        """Most recently created properties, newest first"""
+        return _property_store.recent(limit)
+    
+    @staticmethod
+    def compact() -> bool:
+        """Fold the mutation journal into the snapshot (journal backend only)"""
+        if isinstance(_property_store, JournalPropertyStore):
+            return _property_store.compact()
+        return False
+    
+    @staticmethod
+    def after_fork() -> None:
+        """Drop database connections inherited from the parent process"""
+        after_fork = getattr(_property_store, 'after_fork', None)
+        if after_fork is not None:
+            after_fork()
+    
+    @staticmethod
+    def cache_info() -> Dict:
+        """Property cache hit/miss counters"""
+        return _property_store.cache_info()
     
     @staticmethod
     def get_property_by_id(property_id: str) -> Optional[Dict]:
         """Get property by ID"""
-        properties = PropertyRepository.load_properties()
-        return next((p for p in properties if p['id'] == property_id), None)
+        return _property_store.get(property_id)
+    
+    @staticmethod
+    def other_properties(property_id: str, limit: int = 3) -> List[Dict]:
+        """The first ``limit`` properties in catalog order, skipping ``property_id``"""
+        return _property_store.others(property_id, limit)
     
     @staticmethod
     def add_property(property_data: Dict) -> None:
         """Add new property"""
-        properties = PropertyRepository.load_properties()
-        properties.append(property_data)
-        PropertyRepository.save_properties(properties)
+        _property_store.add(property_data)
+    
+    @staticmethod
+    def add_properties(properties: List[Dict]) -> None:
+        """Add many properties with a single write; fails if any id exists"""
+        _property_store.add_many(properties)
     
     @staticmethod
     def update_property(property_id: str, updated_data: Dict) -> bool:
         """Update existing property"""
-        properties = PropertyRepository.load_properties()
-        for i, property_data in enumerate(properties):
-            if property_data['id'] == property_id:
-                # Keep the original ID and created_at
-                updated_data['id'] = property_id
-                if 'created_at' not in updated_data and 'created_at' in property_data:
-                    updated_data['created_at'] = property_data['created_at']
-                properties[i] = updated_data
-                PropertyRepository.save_properties(properties)
-                return True
-        return False
+        property_data = _property_store.get(property_id)
+        if property_data is None:
+            return False
+        # Keep the original ID and created_at
+        updated_data['id'] = property_id
+        if 'created_at' not in updated_data and 'created_at' in property_data:
+            updated_data['created_at'] = property_data['created_at']
+        return _property_store.update(property_id, updated_data)
 
     @staticmethod
     def delete_property(property_id: str) -> bool:
         """Delete property by ID"""
-        properties = PropertyRepository.load_properties()
-        original_count = len(properties)
-        properties = [p for p in properties if p['id'] != property_id]
-        
-        if len(properties) < original_count:
-            PropertyRepository.save_properties(properties)
-            return True
-        return False
+        return _property_store.delete(property_id)
 
 def encode_categorical(value: str, mapping: Dict[str, int]) -> int:
     """Encode categorical values using provided mapping"""
     return mapping.get(value, 0)
 
+# Cross-process lock and change counter for data/base_prices.json
+_base_price_lock = FileLock(Config.BASE_PRICES_FILE + '.lock')
+_base_price_stamp = VersionStamp(Config.BASE_PRICES_FILE + '.version')
+
 class BasePriceRepository:
     """Handle base price settings for predictions"""
     
+    @staticmethod
+    def version() -> int:
+        """Counter bumped by every save, shared by all worker processes"""
+        return _base_price_stamp.read()
+    
     @staticmethod
     def load_base_prices() -> Dict:
         """Load base price settings from JSON file"""
         try:
-            with open('data/base_prices.json', 'r') as f:
+            with open(Config.BASE_PRICES_FILE, 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
             # Default base prices
@@ -108,11 +181,10 @@ class BasePriceRepository:
     def save_base_prices(base_prices: Dict) -> bool:
         """Save base price settings to JSON file"""
         try:
-            # Ensure the data directory exists
-            os.makedirs('data', exist_ok=True)
-            
-            with open('data/base_prices.json', 'w') as f:
-                json.dump(base_prices, f, indent=2)
+            # Locked atomic replace so concurrent workers never see a torn file
+            with _base_price_lock:
+                atomic_write_json(Config.BASE_PRICES_FILE, base_prices)
+                _base_price_stamp.bump()
             return True
         except Exception as e:
             print(f"Error saving base prices: {e}")
@@ -122,9 +194,10 @@ class BasePriceRepository:
     def update_base_prices(updated_data: Dict) -> bool:
         """Update base price settings"""
         try:
-            current_prices = BasePriceRepository.load_base_prices()
-            current_prices.update(updated_data)
-            BasePriceRepository.save_base_prices(current_prices)
+            with _base_price_lock:
+                current_prices = BasePriceRepository.load_base_prices()
+                current_prices.update(updated_data)
+                BasePriceRepository.save_base_prices(current_prices)
             return True
         except Exception as e:
             print(f"Error updating base prices: {e}")
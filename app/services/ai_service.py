@@ -1,29 +1,65 @@
 import json
 import re
 import os
+import threading
+import time
 from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
+from app.config import Config
 from app.models import PropertyRepository
-from app.utils.search_utils import extract_search_criteria, filter_properties_strict
+from app.services.recommendation_cache import RecommendationCache
+from app.services.search_prompt import PROMPT_VERSION, PromptStats, build_search_prompt
+from app.utils.deadline_executor import DeadlineExecutor
+from app.utils.search_utils import extract_search_criteria
 
 # Load environment variables
 load_dotenv()
 
-# Import Gemini AI integration
-try:
-    from google import genai
-    from google.genai import types
-    api_key = os.getenv("GEMINI_API_KEY")
-    if api_key and api_key != "your_gemini_api_key_here":
-        client = genai.Client(api_key=api_key)
-        GEMINI_AVAILABLE = True
-    else:
-        raise ValueError("GEMINI_API_KEY not found or not configured")
-except Exception as e:
-    print(f"Gemini AI not available: {e}")
-    GEMINI_AVAILABLE = False
-    client = None
-    types = None
+# Gemini AI integration, imported and connected on first use: google.genai
+# is slow to import and most requests never talk to the model
+client = None
+_client_checked = False
+_client_lock = threading.Lock()
+
+def get_gemini_client():
+    """The shared Gemini client, or None if the SDK or API key is missing"""
+    global client, _client_checked
+    if not _client_checked:
+        with _client_lock:
+            if not _client_checked:
+                try:
+                    from google import genai
+                    api_key = os.getenv("GEMINI_API_KEY")
+                    if api_key and api_key != "your_gemini_api_key_here":
+                        client = genai.Client(api_key=api_key)
+                    else:
+                        raise ValueError("GEMINI_API_KEY not found or not configured")
+                except Exception as e:
+                    print(f"Gemini AI not available: {e}")
+                _client_checked = True
+    return client
+
+def set_gemini_client(new_client) -> None:
+    """Use ``new_client`` (anything with ``models.generate_content``) instead
+    of the SDK client, e.g. a local fake; None disables AI features"""
+    global client, _client_checked
+    with _client_lock:
+        client = new_client
+        _client_checked = True
+
+def _generate(prompt: str) -> str:
+    """One blocking Gemini call; returns the response text ('' if empty)"""
+    response = get_gemini_client().models.generate_content(model=Config.GEMINI_MODEL, contents=prompt)
+    return response.text or ''
+
+# Gemini calls run here so a request waits at most its deadline
+gemini_calls = DeadlineExecutor(Config.AI_MAX_WORKERS, name='gemini')
+
+# Gemini picks for (query, candidate set); identical searches skip the API call
+recommendation_cache = RecommendationCache(Config.AI_CACHE_SIZE, Config.AI_CACHE_TTL, Config.AI_CACHE_DIR or None)
+
+# Size of each search prompt and how long Gemini took to answer it
+prompt_stats = PromptStats()
 
 class AIPropertySearch:
     """Enhanced AI-powered property search with deterministic filtering"""
@@ -41,11 +77,10 @@ class AIPropertySearch:
                 'ai_powered': False
             }
         
-        properties = PropertyRepository.load_properties()
-        
-        # Step 1: Pre-filter with deterministic rules
+        # Step 1: Pre-filter with deterministic rules, then keep only the
+        # best-ranked matches for the model and the page
         criteria = extract_search_criteria(query)
-        pre_filtered = filter_properties_strict(properties, criteria)
+        pre_filtered, total = PropertyRepository.top_matches(criteria, Config.SEARCH_TOP_K)
         
         # Step 2: Check for non-property queries
         if AIPropertySearch._is_non_property_query(query):
@@ -55,8 +90,9 @@ class AIPropertySearch:
                 'ai_powered': True
             }
         
-        # Step 3: Use AI if available for context understanding
-        if GEMINI_AVAILABLE and client and len(pre_filtered) > 0:
+        # Step 3: Use AI if available for context understanding; past the
+        # deadline this falls through to the deterministic result
+        if len(pre_filtered) > 0 and get_gemini_client() is not None:
             try:
                 ai_result = AIPropertySearch._get_ai_recommendations(query, pre_filtered)
                 if ai_result:
@@ -66,8 +102,8 @@ class AIPropertySearch:
         
         # Step 4: Fallback to deterministic results
         return {
-            'properties': pre_filtered[:5],
-            'explanation': f"Ditemukan {len(pre_filtered)} properti yang sesuai kriteria Anda.",
+            'properties': pre_filtered[:Config.SEARCH_RESULTS],
+            'explanation': f"Ditemukan {total} properti yang sesuai kriteria Anda.",
             'ai_powered': False
         }
     
@@ -82,69 +118,67 @@ class AIPropertySearch:
         """Get AI recommendations from pre-filtered properties"""
         if not filtered_properties:
             return None
-            
-        # Create simplified context for AI
-        property_context = []
-        for i, prop in enumerate(filtered_properties):
-            context_item = {
-                'index': i,
-                'alamat': prop.get('alamat', 'N/A'),
-                'harga': prop.get('harga', 0),
-                'kamar_tidur': prop.get('kamar_tidur', 0),
-                'kamar_mandi': prop.get('kamar_mandi', 0),
-                'luas_tanah': prop.get('luas_tanah', 0),
-                'luas_bangunan': prop.get('luas_bangunan', 0)
-            }
-            property_context.append(context_item)
         
-        system_prompt = f"""Anda adalah asisten properti yang membantu memilih dari properti yang SUDAH DIFILTER.
-
-Properti yang tersedia (sudah sesuai kriteria dasar):
-{json.dumps(property_context, indent=2)}
-
-Query pengguna: "{query}"
-
-TUGAS: Pilih maksimal 3 properti TERBAIK dari list di atas yang paling sesuai dengan query.
-
-ATURAN:
-- HANYA pilih dari properti yang sudah disediakan (index 0 hingga {len(filtered_properties)-1})
-- Jika query menyebutkan "murah" → pilih yang harga terendah
-- Jika query menyebutkan "besar" → pilih yang luas terbesar
-- Jika tidak ada preferensi khusus → pilih 2-3 yang representatif
-
-Responlah HANYA dengan format JSON:
-{{"property_indices": [0, 1, 2], "explanation": "Penjelasan singkat mengapa dipilih"}}"""
+        # Candidates arrive ranked best first; the prompt keeps as many as
+        # fit the token budget and the model picks among those
+        system_prompt, used, tokens = build_search_prompt(query, filtered_properties, Config.AI_PROMPT_MAX_TOKENS)
+        offered = len(filtered_properties)
+        filtered_properties = filtered_properties[:used]
+        
+        cache_key = RecommendationCache.key(query, [p.get('id') for p in filtered_properties],
+                                            PropertyRepository.data_version(),
+                                            f'{Config.GEMINI_MODEL}/{PROMPT_VERSION}')
+        cached = recommendation_cache.get(cache_key)
+        if cached is not None:
+            return AIPropertySearch._recommendation_result(
+                cached['property_indices'], cached['explanation'], filtered_properties)
+        
+        def ask() -> Optional[Dict]:
+            # Runs in the executor; a late answer still fills the cache
+            started = time.perf_counter()
+            text = _generate(system_prompt)
+            prompt_stats.record(tokens, used, offered, time.perf_counter() - started)
+            if not text:
+                return None
+            try:
+                ai_result = json.loads(text.strip())
+            except json.JSONDecodeError:
+                ai_result = None
+            if not isinstance(ai_result, dict):
+                # Not the requested {"property_indices": ..., "explanation": ...}
+                prompt_stats.record_invalid()
+                return None
+            answer = {'property_indices': ai_result.get('property_indices', []),
+                      'explanation': ai_result.get('explanation', '')}
+            recommendation_cache.put(cache_key, answer)
+            return answer
+        
+        answer = gemini_calls.run(ask, Config.AI_SEARCH_TIMEOUT)
+        if answer is None:
+            return None
+        return AIPropertySearch._recommendation_result(
+            answer['property_indices'], answer['explanation'], filtered_properties)
 
-        try:
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=[types.Content(role="user", parts=[types.Part(text=system_prompt)])]
-            )
-            
-            if response.text:
-                ai_result = json.loads(response.text.strip())
-                selected_indices = ai_result.get('property_indices', [])
-                explanation = ai_result.get('explanation', '')
-                
-                # Validate indices and get properties
-                selected_properties = []
-                for idx in selected_indices:
-                    if 0 <= idx < len(filtered_properties):
-                        selected_properties.append(filtered_properties[idx])
-                
-                return {
-                    'properties': selected_properties,
-                    'explanation': explanation if selected_properties else "Tidak ada properti yang sesuai dengan kriteria pencarian Anda.",
-                    'ai_powered': True
-                }
-        except (json.JSONDecodeError, Exception):
-            pass
+    @staticmethod
+    def _recommendation_result(selected_indices: List[int], explanation: str,
+                               filtered_properties: List[Dict]) -> Dict:
+        """Search response for the listings the model picked by index"""
+        # Validate indices and get properties
+        selected_properties = []
+        for idx in selected_indices:
+            if isinstance(idx, int) and 0 <= idx < len(filtered_properties):
+                selected_properties.append(filtered_properties[idx])
         
-        return None
+        return {
+            'properties': selected_properties,
+            'explanation': explanation if selected_properties else "Tidak ada properti yang sesuai dengan kriteria pencarian Anda.",
+            'ai_powered': True
+        }
 
 def gemini_chat_response(message: str, context: Optional[str] = None) -> str:
     """Generate chatbot response using Gemini AI"""
-    if not GEMINI_AVAILABLE or not client:
+    client = get_gemini_client()
+    if client is None:
         return "Maaf, layanan chatbot AI sedang tidak tersedia. Silakan hubungi admin untuk mengkonfigurasi GEMINI_API_KEY."
     
     try:
@@ -168,14 +202,11 @@ def gemini_chat_response(message: str, context: Optional[str] = None) -> str:
         
         Be friendly, informative, and helpful. Respond in Bahasa Indonesia when appropriate."""
         
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[
-                types.Content(role="user", parts=[types.Part(text=f"{system_prompt}\n\nUser question: {message}")])
-            ]
-        )
-        
-        return response.text if response.text else "Maaf, saya tidak dapat memproses pertanyaan Anda saat ini."
+        reply = gemini_calls.run(lambda: _generate(f"{system_prompt}\n\nUser question: {message}"),
+                                 Config.AI_CHAT_TIMEOUT)
+        if reply is None:
+            return "Maaf, layanan chatbot AI sedang lambat. Silakan coba lagi sebentar lagi."
+        return reply if reply else "Maaf, saya tidak dapat memproses pertanyaan Anda saat ini."
         
     except Exception as e:
         return "Maaf, terjadi kesalahan pada sistem chatbot. Silakan coba lagi."
\ No newline at end of file
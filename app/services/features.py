@@ -0,0 +1,158 @@
+import math
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.config import Config
+
+# How each entry of Config.FEATURE_COLUMNS is derived from a property dict:
+# (source field, default when the field is absent, integer-valued?) for
+# numeric features, or (source field, encoding map) for categoricals.
+NUMERIC_FEATURES: Dict[str, Tuple[str, float, bool]] = {
+    'luas_tanah': ('luas_tanah', 100, False),
+    'luas_bangunan': ('luas_bangunan', 80, False),
+    'kamar_tidur': ('kamar_tidur', 2, True),
+    'kamar_mandi': ('kamar_mandi', 1, True),
+    'carport': ('carport', 0, True),
+    'tahun_dibangun': ('tahun_dibangun', 2020, True),
+    'lantai': ('lantai', 1, True),
+    'jarak_sekolah': ('jarak_sekolah', 1000, False),
+    'jarak_rs': ('jarak_rs', 2000, False),
+    'jarak_pasar': ('jarak_pasar', 1500, False),
+}
+
+CATEGORICAL_FEATURES: Dict[str, Tuple[str, Dict[str, int]]] = {
+    'jenis_jalan_encoded': ('jenis_jalan', Config.JENIS_JALAN_MAP),
+    'kondisi_encoded': ('kondisi', Config.KONDISI_MAP),
+    'sertifikat_encoded': ('sertifikat', Config.SERTIFIKAT_MAP),
+}
+
+
+def _field(rows: List[Dict[str, Any]], key: str, default: Any) -> List[Any]:
+    try:
+        return list(map(itemgetter(key), rows))
+    except KeyError:
+        return [row.get(key, default) for row in rows]
+
+
+def numeric_column(rows: List[Dict[str, Any]], key: str, default: float, integer: bool = False) -> np.ndarray:
+    """One field across all rows as float64, NaN where the value is not a number"""
+    values = _field(rows, key, default)
+    try:
+        column = np.array(values, dtype=np.float64)
+        if column.ndim != 1:
+            raise ValueError('nested sequence')
+    except (TypeError, ValueError):
+        # Some value is not numeric; convert what can be converted
+        import pandas as pd
+        column = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+    return np.trunc(column) if integer else column
+
+
+def lookup_column(rows: List[Dict[str, Any]], key: str, mapping: Dict[Any, float],
+                  default: Any = None, missing: float = 0) -> np.ndarray:
+    """Map one field across all rows through ``mapping``; unknown values get ``missing``.
+
+    Values are factorized first, so the dict is consulted once per distinct
+    value and the rows are filled by indexing a small lookup array.
+    """
+    import pandas as pd  # deferred: pandas is slow to import and only needed once serving
+    values = _field(rows, key, default)
+    try:
+        codes, uniques = pd.factorize(np.fromiter(values, dtype=object, count=len(values)))
+    except TypeError:
+        return np.array([mapping.get(v, missing) if _hashable(v) else missing for v in values], dtype=np.float64)
+    # The extra slot at the end is what code -1 (None/NaN) indexes
+    table = np.array([mapping.get(v, missing) for v in uniques] + [missing], dtype=np.float64)
+    return table[codes]
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class FeaturePipeline:
+    """Turns property dicts into the model's feature matrix.
+
+    Column order and derivation follow Config.FEATURE_COLUMNS, and the same
+    defaults apply to training and inference. Every column is converted in
+    one NumPy pass; values that are not numbers become NaN so callers can
+    drop or skip those rows.
+    """
+
+    def __init__(self, columns: Optional[List[str]] = None):
+        self.columns = list(columns or Config.FEATURE_COLUMNS)
+        unknown = [c for c in self.columns if c not in NUMERIC_FEATURES and c not in CATEGORICAL_FEATURES]
+        if unknown:
+            raise ValueError(f"No feature definition for: {', '.join(unknown)}")
+
+        self._numeric = [j for j, c in enumerate(self.columns) if c in NUMERIC_FEATURES]
+        self._integer = [j for j in self._numeric if NUMERIC_FEATURES[self.columns[j]][2]]
+        self._numeric_getter = itemgetter(*[NUMERIC_FEATURES[self.columns[j]][0] for j in self._numeric])
+        # (field, default, integer?, encoding map or None) per column, for transform_one
+        self._plan = [NUMERIC_FEATURES[c] + (None,) if c in NUMERIC_FEATURES
+                      else (CATEGORICAL_FEATURES[c][0], None, False, CATEGORICAL_FEATURES[c][1])
+                      for c in self.columns]
+
+    def _numeric_block(self, properties: List[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """All numeric features in one pass when every row has every field as a number"""
+        if len(self._numeric) < 2:
+            return None
+        try:
+            block = np.fromiter(chain.from_iterable(map(self._numeric_getter, properties)),
+                                dtype=np.float64, count=len(properties) * len(self._numeric))
+        except (KeyError, TypeError, ValueError):
+            return None
+        return block.reshape(len(properties), len(self._numeric))
+
+    def transform(self, properties: List[Dict[str, Any]]) -> np.ndarray:
+        """Feature matrix of shape (len(properties), len(columns))"""
+        matrix = np.empty((len(properties), len(self.columns)), dtype=np.float64)
+        block = self._numeric_block(properties)
+        if block is not None:
+            matrix[:, self._numeric] = block
+            matrix[:, self._integer] = np.trunc(matrix[:, self._integer])
+        for j, name in enumerate(self.columns):
+            if name in NUMERIC_FEATURES:
+                if block is None:
+                    field, default, integer = NUMERIC_FEATURES[name]
+                    matrix[:, j] = numeric_column(properties, field, default, integer)
+            else:
+                field, mapping = CATEGORICAL_FEATURES[name]
+                matrix[:, j] = lookup_column(properties, field, mapping)
+        return matrix
+
+    def transform_one(self, property_data: Dict[str, Any]) -> np.ndarray:
+        """Feature row for a single property, equal to ``transform([property_data])[0]``.
+
+        One row does not amortize per-column NumPy calls or pd.factorize, so
+        values are converted with float() and categoricals looked up in
+        their maps directly; anything but a number or numeric string goes
+        through transform() to keep its exact coercion rules.
+        """
+        row = []
+        for field, default, integer, mapping in self._plan:
+            value = property_data.get(field, default)
+            if mapping is not None:
+                try:
+                    row.append(mapping.get(value, 0))
+                except TypeError:  # unhashable
+                    row.append(0)
+                continue
+            if not isinstance(value, (int, float, str)):
+                return self.transform([property_data])[0]
+            try:
+                number = float(value)
+            except ValueError:
+                return self.transform([property_data])[0]
+            if integer and math.isfinite(number):
+                number = float(math.trunc(number))
+            row.append(number)
+        return np.array(row, dtype=np.float64)
+
+
+feature_pipeline = FeaturePipeline()
@@ -0,0 +1,169 @@
+import json
+import os
+from typing import Any, Optional
+import numpy as np
+
+# Estimators whose prediction is the plain average of their trees' leaf values
+SUPPORTED_FORESTS = ('RandomForestRegressor', 'ExtraTreesRegressor')
+
+# Above roughly this many rows sklearn's C traversal is faster than ours
+SMALL_BATCH_ROWS = 128
+
+# Arrays written by save(); optional ones may be absent
+_ARRAYS = ('feature', 'threshold', 'children', 'value', 'roots', 'is_leaf')
+_OPTIONAL_ARRAYS = ('mean', 'scale')
+
+
+class CompiledForest:
+    """A fitted regression forest flattened into contiguous NumPy node arrays.
+
+    Every tree's nodes are concatenated into shared ``feature``,
+    ``threshold``, ``children`` and ``value`` arrays. Leaves point back at
+    themselves, so all trees can be advanced together for a fixed number of
+    steps with a handful of array operations per level and no Python loop
+    over trees or per-call validation. Pairs that reach a leaf drop out, so
+    the work per level shrinks as trees finish.
+
+    The StandardScaler is folded into the engine: it takes raw feature rows
+    and applies the mean/scale itself. Split thresholds stay in scaled space
+    and the scaled row is rounded to float32 before comparing, exactly as
+    sklearn's trees do, so every row reaches the same leaves as
+    ``model.predict(scaler.transform(X))``.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, depth: int,
+                 mean: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None,
+                 is_leaf: Optional[np.ndarray] = None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.mean = mean
+        self.scale = scale
+        self.is_leaf = is_leaf if is_leaf is not None else children[0::2] == np.arange(len(value))
+
+    @classmethod
+    def from_model(cls, model: Any, scaler: Any = None) -> Optional['CompiledForest']:
+        """Compile a fitted forest, or return None if the model is not supported"""
+        if type(model).__name__ not in SUPPORTED_FORESTS or getattr(model, 'n_outputs_', 1) != 1:
+            return None
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        sizes = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        total = int(sizes.sum())
+
+        feature = np.empty(total, dtype=np.intp)
+        threshold = np.empty(total, dtype=np.float64)
+        children = np.empty(2 * total, dtype=np.intp)
+        value = np.empty(total, dtype=np.float64)
+        for tree, offset in zip(trees, offsets):
+            nodes = slice(offset, offset + tree.node_count)
+            own = np.arange(offset, offset + tree.node_count)
+            leaf = tree.children_left < 0
+            feature[nodes] = np.where(leaf, 0, tree.feature)
+            # x > +inf is never true, so a leaf always steps to children[2 * i] == i
+            threshold[nodes] = np.where(leaf, np.inf, tree.threshold)
+            children[2 * offset:2 * (offset + tree.node_count):2] = np.where(leaf, own, tree.children_left + offset)
+            children[2 * offset + 1:2 * (offset + tree.node_count):2] = np.where(leaf, own, tree.children_right + offset)
+            value[nodes] = tree.value[:, 0, 0]
+
+        mean = scale = None
+        if scaler is not None:
+            mean = np.asarray(scaler.mean_, dtype=np.float64) if scaler.with_mean else None
+            scale = np.asarray(scaler.scale_, dtype=np.float64) if scaler.with_std else None
+        return cls(feature, threshold, children, value, offsets.astype(np.intp),
+                   max(tree.max_depth for tree in trees), mean, scale)
+
+    def save(self, directory: str) -> None:
+        """Write the node arrays as .npy files that load() can memory-map"""
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAYS + _OPTIONAL_ARRAYS:
+            array = getattr(self, name)
+            if array is not None:
+                np.save(os.path.join(directory, name + '.npy'), np.ascontiguousarray(array))
+        with open(os.path.join(directory, 'forest.json'), 'w') as f:
+            json.dump({'depth': self.depth, 'nodes': len(self.value), 'trees': len(self.roots)}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'CompiledForest':
+        """Load a saved engine; with ``mmap`` the arrays are read-only views of
+        the files, so worker processes share one copy through the page cache"""
+        mode = 'r' if mmap else None
+        # Plain ndarray views of the maps: np.memmap results pay subclass
+        # bookkeeping on every indexing operation
+        arrays = {name: np.load(os.path.join(directory, name + '.npy'), mmap_mode=mode).view(np.ndarray)
+                  for name in _ARRAYS}
+        for name in _OPTIONAL_ARRAYS:
+            path = os.path.join(directory, name + '.npy')
+            arrays[name] = np.load(path, mmap_mode=mode).view(np.ndarray) if os.path.exists(path) else None
+        with open(os.path.join(directory, 'forest.json')) as f:
+            depth = json.load(f)['depth']
+        return cls(arrays['feature'], arrays['threshold'], arrays['children'], arrays['value'],
+                   arrays['roots'], depth, arrays['mean'], arrays['scale'], arrays['is_leaf'])
+
+    def _scaled(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return X.astype(np.float32)
+
+    def _leaves(self, Z: np.ndarray) -> np.ndarray:
+        """Leaf index reached by each (row, tree) pair, shape (rows, trees)"""
+        if len(Z) <= 8:
+            return self._leaves_small(Z)
+        feature, threshold, children, is_leaf = self.feature, self.threshold, self.children, self.is_leaf
+        n_trees = len(self.roots)
+        leaves = np.tile(self.roots, len(Z))
+        rows = np.repeat(np.arange(len(Z)), n_trees)
+        pending = np.flatnonzero(~is_leaf[leaves])
+        nodes = leaves[pending]
+        rows = rows[pending]
+        # Advance only the pairs that have not reached a leaf yet
+        while len(pending):
+            nodes = children[2 * nodes + (Z[rows, feature[nodes]] > threshold[nodes])]
+            done = is_leaf[nodes]
+            leaves[pending[done]] = nodes[done]
+            if done.any():
+                keep = ~done
+                pending, nodes, rows = pending[keep], nodes[keep], rows[keep]
+        return leaves.reshape(len(Z), n_trees)
+
+    def _leaves_small(self, Z: np.ndarray) -> np.ndarray:
+        # For a few rows, stepping every pair each level beats compacting;
+        # stop early once every tree has reached a leaf
+        feature, threshold, children, is_leaf = self.feature, self.threshold, self.children, self.is_leaf
+        if len(Z) == 1:
+            # One row: plain 1-D indexing is cheaper than the (row, tree) grid
+            z = Z[0]
+            nodes = self.roots
+            for level in range(self.depth):
+                nodes = children[2 * nodes + (z[feature[nodes]] > threshold[nodes])]
+                if level % 4 == 3 and is_leaf[nodes].all():
+                    break
+            return nodes[np.newaxis, :]
+        rows = np.arange(len(Z))[:, np.newaxis]
+        nodes = np.repeat(self.roots[np.newaxis, :], len(Z), axis=0)
+        for level in range(self.depth):
+            nodes = children[2 * nodes + (Z[rows, feature[nodes]] > threshold[nodes])]
+            if level % 4 == 3 and is_leaf[nodes].all():
+                break
+        return nodes
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predictions for a 2-D array of raw (unscaled) feature rows"""
+        return self.value[self._leaves(self._scaled(X))].mean(axis=1)
+
+    def predict_one(self, x: np.ndarray) -> float:
+        """Prediction for one raw feature row"""
+        return float(self.predict(x[np.newaxis, :])[0])
+
+    def matches(self, model: Any, scaler: Any, X: np.ndarray, rtol: float = 1e-9) -> bool:
+        """Check the engine against sklearn on sample rows"""
+        expected = model.predict(scaler.transform(X) if scaler is not None else X)
+        return bool(np.allclose(self.predict(X), expected, rtol=rtol, atol=1e-6))
@@ -1,102 +1,599 @@
-import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, r2_score
+import copy
+import itertools
+import math
+import os
 import pickle
-from typing import Optional, Dict, Any
-from app.models import PropertyRepository, BasePriceRepository, encode_categorical
+import sys
+import threading
+import time
+import warnings
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Union
+from app.models import PropertyRepository
 from app.config import Config
+from app.services.features import feature_pipeline, numeric_column
+from app.services.forest_engine import SMALL_BATCH_ROWS, SUPPORTED_FORESTS, CompiledForest
+from app.services.model_registry import ModelRegistry, dataset_fingerprint
+from app.services.model_selection import DEFAULT_CANDIDATE, build_estimator, candidate_name, select_model
+from app.services.pricing import pricing_engine
+from app.utils.lru_cache import LRUCache
+
+# pandas and scikit-learn are imported where they are used, so importing
+# the app stays fast; the warm-up before forking workers loads them once
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Distinguishes every model bundle installed in this process
+_bundle_generations = itertools.count(1)
+
+def _compile_engine(model: Any, scaler: Any) -> Optional[CompiledForest]:
+    """Flatten the forest for fast small-batch inference, if enabled and exact"""
+    if not Config.ML_COMPILED_INFERENCE:
+        return None
+    try:
+        engine = CompiledForest.from_model(model, scaler)
+        if engine is None:
+            return None
+        # Probe rows spread around the training distribution
+        rng = np.random.default_rng(0)
+        probe = rng.normal(size=(64, len(scaler.mean_))) * scaler.scale_ + scaler.mean_
+        if not engine.matches(model, scaler, probe):
+            print("Compiled forest disagrees with sklearn; using sklearn predict")
+            return None
+        return engine
+    except Exception as e:
+        print(f"Error compiling forest: {e}")
+        return None
+
+def _process_alive(pid: Any) -> bool:
+    """Whether a process with this id is running on this host"""
+    if not isinstance(pid, int):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _oob_metrics(model: Any, y: np.ndarray) -> Dict[str, float]:
+    """MAE/R² of the out-of-bag predictions, which need no held-out fit"""
+    from sklearn.metrics import mean_absolute_error, r2_score
+    oob = getattr(model, 'oob_prediction_', None)
+    if oob is None:
+        return {}
+    oob = np.ravel(oob)
+    seen = np.isfinite(oob)
+    if seen.sum() < 2:
+        return {}
+    return {
+        'oob_mae': float(mean_absolute_error(y[seen], oob[seen])),
+        'oob_r2': float(r2_score(y[seen], oob[seen])),
+    }
+
+def _row_digests(df: 'pd.DataFrame') -> Dict[str, str]:
+    """Listing ID -> hash of its features and price, to spot new and edited rows"""
+    import pandas as pd
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return {str(row_id): '%016x' % h for row_id, h in zip(df.index, hashes)}
+
+def _as_records(properties: Union[List[Dict[str, Any]], 'pd.DataFrame']) -> List[Dict[str, Any]]:
+    """Rows as dicts; DataFrame cells holding NaN/None count as missing"""
+    # Without pandas loaded the input cannot be a DataFrame
+    pd = sys.modules.get('pandas')
+    if pd is not None and isinstance(properties, pd.DataFrame):
+        return [{key: value for key, value in row.items() if not pd.isna(value)}
+                for row in properties.to_dict('records')]
+    return list(properties)
 
 class MLPredictionService:
-    """Machine Learning service for property price prediction"""
+    """Machine Learning service for property price prediction
+
+    The fitted model and scaler live together in one bundle dict that is
+    replaced with a single assignment, so a prediction always uses a
+    matching pair even while a retrain finishes. Edits call
+    request_retrain(), which wakes a background worker; it waits until no
+    new request has arrived for Config.RETRAIN_DELAY seconds, so a burst
+    of edits costs one fit. Retrains reuse the estimator and
+    hyperparameters of the active version; run_model_selection()
+    cross-validates a candidate grid in a process pool and promotes the
+    most accurate one.
+
+    Each fit is stored as a new version in the model registry and made
+    active; other processes notice the ACTIVE pointer change and load that
+    version, memory-mapping its compiled forest and unpickling the sklearn
+    estimator only if a large batch needs it. A pre-registry
+    models/price_model.pkl is still loaded when no version is active.
+    Retrain and model selection status live as JSON in the registry too,
+    so every worker reports the same state and only one selection run
+    happens at a time.
+
+    Single predictions are memoized in an LRU keyed by the normalized
+    inputs, the bundle generation and the base price version, so a retrain
+    or a pricing change makes older entries unreachable.
+    """
     
-    def __init__(self):
-        self.model: Optional[RandomForestRegressor] = None
-        self.scaler: Optional[StandardScaler] = None
+    def __init__(self, model_path: str = None, registry_dir: str = None):
+        self.model_path = model_path or Config.MODEL_FILE
+        self.registry = ModelRegistry(registry_dir or Config.MODEL_REGISTRY_DIR)
         self.feature_columns = Config.FEATURE_COLUMNS
+        self.pipeline = feature_pipeline
+        self._bundle: Optional[Dict[str, Any]] = None
+        self._active_signature: Optional[tuple] = None
+        self._load_lock = threading.Lock()
+        self._train_lock = threading.Lock()
+        self._retrain = threading.Condition()
+        self._retrain_requested: Optional[float] = None
+        self._worker_pid: Optional[int] = None
+        self._last_duration: Optional[float] = None
+        self._selection_thread: Optional[threading.Thread] = None
+        self._prediction_cache = LRUCache(Config.PREDICTION_CACHE_SIZE)
+        self._cache_versions: Optional[tuple] = None
     
-    def prepare_ml_data(self) -> Optional[pd.DataFrame]:
+    @property
+    def model(self) -> Any:
+        bundle = self._bundle
+        return self._estimator(bundle) if bundle else None
+    
+    @property
+    def scaler(self) -> Any:
+        bundle = self._bundle
+        return bundle['scaler'] if bundle else None
+    
+    def prepare_ml_data(self) -> Optional['pd.DataFrame']:
         """Prepare data for machine learning"""
+        import pandas as pd
         properties = PropertyRepository.load_properties()
         if len(properties) < 5:  # Need minimum data for training
             return None
         
-        # Prepare dataset
-        data = []
-        for prop in properties:
-            if prop.get('harga') and all(key in prop for key in ['luas_tanah', 'luas_bangunan']):
-                row = [
-                    float(prop['luas_tanah']),
-                    float(prop['luas_bangunan']),
-                    int(prop.get('kamar_tidur', 2)),
-                    int(prop.get('kamar_mandi', 1)),
-                    int(prop.get('carport', 0)),
-                    int(prop.get('tahun_dibangun', 2020)),
-                    int(prop.get('lantai', 1)),
-                    float(prop.get('jarak_sekolah', 1000)),
-                    float(prop.get('jarak_rs', 2000)),
-                    float(prop.get('jarak_pasar', 1500)),
-                    encode_categorical(prop.get('jenis_jalan'), Config.JENIS_JALAN_MAP),
-                    encode_categorical(prop.get('kondisi'), Config.KONDISI_MAP),
-                    encode_categorical(prop.get('sertifikat'), Config.SERTIFIKAT_MAP),
-                    float(prop['harga'])
-                ]
-                data.append(row)
+        # Only listings with a price and both areas are training examples
+        rows = [p for p in properties
+                if p.get('harga') and all(key in p for key in ['luas_tanah', 'luas_bangunan'])]
+        if len(rows) < 5:
+            return None
         
-        if len(data) < 5:
+        features = self.pipeline.transform(rows)
+        target = numeric_column(rows, 'harga', 0)
+        usable = ~np.isnan(features).any(axis=1) & ~np.isnan(target)
+        if usable.sum() < 5:
             return None
-            
-        columns = self.feature_columns + ['harga']
-        df = pd.DataFrame(data, columns=columns)
+        
+        ids = pd.Index([p.get('id') for p in rows], dtype=object)
+        df = pd.DataFrame(features[usable], columns=self.feature_columns, index=ids[usable])
+        df['harga'] = target[usable]
         return df
     
-    def train_model(self) -> bool:
-        """Train the machine learning model"""
-        df = self.prepare_ml_data()
-        if df is None:
-            return False
-        
-        # Prepare features and target
-        X = df[self.feature_columns]
-        y = df['harga']
+    def train_model(self, candidate: Optional[Dict[str, Any]] = None,
+                    selection: Optional[Dict[str, Any]] = None, full: bool = False) -> bool:
+        """Train the machine learning model, register it and swap it in
+
+        ``candidate`` defaults to the estimator spec of the active model;
+        ``selection`` is the cross-validation report that chose it, if any.
+        Unless ``full`` is set, a forest is only extended with trees for
+        the rows added or edited since the active version when that is safe
+        (see _incremental_plan).
+        """
+        with self._train_lock:
+            bundle = self._bundle
+            started = time.perf_counter()
+            data_version = PropertyRepository.data_version()
+            df = self.prepare_ml_data()
+            if df is None:
+                return False
+            
+            # Prepare features and target
+            X = df[self.feature_columns].to_numpy()
+            y = df['harga'].to_numpy()
+            digests = _row_digests(df)
+            
+            plan = None
+            if not full and candidate is None:
+                plan = self._incremental_plan(bundle, digests)
+                if plan is not None and not plan['new'].size and not plan['stale']:
+                    # Same rows as the active model
+                    return True
+            candidate = candidate or (bundle and bundle.get('candidate')) or DEFAULT_CANDIDATE
+            
+            if plan is not None:
+                model, scaler = self._extend_forest(bundle, X, y, plan)
+                # Out-of-bag figures only exist for a full fit; the added
+                # trees have none, so the last full rebuild's are kept under
+                # their own key instead of being passed off as this model's
+                metrics = {}
+                base_training = plan['training']
+                full_metrics = (base_training.get('full_metrics') if base_training.get('mode') == 'incremental'
+                                else bundle.get('metrics')) or {}
+                training = {
+                    'mode': 'incremental',
+                    'base_version': bundle['version'],
+                    'full_version': plan['training'].get('full_version') or bundle['version'],
+                    'full_rows': plan['training']['full_rows'],
+                    'full_metrics': dict(full_metrics),
+                    'steps_since_full': plan['training']['steps_since_full'] + 1,
+                    'changed_since_full': plan['changed_since_full'],
+                    'new_rows': int(plan['new'].size),
+                    'stale_rows': plan['stale'],
+                    'added_trees': plan['trees'],
+                }
+            else:
+                from sklearn.preprocessing import StandardScaler
+                
+                # Scale features
+                scaler = StandardScaler()
+                X_scaled = scaler.fit_transform(X)
+                
+                # Train model; bagged forests give out-of-bag metrics for free
+                model = build_estimator(candidate)
+                if model.get_params().get('bootstrap'):
+                    model.set_params(oob_score=True)
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', UserWarning)
+                    model.fit(X_scaled, y)
+                metrics = _oob_metrics(model, y)
+                training = {'mode': 'full', 'full_rows': len(df),
+                            'steps_since_full': 0, 'changed_since_full': 0}
+            
+            engine = _compile_engine(model, scaler)
+            metadata = {
+                'training_rows': len(df),
+                'dataset_fingerprint': dataset_fingerprint(X, y),
+                'data_version': data_version,
+                'feature_columns': list(self.feature_columns),
+                'candidate': candidate,
+                'metrics': metrics,
+                'training': training,
+                'training_seconds': time.perf_counter() - started,
+            }
+            if selection:
+                best = selection['best']
+                metadata['metrics'].update({'cv_mae': best['mae'], 'cv_r2': best['r2'],
+                                            'single_predict_ms': best['single_predict_ms']})
+                metadata['selection'] = [{k: v for k, v in result.items() if k != 'candidate'}
+                                         for result in selection['results']]
+            
+            # Save model
+            version = None
+            try:
+                version = self.registry.save(model, scaler, engine, metadata, rows=digests)
+                self.registry.activate(version)
+                self._active_signature = self.registry.active_signature()
+                self.registry.prune(Config.MODEL_REGISTRY_KEEP)
+            except Exception as e:
+                print(f"Error saving model: {e}")
+            
+            self._install({
+                'model': model,
+                'scaler': scaler,
+                'engine': engine,
+                'version': version,
+                'data_version': data_version,
+                'trained_at': datetime.now().isoformat(),
+                'training_rows': len(df),
+                'candidate': candidate,
+                'metrics': metadata['metrics'],
+                'training': training,
+            })
+            self._last_duration = time.perf_counter() - started
+            return version is not None
+    
+    def _incremental_plan(self, bundle: Optional[Dict[str, Any]],
+                          digests: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Rows to add to the active forest, or None when a full rebuild is due.
+
+        A full rebuild happens when there is no registered forest to extend,
+        after Config.INCREMENTAL_MAX_STEPS incremental fits, or once the rows
+        added, edited or deleted since the last full fit exceed
+        Config.INCREMENTAL_MAX_DRIFT of the catalog: extra trees cannot
+        forget rows that were edited or removed, so drift has to be bounded.
+        """
+        if not Config.INCREMENTAL_TRAINING or bundle is None or not bundle.get('version'):
+            return None
+        training = bundle.get('training')
+        candidate = bundle.get('candidate') or {}
+        if not training or candidate.get('estimator') not in SUPPORTED_FORESTS:
+            return None
+        if training['steps_since_full'] + 1 > Config.INCREMENTAL_MAX_STEPS:
+            return None
+        seen = self.registry.load_rows(bundle['version'])
+        if seen is None:
+            return None
         
-        # Scale features
-        self.scaler = StandardScaler()
-        X_scaled = self.scaler.fit_transform(X)
+        positions = {row_id: i for i, row_id in enumerate(digests)}
+        new = np.array([positions[row_id] for row_id, digest in digests.items() if seen.get(row_id) != digest],
+                       dtype=np.intp)
+        stale = sum(1 for row_id, digest in seen.items() if digests.get(row_id) != digest)
+        changed = training['changed_since_full'] + len(new) + stale
+        if changed > Config.INCREMENTAL_MAX_DRIFT * max(training['full_rows'], len(digests)):
+            return None
         
-        # Train model
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.model.fit(X_scaled, y)
+        n_estimators = candidate.get('params', {}).get('n_estimators', 100)
+        return {
+            'new': new,
+            'stale': stale,
+            'changed_since_full': changed,
+            # Keep each row's share of the trees roughly what a full fit gives it
+            'trees': max(1, math.ceil(n_estimators * len(new) / len(digests))),
+            'training': training,
+        }
+    
+    def _extend_forest(self, bundle: Dict[str, Any], X: np.ndarray, y: np.ndarray,
+                       plan: Dict[str, Any]):
+        """Copy of the active forest with plan['trees'] more trees, fitted on the
+        new rows plus a replay sample of unchanged rows so the new trees see
+        the whole price range; the scaler is kept so old splits stay valid"""
+        base = self._estimator(bundle)
+        scaler = bundle['scaler']
+        new = plan['new']
+        old = np.setdiff1d(np.arange(len(y)), new, assume_unique=True)
+        replay = min(len(old), max(len(new), Config.INCREMENTAL_REPLAY_ROWS))
+        rng = np.random.default_rng(len(base.estimators_))
+        rows = np.concatenate([new, rng.choice(old, size=replay, replace=False)])
         
-        # Save model
+        # Never mutate the forest that is serving predictions
+        model = copy.copy(base)
+        model.estimators_ = list(base.estimators_)
+        for attr in ('oob_score_', 'oob_prediction_'):
+            # Out-of-bag scores describe the base fit only
+            model.__dict__.pop(attr, None)
+        model.set_params(warm_start=True, oob_score=False,
+                         n_estimators=len(base.estimators_) + plan['trees'])
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            model.fit(scaler.transform(X[rows]), y[rows])
+        model.set_params(warm_start=False)
+        return model, scaler
+    
+    def _install(self, bundle: Dict[str, Any]) -> None:
+        """Publish a bundle with a single reference assignment"""
+        bundle['generation'] = next(_bundle_generations)
+        self._bundle = bundle
+    
+    def _load_version(self, version: str) -> Dict[str, Any]:
+        meta = self.registry.meta(version)
+        engine = self.registry.load_engine(version) if Config.ML_COMPILED_INFERENCE else None
+        return {
+            # Unpickled on first use when there is a compiled forest
+            'model': None if engine is not None else self.registry.load_estimator(version),
+            'scaler': self.registry.load_scaler(version),
+            'engine': engine,
+            'version': version,
+            'data_version': meta.get('data_version'),
+            'trained_at': meta.get('created_at'),
+            'training_rows': meta.get('training_rows'),
+            'candidate': meta.get('candidate'),
+            'metrics': meta.get('metrics', {}),
+            'training': meta.get('training'),
+        }
+    
+    def _load_legacy(self) -> Dict[str, Any]:
+        """Bundle from a models/price_model.pkl written before the registry"""
+        with open(self.model_path, 'rb') as f:
+            model_data = pickle.load(f)
+        return {
+            'model': model_data['model'],
+            'scaler': model_data['scaler'],
+            'engine': _compile_engine(model_data['model'], model_data['scaler']),
+            'version': None,
+            'data_version': model_data.get('version'),
+            'trained_at': model_data.get('trained_at'),
+            'training_rows': model_data.get('training_rows'),
+            'candidate': None,
+            'metrics': {},
+            'training': None,
+        }
+    
+    def load_model(self) -> bool:
+        """Load the active model version (or the legacy pickle)"""
         try:
-            with open('models/price_model.pkl', 'wb') as f:
-                pickle.dump({'model': self.model, 'scaler': self.scaler}, f)
+            signature = self.registry.active_signature()
+            version = self.registry.active_version()
+            if version is not None:
+                bundle = self._load_version(version)
+            elif os.path.exists(self.model_path):
+                bundle = self._load_legacy()
+            else:
+                return self.train_model()
+            self._active_signature = signature
+            self._install(bundle)
             return True
         except Exception as e:
-            print(f"Error saving model: {e}")
+            print(f"Error loading model: {e}")
             return False
     
-    def load_model(self) -> bool:
-        """Load the trained ML model"""
+    def _current_bundle(self) -> Optional[Dict[str, Any]]:
+        """The bundle to predict with, reloaded if the active version changed"""
+        bundle = self._bundle
+        signature = self.registry.active_signature()
+        if bundle is None or (signature is not None and signature != self._active_signature):
+            with self._load_lock:
+                if self._bundle is bundle:
+                    self.load_model()
+            bundle = self._bundle
+        return bundle
+    
+    def _estimator(self, bundle: Dict[str, Any]) -> Any:
+        """The sklearn estimator of a bundle, unpickled on first use"""
+        if bundle['model'] is None:
+            with self._load_lock:
+                if bundle['model'] is None:
+                    bundle['model'] = self.registry.load_estimator(bundle['version'])
+        return bundle['model']
+    
+    def list_model_versions(self) -> List[Dict[str, Any]]:
+        """Metadata of stored model versions, oldest first, with the active one flagged"""
+        active = self.registry.active_version()
+        return [{**meta, 'active': meta['version'] == active} for meta in self.registry.versions()]
+    
+    def activate_model(self, version: str) -> None:
+        """Make a stored version active in every process"""
+        self.registry.activate(version)
+    
+    def rollback_model(self) -> Optional[str]:
+        """Reactivate the version before the active one; returns it, or None"""
+        return self.registry.rollback()
+    
+    def request_retrain(self) -> None:
+        """Schedule a background retrain; bursts of calls coalesce into one"""
+        with self._retrain:
+            self._retrain_requested = time.monotonic()
+            if self._worker_pid != os.getpid():
+                # Threads do not survive fork, so start one per process
+                self._worker_pid = os.getpid()
+                threading.Thread(target=self._retrain_worker, name='model-retrain', daemon=True).start()
+            self._retrain.notify()
+    
+    def _retrain_worker(self) -> None:
+        while True:
+            with self._retrain:
+                while self._retrain_requested is None:
+                    self._retrain.wait()
+            self._set_training_state('pending')
+            with self._retrain:
+                # Debounce: wait until requests stop arriving
+                while True:
+                    remaining = self._retrain_requested + Config.RETRAIN_DELAY - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._retrain.wait(remaining)
+                self._retrain_requested = None
+            self._set_training_state('training')
+            error = None
+            try:
+                self.train_model()
+            except Exception as e:
+                error = str(e)
+                print(f"Background retraining failed: {e}")
+            self._set_training_state('idle', last_error=error, last_duration=self._last_duration,
+                                     finished_at=datetime.now().isoformat())
+    
+    def _set_training_state(self, state: str, **fields: Any) -> None:
+        """Publish this process's retrain state in the registry for every worker"""
         try:
-            with open('models/price_model.pkl', 'rb') as f:
-                model_data = pickle.load(f)
-                self.model = model_data['model']
-                self.scaler = model_data['scaler']
-            return True
-        except FileNotFoundError:
-            return self.train_model()
+            with self.registry.status_lock:
+                status = self.registry.load_status('training')
+                workers = {pid: value for pid, value in status.get('workers', {}).items()
+                           if int(pid) != os.getpid() and _process_alive(int(pid))}
+                if state != 'idle':
+                    workers[str(os.getpid())] = state
+                status.update(fields, workers=workers)
+                self.registry.save_status('training', status)
         except Exception as e:
-            print(f"Error loading model: {e}")
+            print(f"Error saving training status: {e}")
+    
+    def run_model_selection(self, folds: int = None, max_workers: int = None) -> Optional[Dict[str, Any]]:
+        """Cross-validate the candidate grid and train/activate the winner.
+
+        Blocks the caller while the process pool works; the web app goes
+        through request_model_selection() instead.
+        """
+        df = self.prepare_ml_data()
+        if df is None:
+            return None
+        report = select_model(
+            df[self.feature_columns].to_numpy(), df['harga'].to_numpy(),
+            folds=folds or Config.MODEL_SELECTION_FOLDS,
+            max_workers=max_workers or Config.MODEL_SELECTION_WORKERS or None,
+            max_predict_ms=Config.MODEL_SELECTION_MAX_PREDICT_MS,
+        )
+        self.train_model(candidate=report['best']['candidate'], selection=report)
+        return report
+    
+    def request_model_selection(self) -> bool:
+        """Start model selection in a background thread; False if one is
+        running in any worker process"""
+        with self.registry.status_lock:
+            if self._selection_running(self.registry.load_status('selection')):
+                return False
+            status = {'state': 'running', 'started_at': datetime.now().isoformat(), 'pid': os.getpid()}
+            self.registry.save_status('selection', status)
+            self._selection_thread = threading.Thread(target=self._selection_worker, args=(status,),
+                                                      name='model-selection', daemon=True)
+            self._selection_thread.start()
+        return True
+    
+    def _selection_running(self, status: Dict[str, Any]) -> bool:
+        """Whether a run marked running still has a live process behind it"""
+        if status.get('state') != 'running':
             return False
+        if status.get('pid') == os.getpid() and self._selection_thread is not None:
+            return self._selection_thread.is_alive()
+        return _process_alive(status.get('pid'))
+    
+    def _selection_worker(self, status: Dict[str, Any]) -> None:
+        status = dict(status)
+        try:
+            report = self.run_model_selection()
+            if report is None:
+                status.update(state='skipped', error='Not enough training data')
+            else:
+                status.update(state='done', best=report['best']['name'], folds=report['folds'],
+                              rows=report['rows'],
+                              results=[{k: v for k, v in r.items() if k != 'candidate'}
+                                       for r in report['results']])
+        except Exception as e:
+            status.update(state='failed', error=str(e))
+            print(f"Model selection failed: {e}")
+        status['finished_at'] = datetime.now().isoformat()
+        with self.registry.status_lock:
+            self.registry.save_status('selection', status)
+    
+    def selection_status(self) -> Dict[str, Any]:
+        """State and report of the latest model selection run in any process"""
+        status = self.registry.load_status('selection') or {'state': 'idle'}
+        if status['state'] == 'running' and not self._selection_running(status):
+            status.update(state='failed', error='Worker process exited before finishing')
+        return status
+    
+    def training_status(self) -> Dict[str, Any]:
+        """State of the background trainer and the model currently in use"""
+        bundle = self._bundle
+        if bundle is not None or self.registry.active_signature() is not None:
+            # Follow activations and rollbacks made since the last prediction,
+            # in this process or another; never trains a missing model
+            bundle = self._current_bundle()
+        # Retrains run in whichever worker received the edits
+        shared = self.registry.load_status('training')
+        states = {state for pid, state in shared.get('workers', {}).items() if _process_alive(int(pid))}
+        if self._retrain_requested is not None:
+            states.add('pending')
+        return {
+            'state': 'training' if 'training' in states else 'pending' if 'pending' in states else 'idle',
+            'model_loaded': bundle is not None,
+            'model_version': bundle.get('version') if bundle else None,
+            'data_version': bundle.get('data_version') if bundle else None,
+            'trained_at': bundle.get('trained_at') if bundle else None,
+            'training_rows': bundle.get('training_rows') if bundle else None,
+            'model': candidate_name(bundle['candidate']) if bundle and bundle.get('candidate') else None,
+            'metrics': bundle.get('metrics') if bundle else None,
+            'training': bundle.get('training') if bundle else None,
+            'compiled_inference': bool(bundle and bundle.get('engine') is not None),
+            'last_duration': shared.get('last_duration', self._last_duration),
+            'last_error': shared.get('last_error'),
+        }
     
     def predict_price(self, property_data: Dict[str, Any]) -> Optional[float]:
         """Predict house price using hybrid ML + base price model"""
+        bundle = self._current_bundle()
+        # Encoded once: the cache key and the model share the feature row
+        features = self.pipeline.transform_one(property_data)
+        key = self._cache_key(property_data, features, bundle)
+        if key is not None:
+            cached = self._prediction_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        prediction = self._predict_uncached(property_data, features, bundle)
+        if key is not None and prediction is not None:
+            self._prediction_cache.put(key, prediction)
+        return prediction
+    
+    def _predict_uncached(self, property_data: Dict[str, Any], features: np.ndarray,
+                          bundle: Optional[Dict[str, Any]]) -> Optional[float]:
         # First try ML prediction
-        ml_prediction = self._get_ml_prediction(property_data)
+        ml_prediction = self._get_ml_prediction(features, bundle)
         
         # Always calculate base price prediction
         base_prediction = self._get_base_price_prediction(property_data)
@@ -112,80 +609,107 @@ class MLPredictionService:
         
         return ml_prediction
     
-    def _get_ml_prediction(self, property_data: Dict[str, Any]) -> Optional[float]:
-        """Get ML model prediction"""
-        if self.model is None:
-            if not self.load_model():
-                return None
+    def _cache_key(self, property_data: Dict[str, Any], features: np.ndarray,
+                   bundle: Optional[Dict[str, Any]]) -> Optional[tuple]:
+        """Normalized inputs plus model and base price versions; None if uncacheable"""
+        if np.isnan(features).any():
+            return None
+        features = tuple(features.tolist())
+        # The base price formula looks up the raw strings, defaults included
+        raw = (property_data.get('kondisi', 'baik'),
+               property_data.get('jenis_jalan', 'jalan_sedang'),
+               property_data.get('sertifikat', 'hgb'))
+        engine = pricing_engine()
+        versions = (bundle['generation'] if bundle else None, engine.version if engine else None)
+        if versions != self._cache_versions:
+            # Entries for older versions can never hit again
+            self._prediction_cache.clear()
+            self._cache_versions = versions
+        key = versions + (features, raw)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+    
+    def cache_info(self) -> Dict[str, Any]:
+        """Prediction cache counters for monitoring"""
+        return self._prediction_cache.info()
+    
+    def predict_prices(self, properties: Union[List[Dict[str, Any]], 'pd.DataFrame']) -> List[Optional[float]]:
+        """Predict prices for many properties at once, in input order.
+
+        Same hybrid formula as predict_price, but all rows are encoded into
+        one matrix for a single scaler/model call and the base price formula
+        runs over whole columns. Rows that cannot be priced get None.
+        """
+        rows = _as_records(properties)
+        if not rows:
+            return []
+        ml_predictions = self._get_ml_predictions(rows)
+        base_predictions = self._get_base_price_predictions(rows)
         
-        # Prepare input data
-        features = [
-            float(property_data.get('luas_tanah', 100)),
-            float(property_data.get('luas_bangunan', 80)),
-            int(property_data.get('kamar_tidur', 2)),
-            int(property_data.get('kamar_mandi', 1)),
-            int(property_data.get('carport', 0)),
-            int(property_data.get('tahun_dibangun', 2020)),
-            int(property_data.get('lantai', 1)),
-            float(property_data.get('jarak_sekolah', 1000)),
-            float(property_data.get('jarak_rs', 2000)),
-            float(property_data.get('jarak_pasar', 1500)),
-            encode_categorical(property_data.get('jenis_jalan'), Config.JENIS_JALAN_MAP),
-            encode_categorical(property_data.get('kondisi'), Config.KONDISI_MAP),
-            encode_categorical(property_data.get('sertifikat'), Config.SERTIFIKAT_MAP)
-        ]
+        has_ml = ~np.isnan(ml_predictions)
+        has_base = ~np.isnan(base_predictions)
+        final = np.where(
+            has_ml & has_base,
+            np.maximum(0, 0.7 * ml_predictions + 0.3 * base_predictions),
+            np.where(has_base, base_predictions, ml_predictions)
+        )
+        return [None if np.isnan(value) else float(value) for value in final]
+    
+    def _get_ml_predictions(self, rows: List[Dict[str, Any]]) -> np.ndarray:
+        """ML predictions for all rows, NaN where unavailable"""
+        predictions = np.full(len(rows), np.nan)
+        bundle = self._current_bundle()
+        if bundle is None:
+            return predictions
         
-        # Scale and predict
-        if self.scaler is not None and self.model is not None:
+        features = self.pipeline.transform(rows)
+        valid = ~np.isnan(features).any(axis=1)
+        if valid.any():
             try:
-                features_scaled = self.scaler.transform([features])
-                prediction = self.model.predict(features_scaled)[0]
-                return max(0, prediction)
+                predictions[valid] = self._predict_matrix(bundle, features[valid])
             except Exception as e:
-                print(f"Error predicting price: {e}")
-                return None
-        
-        return None
+                print(f"Error predicting prices: {e}")
+        return predictions
     
-    def _get_base_price_prediction(self, property_data: Dict[str, Any]) -> Optional[float]:
-        """Calculate price using base price methodology"""
+    def _get_base_price_predictions(self, rows: List[Dict[str, Any]]) -> np.ndarray:
+        """Base price formula over whole columns, NaN where unavailable"""
+        engine = pricing_engine()
+        if engine is None:
+            return np.full(len(rows), np.nan)
+        return engine.prices(rows)
+    
+    def _predict_matrix(self, bundle: Dict[str, Any], features: np.ndarray) -> np.ndarray:
+        """Scale and predict with one consistent model/scaler pair"""
+        engine = bundle.get('engine')
+        if engine is not None and len(features) <= SMALL_BATCH_ROWS:
+            return np.maximum(0, engine.predict(features))
+        scaler = bundle['scaler']
+        model = self._estimator(bundle)
+        if hasattr(scaler, 'feature_names_in_'):
+            # Models pickled before the shared pipeline were fitted on a DataFrame
+            import pandas as pd
+            features = pd.DataFrame(features, columns=scaler.feature_names_in_)
+        return np.maximum(0, model.predict(scaler.transform(features)))
+    
+    def _get_ml_prediction(self, features: np.ndarray, bundle: Optional[Dict[str, Any]]) -> Optional[float]:
+        """Get ML model prediction for an encoded feature row"""
+        if bundle is None or np.isnan(features).any():
+            return None
+        
         try:
-            base_prices = BasePriceRepository.load_base_prices()
-            
-            # Basic calculation
-            luas_tanah = float(property_data.get('luas_tanah', 100))
-            luas_bangunan = float(property_data.get('luas_bangunan', 80))
-            kamar_tidur = int(property_data.get('kamar_tidur', 2))
-            kamar_mandi = int(property_data.get('kamar_mandi', 1))
-            lantai = int(property_data.get('lantai', 1))
-            
-            # Base price calculation
-            land_value = luas_tanah * base_prices['base_price_per_sqm_land']
-            building_value = luas_bangunan * base_prices['base_price_per_sqm_building']
-            room_bonus = kamar_tidur * base_prices['room_multiplier']
-            bathroom_bonus = kamar_mandi * base_prices['bathroom_multiplier']
-            floor_bonus = lantai * base_prices.get('floor_multiplier', 10000000)  # Default 10M per floor
-            
-            base_total = land_value + building_value + room_bonus + bathroom_bonus + floor_bonus
-            
-            # Apply multipliers
-            kondisi = property_data.get('kondisi', 'baik')
-            condition_mult = base_prices['condition_multipliers'].get(kondisi, 1.0)
-            
-            jenis_jalan = property_data.get('jenis_jalan', 'jalan_sedang')
-            road_mult = base_prices['road_multipliers'].get(jenis_jalan, 1.0)
-            
-            sertifikat = property_data.get('sertifikat', 'hgb')
-            cert_mult = base_prices['certificate_multipliers'].get(sertifikat, 1.0)
-            
-            final_price = base_total * condition_mult * road_mult * cert_mult
-            
-            return max(0, final_price)
-            
+            return float(self._predict_matrix(bundle, features[np.newaxis, :])[0])
         except Exception as e:
-            print(f"Error calculating base price: {e}")
+            print(f"Error predicting price: {e}")
             return None
     
+    def _get_base_price_prediction(self, property_data: Dict[str, Any]) -> Optional[float]:
+        """Calculate price using base price methodology"""
+        engine = pricing_engine()
+        return engine.price(property_data) if engine is not None else None
+    
     def get_price_range(self, property_data: Dict[str, Any]) -> Optional[Dict[str, float]]:
         """Get price range (min, max, predicted)"""
         predicted_price = self.predict_price(property_data)
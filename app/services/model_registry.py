@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.services.forest_engine import CompiledForest
+from app.storage.files import FileLock, atomic_write_json, atomic_write_text
+
+
+def dataset_fingerprint(X: np.ndarray, y: np.ndarray) -> str:
+    """Stable hash of a training matrix and target"""
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Directory of versioned price model artifacts.
+
+    Layout::
+
+        <root>/ACTIVE                 name of the version in use
+        <root>/<version>/meta.json    rows, dataset fingerprint, metrics, timestamps
+        <root>/<version>/scaler.pkl   fitted StandardScaler (small)
+        <root>/<version>/model.pkl    fitted estimator
+        <root>/<version>/forest/      CompiledForest node arrays (.npy)
+        <root>/<version>/rows.json    listing ID -> row hash the model was fitted on
+        <root>/<name>.json            job status shared by worker processes
+
+    Versions are written to a temp directory and renamed into place, and
+    ACTIVE is replaced atomically, so readers never see a partial version.
+    The forest arrays are loaded memory-mapped, which lets every worker
+    process share one read-only copy and skip unpickling the estimator
+    unless it is actually needed.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = FileLock(os.path.join(root, '.lock'))
+        # Held for read-modify-write of the status files
+        self.status_lock = FileLock(os.path.join(root, '.status.lock'))
+
+    @property
+    def active_path(self) -> str:
+        return os.path.join(self.root, 'ACTIVE')
+
+    def _version_dir(self, version: str) -> str:
+        return os.path.join(self.root, version)
+
+    def active_version(self) -> Optional[str]:
+        try:
+            with open(self.active_path) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def active_signature(self) -> Optional[Tuple[int, int]]:
+        """Changes whenever ACTIVE is replaced; cheap enough to check per request"""
+        try:
+            st = os.stat(self.active_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """Metadata of every stored version, oldest first"""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        metas = []
+        for name in names:
+            meta_path = os.path.join(self.root, name, 'meta.json')
+            if os.path.isfile(meta_path):
+                with open(meta_path) as f:
+                    metas.append(json.load(f))
+        return sorted(metas, key=lambda meta: meta['version'])
+
+    def meta(self, version: str) -> Dict[str, Any]:
+        with open(os.path.join(self._version_dir(version), 'meta.json')) as f:
+            return json.load(f)
+
+    def save(self, model: Any, scaler: Any, engine: Optional[CompiledForest],
+             metadata: Dict[str, Any], rows: Optional[Dict[str, str]] = None) -> str:
+        """Store a new version and return its name; does not activate it"""
+        os.makedirs(self.root, exist_ok=True)
+        created = datetime.now()
+        version = created.strftime('%Y%m%dT%H%M%S%f') + '-' + metadata.get('dataset_fingerprint', '')[:8]
+        meta = {
+            **metadata,
+            'version': version,
+            'created_at': created.isoformat(),
+            'estimator': type(model).__name__,
+            'compiled': engine is not None,
+        }
+        tmp_dir = tempfile.mkdtemp(prefix='.' + version + '.', dir=self.root)
+        try:
+            with open(os.path.join(tmp_dir, 'model.pkl'), 'wb') as f:
+                pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(os.path.join(tmp_dir, 'scaler.pkl'), 'wb') as f:
+                pickle.dump(scaler, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if engine is not None:
+                engine.save(os.path.join(tmp_dir, 'forest'))
+            if rows is not None:
+                with open(os.path.join(tmp_dir, 'rows.json'), 'w') as f:
+                    json.dump(rows, f, separators=(',', ':'))
+            atomic_write_json(os.path.join(tmp_dir, 'meta.json'), meta)
+            os.chmod(tmp_dir, 0o755)
+            os.replace(tmp_dir, self._version_dir(version))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return version
+
+    def activate(self, version: str) -> None:
+        if not os.path.isfile(os.path.join(self._version_dir(version), 'meta.json')):
+            raise KeyError(f'Unknown model version: {version}')
+        with self._lock:
+            atomic_write_text(self.active_path, version)
+
+    def rollback(self) -> Optional[str]:
+        """Activate the newest version older than the active one"""
+        with self._lock:
+            active = self.active_version()
+            older = [meta['version'] for meta in self.versions() if active is None or meta['version'] < active]
+            if not older:
+                return None
+            self.activate(older[-1])
+            return older[-1]
+
+    def prune(self, keep: int) -> List[str]:
+        """Delete all but the ``keep`` newest versions, never the active one"""
+        with self._lock:
+            active = self.active_version()
+            names = [meta['version'] for meta in self.versions()]
+            doomed = [name for name in names[:-keep] if name != active] if keep > 0 else []
+            for name in doomed:
+                shutil.rmtree(self._version_dir(name), ignore_errors=True)
+            return doomed
+
+    def load_status(self, name: str) -> Dict[str, Any]:
+        """A job status written by any process; {} if there is none"""
+        try:
+            with open(os.path.join(self.root, name + '.json')) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_status(self, name: str, status: Dict[str, Any]) -> None:
+        """Replace a job status; call with status_lock held"""
+        atomic_write_json(os.path.join(self.root, name + '.json'), status)
+
+    def load_scaler(self, version: str) -> Any:
+        with open(os.path.join(self._version_dir(version), 'scaler.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+    def load_estimator(self, version: str) -> Any:
+        with open(os.path.join(self._version_dir(version), 'model.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+    def load_engine(self, version: str) -> Optional[CompiledForest]:
+        directory = os.path.join(self._version_dir(version), 'forest')
+        if not os.path.isdir(directory):
+            return None
+        return CompiledForest.load(directory, mmap=True)
+
+    def load_rows(self, version: str) -> Optional[Dict[str, str]]:
+        """Rows a version was fitted on, or None if it did not record them"""
+        try:
+            with open(os.path.join(self._version_dir(version), 'rows.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,132 @@
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+# Estimator name -> module; scikit-learn is only imported when a model is built
+ESTIMATORS = {
+    'RandomForestRegressor': 'sklearn.ensemble',
+    'ExtraTreesRegressor': 'sklearn.ensemble',
+    'GradientBoostingRegressor': 'sklearn.ensemble',
+}
+
+# The model used until a selection run promotes something else
+DEFAULT_CANDIDATE: Dict[str, Any] = {
+    'estimator': 'RandomForestRegressor',
+    'params': {'n_estimators': 100, 'random_state': 42},
+}
+
+# Small grid spanning accuracy against inference cost: fewer/shallower
+# trees predict faster, boosting is sequential but compact
+CANDIDATES: List[Dict[str, Any]] = [
+    DEFAULT_CANDIDATE,
+    {'estimator': 'RandomForestRegressor', 'params': {'n_estimators': 50, 'random_state': 42}},
+    {'estimator': 'RandomForestRegressor', 'params': {'n_estimators': 200, 'random_state': 42}},
+    {'estimator': 'RandomForestRegressor', 'params': {'n_estimators': 100, 'max_depth': 12, 'random_state': 42}},
+    {'estimator': 'RandomForestRegressor', 'params': {'n_estimators': 100, 'min_samples_leaf': 3, 'random_state': 42}},
+    {'estimator': 'ExtraTreesRegressor', 'params': {'n_estimators': 100, 'random_state': 42}},
+    {'estimator': 'GradientBoostingRegressor', 'params': {'n_estimators': 200, 'max_depth': 3, 'random_state': 42}},
+]
+
+# Rows timed for the batch prediction figure
+_TIMING_ROWS = 1000
+
+
+def candidate_name(candidate: Dict[str, Any]) -> str:
+    params = ', '.join(f'{k}={v}' for k, v in sorted(candidate['params'].items()) if k != 'random_state')
+    return f"{candidate['estimator']}({params})"
+
+
+def build_estimator(candidate: Dict[str, Any]) -> Any:
+    """A fresh, unfitted estimator for a candidate spec"""
+    module = importlib.import_module(ESTIMATORS[candidate['estimator']])
+    return getattr(module, candidate['estimator'])(**candidate['params'])
+
+
+def _evaluate_fold(candidate: Dict[str, Any], X: np.ndarray, y: np.ndarray,
+                   train: np.ndarray, test: np.ndarray) -> Dict[str, float]:
+    """Fit on one fold and score it; runs in a worker process"""
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from sklearn.preprocessing import StandardScaler
+    started = time.perf_counter()
+    scaler = StandardScaler().fit(X[train])
+    model = build_estimator(candidate)
+    if 'n_jobs' in model.get_params():
+        # One core per task; the pool already uses them all
+        model.set_params(n_jobs=1)
+    model.fit(scaler.transform(X[train]), y[train])
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    predicted = model.predict(scaler.transform(X[test]))
+    predict_seconds = time.perf_counter() - started
+
+    # Per-request cost: one row through scaler and model
+    row = X[test[:1]]
+    single = []
+    for _ in range(20):
+        started = time.perf_counter()
+        model.predict(scaler.transform(row))
+        single.append(time.perf_counter() - started)
+
+    batch = X[np.resize(test, _TIMING_ROWS)]
+    started = time.perf_counter()
+    model.predict(scaler.transform(batch))
+    batch_seconds = time.perf_counter() - started
+
+    return {
+        'mae': float(mean_absolute_error(y[test], predicted)),
+        'r2': float(r2_score(y[test], predicted)) if len(test) > 1 else float('nan'),
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds,
+        'single_predict_ms': float(np.median(single)) * 1000,
+        'batch_predict_ms': batch_seconds * 1000,
+    }
+
+
+def _summarize(candidate: Dict[str, Any], folds: List[Dict[str, float]]) -> Dict[str, Any]:
+    summary = {'name': candidate_name(candidate), 'candidate': candidate, 'folds': len(folds)}
+    for key in folds[0]:
+        values = np.array([fold[key] for fold in folds])
+        summary[key] = float(np.nanmean(values)) if not np.isnan(values).all() else None
+    summary['mae_std'] = float(np.std([fold['mae'] for fold in folds]))
+    return summary
+
+
+def best_result(results: List[Dict[str, Any]], max_predict_ms: float = 0) -> Optional[Dict[str, Any]]:
+    """Lowest cross-validated MAE among candidates within the latency budget"""
+    eligible = [r for r in results if not max_predict_ms or r['single_predict_ms'] <= max_predict_ms]
+    return min(eligible or results, key=lambda r: r['mae'], default=None)
+
+
+def select_model(X: np.ndarray, y: np.ndarray, candidates: Optional[List[Dict[str, Any]]] = None,
+                 folds: int = 5, max_workers: Optional[int] = None,
+                 max_predict_ms: float = 0) -> Dict[str, Any]:
+    """K-fold cross-validate every candidate in parallel and pick the best.
+
+    Each (candidate, fold) pair is a separate task in a process pool, so
+    the grid spreads over all cores and the calling process only waits.
+    Returns ``{'results': [...], 'best': {...}}`` with per-candidate mean
+    MAE/R² and fit/predict timings, best first.
+    """
+    from sklearn.model_selection import KFold
+    candidates = candidates or CANDIDATES
+    n_splits = max(2, min(folds, len(y)))
+    splits = list(KFold(n_splits=n_splits, shuffle=True, random_state=42).split(X))
+    workers = max_workers or os.cpu_count() or 1
+
+    # Spawn rather than fork: this runs on a background thread of a web
+    # worker whose other threads may hold locks at fork time
+    with ProcessPoolExecutor(max_workers=min(workers, len(candidates) * len(splits)),
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [[pool.submit(_evaluate_fold, candidate, X, y, train, test) for train, test in splits]
+                   for candidate in candidates]
+        results = [_summarize(candidate, [future.result() for future in fold_futures])
+                   for candidate, fold_futures in zip(candidates, futures)]
+
+    best = best_result(results, max_predict_ms)
+    results.sort(key=lambda r: (r is not best, r['mae']))
+    return {'results': results, 'best': best, 'folds': n_splits, 'rows': len(y)}
@@ -0,0 +1,103 @@
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+import numpy as np
+from app.models import BasePriceRepository
+from app.services.features import lookup_column, numeric_column
+
+# year_bonus_per_year is paid for every year a house was built after this
+YEAR_BONUS_BASE = 2000
+
+
+class PricingEngine:
+    """The base price rules compiled from one version of the settings.
+
+    Instances never change after construction, so a prediction can hold one
+    without locking while an admin saves new prices; pricing_engine() swaps
+    in a fresh instance when BasePriceRepository.version() moves on.
+
+    price = (land + building + rooms + bathrooms + floors + carports
+             + year bonus) * condition * road * certificate, floored at 0
+    """
+
+    __slots__ = ('version', 'land', 'building', 'room', 'bathroom', 'floor', 'carport',
+                 'year_bonus', 'condition', 'road', 'certificate')
+
+    def __init__(self, base_prices: Dict[str, Any], version: int = 0):
+        self.version = version
+        self.land = float(base_prices['base_price_per_sqm_land'])
+        self.building = float(base_prices['base_price_per_sqm_building'])
+        self.room = float(base_prices['room_multiplier'])
+        self.bathroom = float(base_prices['bathroom_multiplier'])
+        self.floor = float(base_prices.get('floor_multiplier', 10000000))  # Default 10M per floor
+        self.carport = float(base_prices.get('carport_multiplier', 0))
+        self.year_bonus = float(base_prices.get('year_bonus_per_year', 0))
+        self.condition: Mapping[str, float] = MappingProxyType(dict(base_prices['condition_multipliers']))
+        self.road: Mapping[str, float] = MappingProxyType(dict(base_prices['road_multipliers']))
+        self.certificate: Mapping[str, float] = MappingProxyType(dict(base_prices['certificate_multipliers']))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if hasattr(self, name):
+            raise AttributeError(f'{type(self).__name__} is immutable')
+        object.__setattr__(self, name, value)
+
+    def price(self, property_data: Dict[str, Any]) -> Optional[float]:
+        """Base price of one property, or None if a field is not a number"""
+        try:
+            base_total = (float(property_data.get('luas_tanah', 100)) * self.land
+                          + float(property_data.get('luas_bangunan', 80)) * self.building
+                          + int(property_data.get('kamar_tidur', 2)) * self.room
+                          + int(property_data.get('kamar_mandi', 1)) * self.bathroom
+                          + int(property_data.get('lantai', 1)) * self.floor
+                          + int(property_data.get('carport', 0)) * self.carport
+                          + max(0, int(property_data.get('tahun_dibangun', 2020)) - YEAR_BONUS_BASE) * self.year_bonus)
+
+            multiplier = (self.condition.get(property_data.get('kondisi', 'baik'), 1.0)
+                          * self.road.get(property_data.get('jenis_jalan', 'jalan_sedang'), 1.0)
+                          * self.certificate.get(property_data.get('sertifikat', 'hgb'), 1.0))
+            return max(0, base_total * multiplier)
+        except (TypeError, ValueError) as e:
+            print(f"Error calculating base price: {e}")
+            return None
+
+    def prices(self, rows: List[Dict[str, Any]]) -> np.ndarray:
+        """Base prices for many properties over whole columns, NaN where unavailable"""
+        tahun = numeric_column(rows, 'tahun_dibangun', 2020, integer=True)
+        base_total = (numeric_column(rows, 'luas_tanah', 100) * self.land
+                      + numeric_column(rows, 'luas_bangunan', 80) * self.building
+                      + numeric_column(rows, 'kamar_tidur', 2, integer=True) * self.room
+                      + numeric_column(rows, 'kamar_mandi', 1, integer=True) * self.bathroom
+                      + numeric_column(rows, 'lantai', 1, integer=True) * self.floor
+                      + numeric_column(rows, 'carport', 0, integer=True) * self.carport
+                      + np.maximum(0, tahun - YEAR_BONUS_BASE) * self.year_bonus)
+
+        multiplier = (lookup_column(rows, 'kondisi', self.condition, 'baik', 1.0)
+                      * lookup_column(rows, 'jenis_jalan', self.road, 'jalan_sedang', 1.0)
+                      * lookup_column(rows, 'sertifikat', self.certificate, 'hgb', 1.0))
+        return np.maximum(0, base_total * multiplier)
+
+
+_engine: Optional[PricingEngine] = None
+_engine_version: Optional[int] = None
+_engine_lock = threading.Lock()
+
+
+def pricing_engine() -> Optional[PricingEngine]:
+    """The engine for the current base price settings.
+
+    Checking the version costs one stat; the settings file is only read and
+    compiled again after save_base_prices() bumps it. None if the stored
+    settings are incomplete.
+    """
+    global _engine, _engine_version
+    version = BasePriceRepository.version()
+    if version != _engine_version:
+        with _engine_lock:
+            if version != _engine_version:
+                try:
+                    _engine = PricingEngine(BasePriceRepository.load_base_prices(), version)
+                except (KeyError, TypeError, ValueError, AttributeError) as e:
+                    print(f"Error compiling base prices: {e}")
+                    _engine = None
+                _engine_version = version
+    return _engine
@@ -0,0 +1,159 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, IO, Iterable, Iterator, List, Mapping, Tuple
+from app.models import PropertyRepository
+from app.services.ml_service import ml_service
+
+# Column order used for CSV export (and accepted on import)
+EXPORT_FIELDS = [
+    'id', 'judul_properti', 'kelurahan', 'kecamatan', 'alamat', 'kota',
+    'luas_tanah', 'luas_bangunan', 'kamar_tidur', 'kamar_mandi', 'carport',
+    'tahun_dibangun', 'lantai', 'harga', 'latitude', 'longitude',
+    'jarak_sekolah', 'jarak_rs', 'jarak_pasar', 'jenis_jalan', 'kondisi',
+    'sertifikat', 'nama_penjual', 'nomor_penjual', 'image', 'status', 'created_at'
+]
+
+# Fields the admin form marks as required
+REQUIRED_FIELDS = [
+    'judul_properti', 'kelurahan', 'kecamatan', 'alamat', 'kota',
+    'luas_tanah', 'luas_bangunan', 'kamar_tidur', 'kamar_mandi'
+]
+
+NON_NEGATIVE_FIELDS = [
+    'luas_tanah', 'luas_bangunan', 'kamar_tidur', 'kamar_mandi', 'carport',
+    'lantai', 'harga', 'jarak_sekolah', 'jarak_rs', 'jarak_pasar'
+]
+
+def _whole_number(value: Any) -> int:
+    """int() that also takes integral floats such as "3.0" from spreadsheet exports"""
+    if isinstance(value, int):
+        return value
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"{value!r} is not a whole number")
+    return int(number)
+
+def build_property_fields(values: Mapping[str, Any]) -> Dict:
+    """
+    Convert submitted values (admin form, CSV row or JSON object) into
+    property fields, applying the same defaults as the admin form
+    """
+    return {
+        'judul_properti': values.get('judul_properti'),
+        'kelurahan': values.get('kelurahan'),
+        'kecamatan': values.get('kecamatan'),
+        'alamat': values.get('alamat'),
+        'luas_tanah': _whole_number(values.get('luas_tanah') or 0),
+        'luas_bangunan': _whole_number(values.get('luas_bangunan') or 0),
+        'kamar_tidur': _whole_number(values.get('kamar_tidur') or 2),
+        'kamar_mandi': _whole_number(values.get('kamar_mandi') or 1),
+        'carport': _whole_number(values.get('carport', 0) or 0),
+        'tahun_dibangun': _whole_number(values.get('tahun_dibangun') or 2020),
+        'lantai': _whole_number(values.get('lantai', 1) or 1),
+        'kota': values.get('kota'),
+        'harga': float(values.get('harga') or 0) if values.get('harga') else None,
+        'latitude': float(values.get('latitude') or 0) if values.get('latitude') else None,
+        'longitude': float(values.get('longitude') or 0) if values.get('longitude') else None,
+        'jarak_sekolah': float(values.get('jarak_sekolah', 1000) or 1000),
+        'jarak_rs': float(values.get('jarak_rs', 2000) or 2000),
+        'jarak_pasar': float(values.get('jarak_pasar', 1500) or 1500),
+        'jenis_jalan': values.get('jenis_jalan'),
+        'kondisi': values.get('kondisi'),
+        'sertifikat': values.get('sertifikat'),
+        'nama_penjual': values.get('nama_penjual', ''),
+        'nomor_penjual': values.get('nomor_penjual', '')
+    }
+
+def parse_import_row(row: Mapping[str, Any]) -> Dict:
+    """Validate one imported row and turn it into a complete property record"""
+    missing = [field for field in REQUIRED_FIELDS if row.get(field) in (None, '')]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    try:
+        fields = build_property_fields(row)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"invalid number ({e})")
+    negative = [field for field in NON_NEGATIVE_FIELDS if (fields[field] or 0) < 0]
+    if negative:
+        raise ValueError(f"negative {', '.join(negative)}")
+    return {
+        'id': str(row.get('id') or uuid.uuid4()),
+        **fields,
+        'image': row.get('image') or None,
+        'created_at': row.get('created_at') or datetime.now().isoformat(),
+        'status': row.get('status') or 'available'
+    }
+
+def iter_rows(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, row) pairs from a CSV or NDJSON text stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'ndjson':
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_no, row if isinstance(row, dict) else {'__invalid__': line}
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+def import_properties(stream: IO[str], fmt: str, skip_invalid: bool = False,
+                      retrain: bool = True) -> Dict:
+    """
+    Stream, validate and import listings with a single repository write
+    followed by a single model retrain
+    Without skip_invalid, any invalid row rejects the whole batch.
+    Returns: Dict with imported count and per-line errors
+    """
+    records: List[Dict] = []
+    errors: List[str] = []
+    seen_ids = set()
+    for line_no, row in iter_rows(stream, fmt):
+        try:
+            if '__invalid__' in row:
+                raise ValueError('not a JSON object')
+            record = parse_import_row(row)
+            if record['id'] in seen_ids:
+                raise ValueError(f"duplicate id {record['id']}")
+        except ValueError as e:
+            errors.append(f"line {line_no}: {e}")
+            continue
+        seen_ids.add(record['id'])
+        records.append(record)
+
+    if errors and not skip_invalid:
+        return {'imported': 0, 'errors': errors}
+
+    if records:
+        PropertyRepository.add_properties(records)
+        if retrain:
+            ml_service.request_retrain()
+    return {'imported': len(records), 'errors': errors}
+
+def export_properties(fmt: str, properties: Iterable[Dict] = None) -> Iterator[str]:
+    """Stream the catalog as CSV or NDJSON, one chunk per record"""
+    if properties is None:
+        properties = PropertyRepository.load_properties()
+    if fmt == 'ndjson':
+        for prop in properties:
+            yield json.dumps(prop) + '\n'
+    elif fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for prop in properties:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow({k: ('' if v is None else v) for k, v in prop.items()})
+        yield buffer.getvalue()
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
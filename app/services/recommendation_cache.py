@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from app.storage.files import atomic_write_json
+from app.utils.lru_cache import LRUCache
+
+# Expired disk entries are swept after this many writes
+_SWEEP_EVERY = 100
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query"""
+    return ' '.join(query.lower().split())
+
+
+class RecommendationCache:
+    """Cache of Gemini recommendations for a query against a candidate set.
+
+    The key combines the normalized query, the model name, a hash of the
+    candidate listing IDs in order, and the catalog data version. A catalog
+    change that alters the candidates, or edits any listing, therefore
+    misses instead of serving a stale pick. Values are small JSON-able
+    dicts (picked indices and the explanation).
+
+    Entries live in a TTL + LRU memory cache. With ``directory`` set they
+    are also written there as one JSON file per key, so answers survive
+    restarts and are shared by all workers on the host.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 3600, directory: Optional[str] = None):
+        self.ttl = ttl
+        self.directory = directory
+        self._memory = LRUCache(maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.disk_writes = 0
+
+    @staticmethod
+    def key(query: str, candidate_ids: List[Any], data_version: str, model: str) -> str:
+        digest = hashlib.sha1()
+        for part in (normalize_query(query), model, data_version):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        for candidate_id in candidate_ids:
+            digest.update(str(candidate_id).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._memory.get(key)
+        if value is not None or not self.directory:
+            return value
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.disk_misses += 1
+                return None
+            self.disk_hits += 1
+        self._memory.put(key, value)
+        return value
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('expires_at', 0) <= time.time():
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            return None
+        return entry.get('value')
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        self._memory.put(key, value)
+        if not self.directory:
+            return
+        try:
+            atomic_write_json(self._path(key), {'expires_at': time.time() + self.ttl, 'value': value}, indent=None)
+        except OSError as e:
+            print(f"Error writing recommendation cache: {e}")
+            return
+        with self._lock:
+            self.disk_writes += 1
+            sweep = self.disk_writes % _SWEEP_EVERY == 0
+        if sweep:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Delete expired disk entries; returns how many were removed"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            if self._read_disk(name[:-5]) is None and not os.path.exists(os.path.join(self.directory, name)):
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def info(self) -> Dict[str, Any]:
+        """Counters for monitoring endpoints"""
+        info = self._memory.info()
+        info.update({
+            'disk': bool(self.directory),
+            'disk_hits': self.disk_hits,
+            'disk_misses': self.disk_misses,
+            'disk_writes': self.disk_writes,
+        })
+        return info
@@ -0,0 +1,151 @@
+import math
+import re
+import threading
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+# Bump when the prompt wording or encoding changes, so cached answers for
+# the old prompt are not served for the new one
+PROMPT_VERSION = 'table-v1'
+
+# Candidate columns: (header, field, format); harga is in millions of rupiah
+PROMPT_COLUMNS = [
+    ('i', None, None),
+    ('harga_jt', 'harga', lambda v: f'{v / 1000000:.0f}'),
+    ('kt', 'kamar_tidur', lambda v: f'{v:g}'),
+    ('km', 'kamar_mandi', lambda v: f'{v:g}'),
+    ('lt', 'luas_tanah', lambda v: f'{v:g}'),
+    ('lb', 'luas_bangunan', lambda v: f'{v:g}'),
+    ('carport', 'carport', lambda v: f'{v:g}'),
+    ('kelurahan', 'kelurahan', str),
+    ('kondisi', 'kondisi', str),
+    ('sertifikat', 'sertifikat', str),
+    ('sekolah_m', 'jarak_sekolah', lambda v: f'{v:.0f}'),
+    ('rs_m', 'jarak_rs', lambda v: f'{v:.0f}'),
+    ('pasar_m', 'jarak_pasar', lambda v: f'{v:.0f}'),
+]
+
+_DIGITS = re.compile(r'\d')
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative prompt size estimate without a tokenizer round trip.
+
+    Gemini's tokenizer splits numbers into single digits and averages about
+    four characters per token on the rest, so digits count one each.
+    """
+    digits = len(_DIGITS.findall(text))
+    return digits + math.ceil((len(text) - digits) / 4)
+
+
+def _cell(prop: Dict[str, Any], field: str, fmt) -> str:
+    value = prop.get(field)
+    if value is None or value == '':
+        return '-'
+    try:
+        text = fmt(value)
+    except (TypeError, ValueError):
+        text = str(value)
+    return text.replace('|', '/').replace('\n', ' ')
+
+
+def _row(i: int, prop: Dict[str, Any]) -> str:
+    return '|'.join([str(i)] + [_cell(prop, field, fmt) for _, field, fmt in PROMPT_COLUMNS[1:]])
+
+
+def _render(query: str, rows: List[str]) -> str:
+    header = '|'.join(name for name, _, _ in PROMPT_COLUMNS)
+    return (
+        'Anda adalah asisten properti yang membantu memilih dari properti yang SUDAH DIFILTER.\n'
+        '\n'
+        'Properti yang tersedia (sudah sesuai kriteria dasar, urut dari yang paling cocok; '
+        'harga dalam juta rupiah, luas dalam m2, jarak dalam meter):\n'
+        f'{header}\n'
+        + '\n'.join(rows) + '\n'
+        '\n'
+        f'Query pengguna: "{query}"\n'
+        '\n'
+        'TUGAS: Pilih maksimal 3 properti TERBAIK dari tabel di atas yang paling sesuai dengan query.\n'
+        '\n'
+        'ATURAN:\n'
+        f'- HANYA pilih dari properti yang sudah disediakan (kolom i, 0 hingga {len(rows) - 1})\n'
+        '- Jika query menyebutkan "murah" → pilih yang harga terendah\n'
+        '- Jika query menyebutkan "besar" → pilih yang luas terbesar\n'
+        '- Jika tidak ada preferensi khusus → pilih 2-3 yang representatif\n'
+        '\n'
+        'Responlah HANYA dengan format JSON:\n'
+        '{"property_indices": [0, 1, 2], "explanation": "Penjelasan singkat mengapa dipilih"}'
+    )
+
+
+def build_search_prompt(query: str, candidates: List[Dict[str, Any]], max_tokens: int) -> Tuple[str, int, int]:
+    """The recommendation prompt for candidates already ranked best first.
+
+    Candidates are encoded one pipe-separated row each under a single
+    header, and rows are added in rank order while the estimated size
+    stays within ``max_tokens`` (the best candidate is always included).
+    Returns ``(prompt, candidates included, estimated tokens)``; indices in
+    the model's answer refer to the first that many candidates.
+    """
+    rows = [_row(0, candidates[0])]
+    # Size the fixed text once and format rows only until the budget is
+    # spent; the index bound in the rules can add a token, checked below
+    budget = max_tokens - estimate_tokens(_render(query, rows))
+    for i in range(1, len(candidates)):
+        row = _row(i, candidates[i])
+        cost = estimate_tokens(row) + 1  # the newline
+        if cost > budget:
+            break
+        budget -= cost
+        rows.append(row)
+    used = len(rows)
+    prompt = _render(query, rows[:used])
+    tokens = estimate_tokens(prompt)
+    while tokens > max_tokens and used > 1:
+        used -= 1
+        prompt = _render(query, rows[:used])
+        tokens = estimate_tokens(prompt)
+    return prompt, used, tokens
+
+
+class PromptStats:
+    """Recent search prompt sizes and Gemini response times, for monitoring"""
+
+    def __init__(self, samples: int = 1000):
+        self._lock = threading.Lock()
+        self._recent: 'deque[Tuple[int, int, float]]' = deque(maxlen=samples)
+        self.prompts = 0
+        self.truncated = 0
+        self.invalid = 0
+
+    def record(self, tokens: int, candidates: int, offered: int, latency: float) -> None:
+        with self._lock:
+            self.prompts += 1
+            if candidates < offered:
+                self.truncated += 1
+            self._recent.append((tokens, candidates, latency))
+
+    def record_invalid(self) -> None:
+        """Count an answer that was not the requested JSON object"""
+        with self._lock:
+            self.invalid += 1
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = list(self._recent)
+            info = {'prompts': self.prompts, 'truncated': self.truncated, 'invalid': self.invalid}
+        if not recent:
+            return info
+        tokens = sorted(r[0] for r in recent)
+        latencies = sorted(r[2] for r in recent)
+        info.update({
+            'mean_tokens': sum(tokens) / len(tokens),
+            'max_tokens': tokens[-1],
+            'mean_candidates': sum(r[1] for r in recent) / len(recent),
+        })
+        for p in (50, 90, 99):
+            # Nearest-rank percentile
+            rank = max(0, math.ceil(len(recent) * p / 100) - 1)
+            info[f'p{p}_tokens'] = tokens[rank]
+            info[f'p{p}_latency_ms'] = latencies[rank] * 1000
+        return info
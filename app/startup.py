@@ -0,0 +1,46 @@
+import time
+from typing import Dict
+
+
+def warm_up() -> Dict[str, float]:
+    """Load everything the first request would otherwise pay for.
+
+    Run once in the gunicorn master before workers fork (see
+    gunicorn.conf.py), so the catalog cache, search indexes, model,
+    pricing rules and the pandas/scikit-learn imports are shared
+    copy-on-write instead of being rebuilt per worker. Returns seconds per
+    step.
+    """
+    from app.models import PropertyRepository
+    from app.services.ml_service import ml_service
+    from app.services.pricing import pricing_engine
+
+    timings = {}
+
+    def step(name, fn):
+        started = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            print(f"Warm-up step {name} failed: {e}")
+        timings[name] = time.perf_counter() - started
+
+    step('properties', PropertyRepository.load_properties)
+    step('search_index', PropertyRepository.query_properties)
+    step('stats', PropertyRepository.stats)
+    step('pricing', pricing_engine)
+    step('model', ml_service.load_model)
+    # One prediction imports pandas and touches every inference code path
+    step('prediction', lambda: ml_service.predict_prices([{'luas_tanah': 100, 'luas_bangunan': 80}]))
+    return timings
+
+
+def after_fork() -> None:
+    """Per-process reset for a worker forked from a warmed-up parent.
+
+    Background threads (retraining, journal compaction) are started lazily
+    by the process that needs them, so only inherited connections need
+    dropping here.
+    """
+    from app.models import PropertyRepository
+    PropertyRepository.after_fork()
@@ -0,0 +1,127 @@
+import json
+import os
+import pickle
+import tempfile
+import threading
+from typing import Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+
+def _atomic_write(path: str, write, mode: str = 'w') -> None:
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, data: Any, indent: int = 2) -> None:
+    """Write JSON to a temp file in the same directory, fsync, then rename.
+
+    Readers either see the previous file or the complete new one, never a
+    partially written file.
+    """
+    _atomic_write(path, lambda f: json.dump(data, f, indent=indent))
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """Replace a small text file atomically"""
+    _atomic_write(path, lambda f: f.write(text))
+
+
+def atomic_write_pickle(path: str, obj: Any) -> None:
+    """Pickle ``obj`` to ``path`` with the same temp-file-and-rename guarantee"""
+    _atomic_write(path, lambda f: pickle.dump(obj, f), mode='wb')
+
+
+class FileLock:
+    """Exclusive lock shared by threads and processes (e.g. gunicorn workers).
+
+    Uses ``flock`` on a sidecar lock file. Re-entrant within a thread, so a
+    locked read-modify-write may call other locked helpers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> 'FileLock':
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+
+class VersionStamp:
+    """Monotonic counter kept in a small file and shared by all processes.
+
+    Writers bump it (while holding the matching FileLock) after changing the
+    data it guards. Readers call ``read()``, which costs one ``stat`` and
+    only re-reads the file when it was replaced, to learn whether another
+    process changed the data.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._stat_key = None
+        self._value = 0
+
+    def read(self) -> int:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if key != self._stat_key:
+            try:
+                with open(self.path) as f:
+                    value = int(f.read().strip() or 0)
+            except (FileNotFoundError, ValueError):
+                return self._value
+            self._stat_key = key
+            self._value = value
+        return self._value
+
+    def bump(self) -> int:
+        """Increment the stamp; call with the data's FileLock held"""
+        value = self.read() + 1
+        _atomic_write(self.path, lambda f: f.write(str(value)))
+        return value
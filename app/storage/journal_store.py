@@ -0,0 +1,250 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import List, Dict, Optional, Tuple
+from app.storage.json_store import JsonPropertyStore
+
+
+class JournalPropertyStore(JsonPropertyStore):
+    """Property store that appends mutations to a journal file.
+
+    ``path`` holds the base snapshot and ``journal_path`` an append-only log
+    of one JSON record per line (``{"op": "put", "id": ..., "data": ...}`` or
+    ``{"op": "delete", "id": ...}``). Reads replay the journal on top of the
+    snapshot; when the journal grows the new tail is replayed incrementally.
+    Replaying an entry twice is harmless, so a crash between writing a new
+    snapshot and truncating the journal loses nothing. A torn last line
+    (crash mid-append) is ignored and overwritten by the next append.
+
+    Appends and compaction hold the store's file lock, so several processes
+    can share one journal. Appends need no version stamp bump: other
+    processes see the journal grow (or its inode change) on their next stat.
+
+    Compaction folds the journal into a new snapshot written to a temp file
+    and atomically renamed over the old one. It runs on a background thread
+    once the journal reaches ``compact_threshold`` entries and every
+    ``compact_interval`` seconds while the journal is non-empty.
+    """
+
+    def __init__(self, path: str, journal_path: str, compact_threshold: int = 500,
+                 compact_interval: float = 300.0, fsync: bool = True):
+        super().__init__(path)
+        self.journal_path = journal_path
+        self.compact_threshold = compact_threshold
+        self.compact_interval = compact_interval
+        self.fsync = fsync
+        self._journal_ino: Optional[int] = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._compacting = False
+        self._compactor_pid: Optional[int] = None
+        self.compactions = 0
+
+    def _journal_stat(self):
+        try:
+            return os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None
+
+    def _ensure_fresh(self) -> None:
+        """Reload the snapshot, or replay only the new journal tail"""
+        signature = self._stat_signature()
+        journal = self._journal_stat()
+        journal_ino = journal.st_ino if journal else None
+        journal_size = journal.st_size if journal else 0
+
+        if (signature == self._signature and self._loaded_writes == self._writes
+                and journal_ino == self._journal_ino and journal_size >= self._journal_offset):
+            if journal_size == self._journal_offset:
+                self.hits += 1
+                return
+            # Another writer appended; apply just the new entries
+            self.misses += 1
+            self._replay()
+            return
+
+        self.misses += 1
+        self._install(self._read_file())
+        self._signature = signature
+        self._loaded_writes = self._writes
+        self._journal_ino = journal_ino
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._replay()
+
+    def _version_token(self) -> str:
+        return '%s-%x-%x' % (super()._version_token(), self._journal_ino or 0, self._journal_offset)
+
+    def _replay(self) -> None:
+        """Apply complete journal lines past the current offset"""
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return
+        applied = 0
+        with f:
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # torn or in-progress append
+                self._journal_offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    print(f"Skipping corrupt journal entry in {self.journal_path}")
+                    continue
+                self._apply(entry)
+                applied += 1
+        if applied:
+            self._journal_entries += applied
+            self._items = None
+            self._version += 1
+
+    def _apply(self, entry: Dict) -> None:
+        if entry.get('op') == 'put':
+            self._track(self._records.get(entry['id']), entry['data'])
+            self._records[entry['id']] = entry['data']
+        elif entry.get('op') == 'delete':
+            self._track(self._records.pop(entry['id'], None), None)
+
+    def _persist_changes(self, changes: List[Tuple[str, str, Optional[Dict]]]) -> None:
+        """Append the mutations to the journal instead of rewriting the snapshot"""
+        lines = []
+        for op, property_id, property_data in changes:
+            entry = {'op': op, 'id': property_id}
+            if op == 'put':
+                entry['data'] = property_data
+            lines.append(json.dumps(entry, separators=(',', ':')) + '\n')
+        data = ''.join(lines).encode('utf-8')
+
+        self._items = None
+        self._version += 1
+        try:
+            with open(self.journal_path, 'ab') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() != self._journal_offset:
+                    # Drop a torn tail left behind by a crashed append
+                    f.truncate(self._journal_offset)
+                f.write(data)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+                self._journal_ino = os.fstat(f.fileno()).st_ino
+        except Exception:
+            # Memory no longer matches disk; reload on next access
+            self._writes += 1
+            raise
+        self._journal_offset += len(data)
+        self._journal_entries += len(changes)
+
+        self._start_compactor()
+        if self._journal_entries >= self.compact_threshold:
+            self._compact_in_background()
+
+    def save(self, properties: List[Dict]) -> None:
+        """Replace the whole catalog with a fresh snapshot and empty journal"""
+        with self._file_lock, self._lock:
+            self._install(list(properties))
+            try:
+                self._write_file(self._items_view())
+                self._reset_journal(b'')
+            except Exception:
+                self._writes += 1
+                raise
+            self._signature = self._stat_signature()
+            self._loaded_writes = self._writes
+
+    def _reset_journal(self, tail: bytes) -> None:
+        """Atomically replace the journal with ``tail``"""
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+        self._journal_ino = os.stat(self.journal_path).st_ino
+        self._journal_offset = len(tail)
+        self._journal_entries = tail.count(b'\n')
+
+    def compact(self) -> bool:
+        """Fold the journal into a new snapshot.
+
+        The snapshot is serialized outside the lock so readers and writers
+        are not blocked; entries appended meanwhile, by this or another
+        process, are applied and carried over into the new journal.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            if self._journal_entries == 0:
+                return False
+            items = list(self._items_view())
+            offset = self._journal_offset
+            signature = self._signature
+
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + '.',
+                                        suffix='.compact', dir=os.path.dirname(self.path) or '.')
+        os.chmod(tmp_path, 0o644)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(items, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+
+        with self._file_lock, self._lock:
+            if self._stat_signature() != signature:
+                # Snapshot replaced underneath us; retry on the next cycle
+                os.unlink(tmp_path)
+                return False
+            # Apply what other processes appended while the snapshot was
+            # written; it stays in the new journal, so it must be in memory
+            # before the offset is reset past it
+            self._replay()
+            with open(self.journal_path, 'rb') as f:
+                f.seek(offset)
+                tail = f.read(self._journal_offset - offset)
+            os.replace(tmp_path, self.path)
+            self._stamp.bump()
+            self._reset_journal(tail)
+            self._signature = self._stat_signature()
+            self.compactions += 1
+            return True
+
+    def _compact_in_background(self) -> None:
+        if self._compacting:
+            return
+        self._compacting = True
+
+        def run():
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Journal compaction failed: {e}")
+            finally:
+                self._compacting = False
+
+        threading.Thread(target=run, name='journal-compaction', daemon=True).start()
+
+    def _start_compactor(self) -> None:
+        """Start the periodic compaction thread once per process"""
+        if self._compactor_pid == os.getpid() or self.compact_interval <= 0:
+            return
+        self._compactor_pid = os.getpid()
+
+        def loop():
+            while True:
+                time.sleep(self.compact_interval)
+                if self._journal_entries:
+                    self._compact_in_background()
+
+        threading.Thread(target=loop, name='journal-compactor', daemon=True).start()
+
+    def cache_info(self) -> Dict:
+        info = super().cache_info()
+        with self._lock:
+            info.update({
+                'journal_entries': self._journal_entries,
+                'journal_bytes': self._journal_offset,
+                'compactions': self.compactions,
+            })
+        return info
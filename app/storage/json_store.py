@@ -0,0 +1,290 @@
+import base64
+import heapq
+import json
+import os
+import threading
+from itertools import islice
+from typing import Any, List, Dict, Optional, Tuple
+from app.storage.files import FileLock, VersionStamp, atomic_write_json
+from app.utils.property_stats import PropertyStats
+from app.utils.property_table import PropertyTable
+from app.utils.search_utils import top_matches
+
+
+class JsonPropertyStore:
+    """Shared in-memory snapshot of the properties JSON file.
+
+    The file is parsed once and the parsed list is reused until the file's
+    mtime or size changes, or until a write in this process bumps the
+    write counter. ``version`` increases every time the snapshot is
+    replaced so derived caches can key on it.
+
+    Writes take an exclusive file lock, re-check freshness under it, replace
+    the file atomically and bump a version stamp file, so several worker
+    processes can share the file without lost updates or torn reads, and
+    each process notices another's write with a couple of ``stat`` calls.
+
+    Records are held in an insertion-ordered id -> record dict, which doubles
+    as the primary key index: lookups, in-place updates and deletes by id are
+    O(1) and file order is preserved without a separate position table.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(path + '.lock')
+        self._stamp = VersionStamp(path + '.version')
+        self._records: Dict[str, Dict] = {}
+        self._items: Optional[List[Dict]] = None
+        self._table: Optional[PropertyTable] = None
+        self._table_version = -1
+        self._stats: Optional[PropertyStats] = None
+        self._positions: Dict[str, int] = {}
+        self._positions_version = -1
+        self._signature: Optional[Tuple[int, ...]] = None
+        self._writes = 0
+        self._loaded_writes = -1
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _stat_signature(self) -> Optional[Tuple[int, ...]]:
+        """Return (stamp, inode, mtime_ns, size) of the backing file, or None if missing"""
+        stamp = self._stamp.read()
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stamp, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _read_file(self) -> List[Dict]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def _ensure_fresh(self) -> None:
+        """Reload the snapshot if the file or the write version changed"""
+        # Stat before reading so a write racing the read forces another reload
+        signature = self._stat_signature()
+        if signature == self._signature and self._loaded_writes == self._writes:
+            self.hits += 1
+            return
+        self.misses += 1
+        self._install(self._read_file())
+        self._signature = signature
+        self._loaded_writes = self._writes
+
+    def _install(self, properties: List[Dict]) -> None:
+        """Replace the snapshot and rebuild the id index"""
+        self._records = {p['id']: p for p in properties}
+        self._items = None
+        self._stats = None
+        self._version += 1
+
+    def _items_view(self) -> List[Dict]:
+        if self._items is None:
+            self._items = list(self._records.values())
+        return self._items
+
+    def _position_index(self) -> Dict[str, int]:
+        """id -> position in the list view, rebuilt once per version"""
+        if self._positions_version != self._version:
+            self._positions = {p['id']: i for i, p in enumerate(self._items_view())}
+            self._positions_version = self._version
+        return self._positions
+
+    def _table_view(self) -> PropertyTable:
+        """Columnar copy of the snapshot, rebuilt only when the version moves"""
+        if self._table is None or self._table_version != self._version:
+            self._table = PropertyTable(self._items_view())
+            self._table_version = self._version
+        return self._table
+
+    def _track(self, old: Optional[Dict], new: Optional[Dict]) -> None:
+        """Keep the dashboard aggregates in step with a record change"""
+        if self._stats is not None:
+            if old is not None:
+                self._stats.remove(old)
+            if new is not None:
+                self._stats.add(new)
+
+    def _write_file(self, properties: List[Dict]) -> None:
+        """Atomically replace the file; call with the file lock held"""
+        atomic_write_json(self.path, properties)
+        self._stamp.bump()
+
+    def _persist_changes(self, changes: List[Tuple[str, str, Optional[Dict]]]) -> None:
+        """Persist (op, id, record) mutations already applied in memory"""
+        self._commit()
+
+    def _commit(self) -> None:
+        """Persist the in-memory records after a mutation"""
+        self._items = None
+        self._version += 1
+        try:
+            self._write_file(self._items_view())
+        except Exception:
+            # Memory no longer matches disk; reload on next access
+            self._writes += 1
+            raise
+        self._writes += 1
+        self._signature = self._stat_signature()
+        self._loaded_writes = self._writes
+
+    def load(self) -> List[Dict]:
+        """Return a shallow copy of the cached property list"""
+        with self._lock:
+            self._ensure_fresh()
+            return list(self._items_view())
+
+    def get(self, property_id: str) -> Optional[Dict]:
+        """Look up a single record by id"""
+        with self._lock:
+            self._ensure_fresh()
+            return self._records.get(property_id)
+
+    def others(self, property_id: str, limit: int) -> List[Dict]:
+        """The first ``limit`` records in file order other than ``property_id``"""
+        with self._lock:
+            self._ensure_fresh()
+            # Stops after ``limit`` records instead of copying the list view
+            return list(islice((p for key, p in self._records.items() if key != property_id), limit))
+
+    def save(self, properties: List[Dict]) -> None:
+        """Write properties to disk and install them as the current snapshot"""
+        with self._file_lock, self._lock:
+            self._install(list(properties))
+            self._commit()
+
+    def add(self, property_data: Dict) -> None:
+        """Append a new record"""
+        with self._file_lock, self._lock:
+            self._ensure_fresh()
+            self._track(self._records.get(property_data['id']), property_data)
+            self._records[property_data['id']] = property_data
+            self._persist_changes([('put', property_data['id'], property_data)])
+
+    def add_many(self, properties: List[Dict]) -> None:
+        """Append many records with a single write"""
+        if not properties:
+            return
+        with self._file_lock, self._lock:
+            self._ensure_fresh()
+            duplicates = [p['id'] for p in properties if p['id'] in self._records]
+            if duplicates:
+                raise ValueError(f"Property ids already exist: {', '.join(duplicates[:5])}")
+            for p in properties:
+                self._track(None, p)
+                self._records[p['id']] = p
+            self._persist_changes([('put', p['id'], p) for p in properties])
+
+    def update(self, property_id: str, property_data: Dict) -> bool:
+        """Replace a record in place, keeping its position in the file"""
+        with self._file_lock, self._lock:
+            self._ensure_fresh()
+            if property_id not in self._records:
+                return False
+            self._track(self._records[property_id], property_data)
+            self._records[property_id] = property_data
+            self._persist_changes([('put', property_id, property_data)])
+            return True
+
+    def delete(self, property_id: str) -> bool:
+        """Remove a record by id"""
+        with self._file_lock, self._lock:
+            self._ensure_fresh()
+            old = self._records.pop(property_id, None)
+            if old is None:
+                return False
+            self._track(old, None)
+            self._persist_changes([('delete', property_id, None)])
+            return True
+
+    def _version_token(self) -> str:
+        if self._signature is None:
+            return '0'
+        return '-'.join('%x' % v for v in self._signature)
+
+    def data_version(self) -> str:
+        """Token that changes whenever the stored data changes, in any process"""
+        with self._lock:
+            self._ensure_fresh()
+            return self._version_token()
+
+    def page(self, cursor: Optional[str], limit: int) -> Tuple[List[Dict], Optional[str]]:
+        """Return up to ``limit`` records after ``cursor`` and the next cursor.
+
+        The cursor names the last record returned (plus its position as a
+        fallback if that record has since been deleted), so paging stays
+        stable while records are appended or edited.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            items = self._items_view()
+            start = 0
+            if cursor:
+                try:
+                    position, _, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition(':')
+                    position = int(position)
+                except ValueError:
+                    raise ValueError('Invalid cursor')
+                if 0 <= position < len(items) and items[position]['id'] == last_id:
+                    start = position + 1
+                else:
+                    start = self._position_index().get(last_id, position - 1) + 1
+            page = items[start:start + limit]
+        next_cursor = None
+        if page and start + len(page) < len(items):
+            last = start + len(page) - 1
+            next_cursor = base64.urlsafe_b64encode(f"{last}:{page[-1]['id']}".encode()).decode()
+        return page, next_cursor
+
+    def query(self, budget_min: Optional[int] = None, budget_max: Optional[int] = None,
+              min_kamar_tidur: Optional[int] = None) -> List[Dict]:
+        """Listing page filters, answered from the sorted price index"""
+        with self._lock:
+            self._ensure_fresh()
+            table = self._table_view()
+        return table.query(budget_min, budget_max, min_kamar_tidur)
+
+    def top_matches(self, criteria: Dict[str, Any], k: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """Best-ranked search matches and the match count, scored from the columnar snapshot"""
+        with self._lock:
+            self._ensure_fresh()
+            table = self._table_view()
+        return top_matches(table, criteria, k)
+
+    def stats(self) -> Dict[str, Any]:
+        """Dashboard aggregates, built once and then updated per mutation"""
+        with self._lock:
+            self._ensure_fresh()
+            if self._stats is None:
+                self._stats = PropertyStats(self._items_view())
+            return self._stats.summary()
+
+    def recent(self, limit: int) -> List[Dict]:
+        """The ``limit`` most recently created records, newest first"""
+        with self._lock:
+            self._ensure_fresh()
+            return heapq.nlargest(limit, self._items_view(), key=lambda p: p.get('created_at') or '')
+
+    def invalidate(self) -> None:
+        """Force the next read to reload from disk"""
+        with self._lock:
+            self._writes += 1
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def cache_info(self) -> Dict:
+        """Cache hit/miss counters for monitoring"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'version': self._version,
+                'size': len(self._records),
+            }
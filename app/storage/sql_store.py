@@ -0,0 +1,342 @@
+import threading
+from typing import Any, List, Dict, Optional, Tuple
+from sqlalchemy import (
+    JSON, Column, Float, Index, Integer, MetaData, String, Table,
+    create_engine, delete, func, insert, select, update
+)
+from sqlalchemy.exc import IntegrityError
+from app.storage.json_store import JsonPropertyStore
+from app.utils.ranking import rank_properties
+
+metadata = MetaData()
+
+# The full record lives in ``data``; the other columns are normalized copies
+# of the fields we filter and sort on, so queries can use the indexes.
+properties_table = Table(
+    'properties', metadata,
+    Column('seq', Integer, primary_key=True, autoincrement=True),
+    Column('id', String(64), nullable=False, unique=True),
+    Column('harga', Float),
+    Column('kamar_tidur', Integer),
+    Column('kamar_mandi', Integer),
+    Column('luas_tanah', Float),
+    Column('luas_bangunan', Float),
+    Column('carport', Integer),
+    Column('jarak_sekolah', Float),
+    Column('jarak_rs', Float),
+    Column('jarak_pasar', Float),
+    Column('kelurahan', String(100)),   # lower-cased
+    Column('kondisi', String(50)),      # lower-cased
+    Column('sertifikat', String(20)),   # upper-cased
+    Column('status', String(20)),
+    Column('created_at', String(32)),
+    Column('data', JSON, nullable=False),
+    Index('ix_properties_harga', 'harga'),
+    Index('ix_properties_kamar_tidur', 'kamar_tidur'),
+    Index('ix_properties_kamar_mandi', 'kamar_mandi'),
+    Index('ix_properties_kelurahan', 'kelurahan'),
+    Index('ix_properties_status', 'status'),
+    Index('ix_properties_created_at', 'created_at'),
+)
+
+# Single-row table holding a version counter bumped by every write, so each
+# process can tell cheaply whether its cached list is still current.
+property_meta_table = Table(
+    'property_meta', metadata,
+    Column('key', String(32), primary_key=True),
+    Column('version', Integer, nullable=False),
+)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None and value != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+
+def _lower(value: Any) -> Optional[str]:
+    return value.lower() if isinstance(value, str) else None
+
+
+def _row_values(property_data: Dict) -> Dict:
+    """Map a property record onto table columns"""
+    return {
+        'id': property_data['id'],
+        'harga': _to_float(property_data.get('harga')),
+        'kamar_tidur': _to_int(property_data.get('kamar_tidur')),
+        'kamar_mandi': _to_int(property_data.get('kamar_mandi')),
+        'luas_tanah': _to_float(property_data.get('luas_tanah')),
+        'luas_bangunan': _to_float(property_data.get('luas_bangunan')),
+        'carport': _to_int(property_data.get('carport')),
+        'jarak_sekolah': _to_float(property_data.get('jarak_sekolah')),
+        'jarak_rs': _to_float(property_data.get('jarak_rs')),
+        'jarak_pasar': _to_float(property_data.get('jarak_pasar')),
+        'kelurahan': _lower(property_data.get('kelurahan')),
+        'kondisi': _lower(property_data.get('kondisi')),
+        'sertifikat': property_data['sertifikat'].upper() if isinstance(property_data.get('sertifikat'), str) else None,
+        'status': property_data.get('status'),
+        'created_at': property_data.get('created_at'),
+        'data': property_data,
+    }
+
+
+def normalize_database_url(url: str) -> str:
+    """Accept Heroku/Replit style postgres:// URLs"""
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+class SqlPropertyStore:
+    """Property store backed by SQLite or PostgreSQL through SQLAlchemy.
+
+    Single-record reads and all filtering run as indexed queries. The full
+    list used by listing pages is cached per process and revalidated with a
+    one-row version query instead of being re-selected on every request.
+    """
+
+    def __init__(self, database_url: str):
+        self.engine = create_engine(normalize_database_url(database_url), future=True)
+        metadata.create_all(self.engine)
+        self._lock = threading.RLock()
+        self._items: Optional[List[Dict]] = None
+        self._loaded_version: Optional[int] = None
+        self._stats: Optional[Dict] = None
+        self._stats_version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        with self.engine.begin() as conn:
+            if conn.execute(select(property_meta_table.c.version)).first() is None:
+                conn.execute(insert(property_meta_table).values(key='properties', version=0))
+
+    def after_fork(self) -> None:
+        """Forget pooled connections opened before a fork; the parent keeps
+        using them, so the child must not close them"""
+        self.engine.dispose(close=False)
+
+    @property
+    def version(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(select(property_meta_table.c.version)).scalar_one()
+
+    def _bump_version(self, conn) -> None:
+        conn.execute(update(property_meta_table).values(version=property_meta_table.c.version + 1))
+
+    def _select_records(self, *conditions) -> List[Dict]:
+        query = select(properties_table.c.data).where(*conditions).order_by(properties_table.c.seq)
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(query)]
+
+    def load(self) -> List[Dict]:
+        """Return all properties in insertion order"""
+        with self._lock:
+            current = self.version
+            if self._items is not None and current == self._loaded_version:
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._items = self._select_records()
+                self._loaded_version = current
+            return list(self._items)
+
+    def data_version(self) -> str:
+        return str(self.version)
+
+    def page(self, cursor: Optional[str], limit: int) -> Tuple[List[Dict], Optional[str]]:
+        """Keyset pagination on the insertion sequence"""
+        after = int(cursor) if cursor else 0
+        t = properties_table.c
+        query = select(t.seq, t.data).where(t.seq > after).order_by(t.seq).limit(limit + 1)
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).all()
+        next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+        return [row[1] for row in rows[:limit]], next_cursor
+
+    def get(self, property_id: str) -> Optional[Dict]:
+        """Look up a single record through the unique id index"""
+        query = select(properties_table.c.data).where(properties_table.c.id == property_id)
+        with self.engine.connect() as conn:
+            row = conn.execute(query).first()
+        return row[0] if row else None
+
+    def others(self, property_id: str, limit: int) -> List[Dict]:
+        """The first ``limit`` records in insertion order other than ``property_id``"""
+        t = properties_table.c
+        query = select(t.data).where(t.id != property_id).order_by(t.seq).limit(limit)
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(query)]
+
+    def save(self, properties: List[Dict]) -> None:
+        """Replace the whole catalog"""
+        with self.engine.begin() as conn:
+            conn.execute(delete(properties_table))
+            if properties:
+                conn.execute(insert(properties_table), [_row_values(p) for p in properties])
+            self._bump_version(conn)
+
+    def add(self, property_data: Dict) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(insert(properties_table).values(**_row_values(property_data)))
+            self._bump_version(conn)
+
+    def add_many(self, properties: List[Dict]) -> None:
+        """Insert many records in one transaction"""
+        if not properties:
+            return
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(properties_table), [_row_values(p) for p in properties])
+                self._bump_version(conn)
+        except IntegrityError as e:
+            raise ValueError(f"Property ids already exist: {e.orig}")
+
+    def update(self, property_id: str, property_data: Dict) -> bool:
+        values = _row_values(property_data)
+        del values['id']
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(properties_table).where(properties_table.c.id == property_id).values(**values)
+            )
+            if result.rowcount == 0:
+                return False
+            self._bump_version(conn)
+        return True
+
+    def delete(self, property_id: str) -> bool:
+        with self.engine.begin() as conn:
+            result = conn.execute(delete(properties_table).where(properties_table.c.id == property_id))
+            if result.rowcount == 0:
+                return False
+            self._bump_version(conn)
+        return True
+
+    def count(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(properties_table)).scalar_one()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._items = None
+
+    def query(self, budget_min: Optional[int] = None, budget_max: Optional[int] = None,
+              min_kamar_tidur: Optional[int] = None) -> List[Dict]:
+        """Listing page filters, evaluated in the database"""
+        t = properties_table.c
+        conditions = []
+        if budget_min:
+            conditions.append(func.coalesce(t.harga, 0) >= budget_min)
+        if budget_max:
+            conditions.append(func.coalesce(t.harga, 0) <= budget_max)
+        if min_kamar_tidur:
+            conditions.append(func.coalesce(t.kamar_tidur, 0) >= min_kamar_tidur)
+        return self._select_records(*conditions)
+
+    @staticmethod
+    def _criteria_conditions(criteria: Dict[str, Any]) -> List[Any]:
+        """Database equivalent of search_utils.filter_properties_strict"""
+        t = properties_table.c
+        conditions = []
+        if 'kamar_tidur' in criteria:
+            conditions.append(func.coalesce(t.kamar_tidur, 0) == criteria['kamar_tidur'])
+        if 'kamar_mandi' in criteria:
+            conditions.append(func.coalesce(t.kamar_mandi, 0) == criteria['kamar_mandi'])
+        if 'min_luas_tanah' in criteria:
+            conditions.append(func.coalesce(t.luas_tanah, 0) >= criteria['min_luas_tanah'])
+        if 'min_luas_bangunan' in criteria:
+            conditions.append(func.coalesce(t.luas_bangunan, 0) >= criteria['min_luas_bangunan'])
+        if 'min_carport' in criteria:
+            conditions.append(func.coalesce(t.carport, 0) >= criteria['min_carport'])
+        if 'kelurahan' in criteria:
+            conditions.append(func.coalesce(t.kelurahan, '') == criteria['kelurahan'].lower())
+        if 'sertifikat' in criteria:
+            conditions.append(func.coalesce(t.sertifikat, '') == criteria['sertifikat'].upper())
+        if 'budget_range' in criteria:
+            min_budget, max_budget = criteria['budget_range']
+            conditions.append(t.harga != 0)
+            conditions.append(t.harga.between(min_budget, max_budget))
+        if 'max_distance_school' in criteria:
+            conditions.append(func.coalesce(t.jarak_sekolah, 9999) <= criteria['max_distance_school'])
+        if 'max_distance_hospital' in criteria:
+            conditions.append(func.coalesce(t.jarak_rs, 9999) <= criteria['max_distance_hospital'])
+        if 'max_distance_market' in criteria:
+            conditions.append(func.coalesce(t.jarak_pasar, 9999) <= criteria['max_distance_market'])
+        if 'kondisi' in criteria:
+            conditions.append(func.coalesce(t.kondisi, '') == criteria['kondisi'].lower())
+        return conditions
+
+    def top_matches(self, criteria: Dict[str, Any], k: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """Best-ranked search matches and the match count"""
+        matches = self._select_records(*self._criteria_conditions(criteria))
+        return rank_properties(matches, criteria, k), len(matches)
+
+    def stats(self) -> Dict[str, Any]:
+        """Dashboard aggregates from GROUP BY queries, cached per version"""
+        current = self.version
+        with self._lock:
+            if self._stats is not None and self._stats_version == current:
+                return self._stats
+        t = properties_table.c
+        priced = func.nullif(t.harga, 0)
+        with self.engine.connect() as conn:
+            status_rows = conn.execute(
+                select(func.coalesce(t.status, 'available'), func.count()).group_by(func.coalesce(t.status, 'available'))
+            ).all()
+            kelurahan_rows = conn.execute(
+                select(t.data['kelurahan'].as_string(), func.count(), func.avg(priced))
+                .group_by(t.data['kelurahan'].as_string())
+            ).all()
+            average_price = conn.execute(select(func.avg(priced))).scalar()
+        by_status = {status: count for status, count in status_rows}
+        stats = {
+            'total': sum(by_status.values()),
+            'sold': by_status.get('sold', 0),
+            'pending': by_status.get('pending', 0),
+            'available': by_status.get('available', 0),
+            'by_status': by_status,
+            'average_price': average_price or 0,
+            'kelurahan': sorted(
+                ({'kelurahan': name or '-', 'count': count, 'average_price': avg or 0}
+                 for name, count, avg in kelurahan_rows),
+                key=lambda row: (-row['count'], row['kelurahan'])
+            ),
+        }
+        with self._lock:
+            self._stats = stats
+            self._stats_version = current
+        return stats
+
+    def recent(self, limit: int) -> List[Dict]:
+        """The ``limit`` most recently created records, newest first"""
+        query = select(properties_table.c.data).order_by(properties_table.c.created_at.desc()).limit(limit)
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(query)]
+
+    def cache_info(self) -> Dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'version': self._loaded_version,
+                'size': len(self._items) if self._items is not None else None,
+            }
+
+
+def migrate_json_to_sql(json_path: str, database_url: str, force: bool = False) -> int:
+    """One-shot copy of a properties JSON file into the SQL store.
+
+    Refuses to touch a non-empty table unless ``force`` is set, in which
+    case the table is replaced. Returns the number of migrated records.
+    """
+    source = JsonPropertyStore(json_path)
+    properties = source.load()
+    store = SqlPropertyStore(database_url)
+    if store.count() and not force:
+        raise RuntimeError('properties table is not empty; use force to overwrite it')
+    store.save(properties)
+    return len(properties)
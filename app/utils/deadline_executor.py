@@ -0,0 +1,91 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+
+class DeadlineExecutor:
+    """Runs blocking calls on a thread pool and waits for each at most a deadline.
+
+    run() returns the call's result, or None if it failed or the deadline
+    passed. A call that misses its deadline keeps running in the pool, so
+    side effects such as filling a cache still happen ("late" completions);
+    a call still queued at its deadline is cancelled instead. Counts and
+    end-to-end latencies (queue wait included) are kept for monitoring.
+    """
+
+    def __init__(self, max_workers: int = 4, samples: int = 1000, name: str = 'deadline'):
+        self.max_workers = max_workers
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._latencies: 'deque[float]' = deque(maxlen=samples)
+        self.calls = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.late = 0
+        self.errors = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Pool threads do not survive fork; start one per process
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.name)
+                self._pid = os.getpid()
+            return self._executor
+
+    def run(self, fn: Callable[[], Any], timeout: float) -> Optional[Any]:
+        started = time.perf_counter()
+        future = self._pool().submit(self._timed, fn, started)
+        with self._lock:
+            self.calls += 1
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            with self._lock:
+                self.timeouts += 1
+                if future.cancel():
+                    self.cancelled += 1
+                    return None
+            future.add_done_callback(self._count_late)
+            return None
+        except Exception as e:
+            print(f"{self.name} call failed: {e}")
+            return None
+
+    def _timed(self, fn: Callable[[], Any], started: float) -> Any:
+        try:
+            return fn()
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._latencies.append(time.perf_counter() - started)
+
+    def _count_late(self, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            with self._lock:
+                self.late += 1
+
+    def info(self) -> Dict[str, Any]:
+        """Counters and latency percentiles (ms) over the recent calls"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            info = {
+                'calls': self.calls,
+                'timeouts': self.timeouts,
+                'cancelled': self.cancelled,
+                'late': self.late,
+                'errors': self.errors,
+                'timeout_rate': self.timeouts / self.calls if self.calls else None,
+            }
+        for p in (50, 90, 99):
+            # Nearest-rank percentile
+            info[f'p{p}_ms'] = latencies[max(0, math.ceil(len(latencies) * p / 100) - 1)] * 1000 if latencies else None
+        return info
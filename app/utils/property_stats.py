@@ -0,0 +1,67 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+
+
+def _price(property_data: Dict) -> float:
+    """Price counted in averages; 0 for missing, null or non-numeric prices"""
+    harga = property_data.get('harga')
+    return float(harga) if isinstance(harga, (int, float)) and harga else 0.0
+
+
+class PropertyStats:
+    """Running dashboard aggregates over the catalog.
+
+    Keeps the record count, counts by status, and price sums overall and per
+    kelurahan. Stores call ``add``/``remove`` as records change (an update is
+    a remove of the old record plus an add of the new one), so reading the
+    numbers never walks the catalog.
+    """
+
+    def __init__(self, properties: Iterable[Dict] = ()):
+        self.total = 0
+        self.by_status: Counter = Counter()
+        self.price_sum = 0.0
+        self.priced = 0
+        # kelurahan -> [count, price_sum, priced]
+        self.kelurahan: Dict[str, List[float]] = {}
+        for p in properties:
+            self.add(p)
+
+    def _apply(self, property_data: Dict, sign: int) -> None:
+        price = _price(property_data)
+        self.total += sign
+        self.by_status[property_data.get('status') or 'available'] += sign
+        if price:
+            self.price_sum += sign * price
+            self.priced += sign
+        name = property_data.get('kelurahan') or '-'
+        row = self.kelurahan.setdefault(name, [0, 0.0, 0])
+        row[0] += sign
+        if price:
+            row[1] += sign * price
+            row[2] += sign
+        if row[0] <= 0:
+            del self.kelurahan[name]
+
+    def add(self, property_data: Dict) -> None:
+        self._apply(property_data, 1)
+
+    def remove(self, property_data: Dict) -> None:
+        self._apply(property_data, -1)
+
+    def summary(self) -> Dict[str, Any]:
+        """Plain-dict snapshot for templates and JSON responses"""
+        return {
+            'total': self.total,
+            'sold': self.by_status.get('sold', 0),
+            'pending': self.by_status.get('pending', 0),
+            'available': self.by_status.get('available', 0),
+            'by_status': {status: count for status, count in self.by_status.items() if count > 0},
+            'average_price': self.price_sum / self.priced if self.priced else 0,
+            'kelurahan': sorted(
+                ({'kelurahan': name, 'count': count,
+                  'average_price': price_sum / priced if priced else 0}
+                 for name, (count, price_sum, priced) in self.kelurahan.items()),
+                key=lambda row: (-row['count'], row['kelurahan'])
+            ),
+        }
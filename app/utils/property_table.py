@@ -0,0 +1,214 @@
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from app.utils.ranking import condition_score, preference_scores, top_k
+
+# Numeric columns and the value filter_properties_strict assumes when a
+# record lacks the field
+NUMERIC_COLUMNS = {
+    'harga': 0,
+    'kamar_tidur': 0,
+    'kamar_mandi': 0,
+    'luas_tanah': 0,
+    'luas_bangunan': 0,
+    'carport': 0,
+    'jarak_sekolah': 9999,
+    'jarak_rs': 9999,
+    'jarak_pasar': 9999,
+}
+
+# Categorical columns and how their values are normalized before comparison
+CATEGORICAL_COLUMNS: Dict[str, Callable[[str], str]] = {
+    'kelurahan': str.lower,
+    'kondisi': str.lower,
+    'sertifikat': str.upper,
+}
+
+# Numeric columns that keep a sorted index for range queries
+RANGE_COLUMNS = ('harga', 'luas_tanah', 'luas_bangunan')
+
+
+def _as_float(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    return math.nan
+
+
+class _Gather:
+    """Column mapping that reads only the given row positions"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], rows: np.ndarray):
+        self.columns = columns
+        self.rows = rows
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name][self.rows]
+
+
+class PropertyTable:
+    """Column-oriented copy of the catalog for vectorized filtering.
+
+    Numeric fields become float64 arrays (NaN where the value is null or not
+    a number, so it never matches a filter) and categorical fields become
+    int32 codes into a per-column vocabulary (-1 for null). Build it once
+    per data version and reuse it across searches.
+
+    ``harga``, ``luas_tanah`` and ``luas_bangunan`` also keep sorted indexes
+    (stable argsort, NaN last), so range filters are answered by binary
+    search and only the candidate rows are checked against the rest of the
+    criteria.
+    """
+
+    def __init__(self, properties: List[Dict]):
+        self.records = list(properties)
+        n = len(self.records)
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.fromiter((_as_float(p.get(name, default)) for p in self.records),
+                              dtype=np.float64, count=n)
+            for name, default in NUMERIC_COLUMNS.items()
+        }
+        self.vocab: Dict[str, Dict[str, int]] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        for name, normalize in CATEGORICAL_COLUMNS.items():
+            vocab: Dict[str, int] = {}
+            codes = np.empty(n, dtype=np.int32)
+            for i, p in enumerate(self.records):
+                value = p.get(name, '')
+                codes[i] = vocab.setdefault(normalize(value), len(vocab)) if isinstance(value, str) else -1
+            self.vocab[name] = vocab
+            self.codes[name] = codes
+
+        # name -> (row positions sorted by value, sorted values, non-NaN count)
+        self._ascending: Dict[str, Tuple[np.ndarray, np.ndarray, int]] = {}
+        for name in RANGE_COLUMNS:
+            self._ascending[name] = self._sorted_index(self.columns[name])
+        self._condition_scores: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @staticmethod
+    def _sorted_index(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        order = np.argsort(values, kind='stable')
+        return order, values[order], int(np.count_nonzero(~np.isnan(values)))
+
+    def range_positions(self, name: str, low: Optional[float] = None, high: Optional[float] = None) -> np.ndarray:
+        """Positions of rows with low <= value <= high, ordered by value"""
+        order, values, valid = self._ascending[name]
+        start = 0 if low is None else int(np.searchsorted(values[:valid], low, side='left'))
+        stop = valid if high is None else int(np.searchsorted(values[:valid], high, side='right'))
+        return order[start:stop]
+
+    def _category_mask(self, codes, name: str, value: str) -> np.ndarray:
+        code: Optional[int] = self.vocab[name].get(CATEGORICAL_COLUMNS[name](value))
+        if code is None:
+            return np.zeros(len(codes[name]), dtype=bool)
+        return codes[name] == code
+
+    def _ranges(self, criteria: Dict[str, Any]) -> List[Tuple[str, Optional[float], Optional[float]]]:
+        ranges = []
+        if 'budget_range' in criteria:
+            ranges.append(('harga',) + tuple(criteria['budget_range']))
+        if 'min_luas_tanah' in criteria:
+            ranges.append(('luas_tanah', criteria['min_luas_tanah'], None))
+        if 'min_luas_bangunan' in criteria:
+            ranges.append(('luas_bangunan', criteria['min_luas_bangunan'], None))
+        return ranges
+
+    def mask(self, criteria: Dict[str, Any], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Boolean mask of rows matching the filter_properties_strict rules.
+
+        With ``rows`` only those positions are tested and the mask is
+        aligned with ``rows`` instead of the whole table.
+        """
+        if rows is None:
+            col = self.columns
+            codes = self.codes
+        else:
+            col = _Gather(self.columns, rows)
+            codes = _Gather(self.codes, rows)
+        mask = np.ones(len(self.records) if rows is None else len(rows), dtype=bool)
+        if 'kamar_tidur' in criteria:
+            mask &= col['kamar_tidur'] == criteria['kamar_tidur']
+        if 'kamar_mandi' in criteria:
+            mask &= col['kamar_mandi'] == criteria['kamar_mandi']
+        if 'min_luas_tanah' in criteria:
+            mask &= col['luas_tanah'] >= criteria['min_luas_tanah']
+        if 'min_luas_bangunan' in criteria:
+            mask &= col['luas_bangunan'] >= criteria['min_luas_bangunan']
+        if 'min_carport' in criteria:
+            mask &= col['carport'] >= criteria['min_carport']
+        if 'kelurahan' in criteria:
+            mask &= self._category_mask(codes, 'kelurahan', criteria['kelurahan'])
+        if 'sertifikat' in criteria:
+            mask &= self._category_mask(codes, 'sertifikat', criteria['sertifikat'])
+        if 'budget_range' in criteria:
+            min_budget, max_budget = criteria['budget_range']
+            harga = col['harga']
+            mask &= (harga != 0) & (harga >= min_budget) & (harga <= max_budget)
+        if 'max_distance_school' in criteria:
+            mask &= col['jarak_sekolah'] <= criteria['max_distance_school']
+        if 'max_distance_hospital' in criteria:
+            mask &= col['jarak_rs'] <= criteria['max_distance_hospital']
+        if 'max_distance_market' in criteria:
+            mask &= col['jarak_pasar'] <= criteria['max_distance_market']
+        if 'kondisi' in criteria:
+            mask &= self._category_mask(codes, 'kondisi', criteria['kondisi'])
+        return mask
+
+    def positions(self, criteria: Dict[str, Any]) -> np.ndarray:
+        """Positions of matching rows, in catalog order.
+
+        Range criteria are answered from the sorted indexes: the narrowest
+        range supplies the candidates and only those rows are tested
+        against the remaining criteria.
+        """
+        ranges = self._ranges(criteria)
+        if not ranges:
+            return np.flatnonzero(self.mask(criteria))
+
+        spans = [self.range_positions(name, low, high) for name, low, high in ranges]
+        candidates = min(spans, key=len)
+        return np.sort(candidates[self.mask(criteria, rows=candidates)])
+
+    def _score_columns(self) -> Dict[str, np.ndarray]:
+        if self._condition_scores is None:
+            # One score per distinct condition; the extra slot is what code -1 indexes
+            lookup = np.array([condition_score(v) for v in self.vocab['kondisi']] + [0.0])
+            self._condition_scores = lookup[self.codes['kondisi']]
+        return dict(self.columns, kondisi=self._condition_scores)
+
+    def top_positions(self, criteria: Dict[str, Any], k: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """Positions of the k best matches for the query's preferences, and the match count.
+
+        Scores come straight from the columns of the matching rows; see
+        ranking.rank_properties for the order.
+        """
+        rows = self.positions(criteria)
+        scores = preference_scores(_Gather(self._score_columns(), rows), criteria) if len(rows) else None
+        if scores is None:
+            return rows[:k], len(rows)
+        return rows[top_k(scores, k)], len(rows)
+
+    def query(self, budget_min: Optional[float] = None, budget_max: Optional[float] = None,
+              min_kamar_tidur: Optional[float] = None) -> List[Dict]:
+        """Listing page filters, in catalog order"""
+        rows = None
+        if budget_min or budget_max:
+            rows = self.range_positions('harga', budget_min or None, budget_max or None)
+        if min_kamar_tidur:
+            kamar_tidur = self.columns['kamar_tidur']
+            if rows is None:
+                rows = np.flatnonzero(kamar_tidur >= min_kamar_tidur)
+            else:
+                rows = rows[kamar_tidur[rows] >= min_kamar_tidur]
+        if rows is None:
+            return list(self.records)
+        records = self.records
+        return [records[i] for i in np.sort(rows)]
+
+    def top(self, criteria: Dict[str, Any], k: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """Records of the k best matches, best first, and the match count"""
+        rows, count = self.top_positions(criteria, k)
+        records = self.records
+        return [records[i] for i in rows], count
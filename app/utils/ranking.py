@@ -0,0 +1,144 @@
+import math
+from typing import Any, Dict, List, Mapping, Optional
+import numpy as np
+
+# Relative weight of each score component. Components only count when the
+# query asks for them (condition counts whenever any other one does), and
+# the score is their weighted mean, so every result scores within [0, 1].
+RANKING_WEIGHTS = {
+    'budget': 3.0,     # closeness of the price to the stated budget
+    'price': 3.0,      # cheaper or pricier, for price_preference
+    'size': 3.0,       # larger or smaller, for size_preference
+    'distance': 2.0,   # closeness to the requested school/hospital/market
+    'condition': 1.0,  # newer and better kept houses first
+}
+
+# Same order as Config.KONDISI_MAP; an unknown condition scores 0
+CONDITION_SCORES = {'baru': 1.0, 'baik': 0.75, 'renovasi_ringan': 0.5, 'butuh_renovasi': 0.25}
+
+# Distance criterion -> property field
+DISTANCE_FIELDS = {
+    'max_distance_school': 'jarak_sekolah',
+    'max_distance_hospital': 'jarak_rs',
+    'max_distance_market': 'jarak_pasar',
+}
+
+# Numeric fields a score may read, and the value assumed when one is absent
+_DEFAULTS = {'harga': 0, 'luas_tanah': 0, 'luas_bangunan': 0,
+             'jarak_sekolah': 9999, 'jarak_rs': 9999, 'jarak_pasar': 9999}
+
+
+def condition_score(value: Any) -> float:
+    if not isinstance(value, str):
+        return 0.0
+    return CONDITION_SCORES.get(value.lower(), 0.0)
+
+
+def _as_float(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) else math.nan
+
+
+class RecordColumns:
+    """Score columns read from plain records on first use.
+
+    Numeric fields are float64 (NaN where not a number); ``kondisi`` gives
+    condition scores. PropertyTable provides the same names from its
+    prebuilt columns.
+    """
+
+    def __init__(self, properties: List[Dict]):
+        self.properties = properties
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            n = len(self.properties)
+            if name == 'kondisi':
+                column = np.fromiter((condition_score(p.get('kondisi')) for p in self.properties),
+                                     dtype=np.float64, count=n)
+            else:
+                values = [p.get(name, _DEFAULTS[name]) for p in self.properties]
+                try:
+                    column = np.fromiter(values, dtype=np.float64, count=n)
+                except (TypeError, ValueError):
+                    # Some value is not a number; it scores as missing
+                    column = np.fromiter(map(_as_float, values), dtype=np.float64, count=n)
+            self._columns[name] = column
+        return self._columns[name]
+
+
+def _scaled(values: np.ndarray, descending: bool = False) -> np.ndarray:
+    """Min-max scale over the candidates; missing values score 0"""
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return np.zeros(len(values))
+    low, high = values[valid].min(), values[valid].max()
+    if high == low:
+        return valid.astype(np.float64)
+    scaled = (values - low) / (high - low)
+    if descending:
+        scaled = 1 - scaled
+    return np.nan_to_num(scaled, nan=0.0)
+
+
+def _components(col: Mapping[str, np.ndarray], criteria: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    components = {}
+    if criteria.get('budget'):
+        budget = float(criteria['budget'])
+        low, high = criteria.get('budget_range', (budget * 0.8, budget * 1.2))
+        tolerance = max(high - budget, budget - low) or budget
+        fit = 1 - np.abs(col['harga'] - budget) / tolerance
+        components['budget'] = np.nan_to_num(np.clip(fit, 0, 1), nan=0.0)
+    if criteria.get('price_preference') in ('low', 'high'):
+        components['price'] = _scaled(col['harga'], descending=criteria['price_preference'] == 'low')
+    if criteria.get('size_preference') in ('large', 'small'):
+        components['size'] = _scaled(col['luas_tanah'] + col['luas_bangunan'],
+                                     descending=criteria['size_preference'] == 'small')
+    closeness = [np.nan_to_num(np.clip(1 - col[field] / criteria[key], 0, 1), nan=0.0)
+                 for key, field in DISTANCE_FIELDS.items() if criteria.get(key)]
+    if closeness:
+        components['distance'] = np.mean(closeness, axis=0)
+    if components:
+        components['condition'] = col['kondisi']
+    return components
+
+
+def preference_scores(col: Mapping[str, np.ndarray], criteria: Dict[str, Any]) -> Optional[np.ndarray]:
+    """Weighted score in [0, 1] per row, or None if the query states no preference"""
+    components = _components(col, criteria)
+    if not components:
+        return None
+    total = sum(RANKING_WEIGHTS[name] for name in components)
+    return sum(RANKING_WEIGHTS[name] * values for name, values in components.items()) / total
+
+
+def top_k(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """Positions of the k highest scores, best first, ties in input order.
+
+    A partition finds the k-th best score in linear time and only the
+    chosen k are sorted, so selection costs O(n + k log k) instead of a
+    full sort.
+    """
+    n = len(scores)
+    negated = -scores
+    if k is None or k >= n:
+        return np.lexsort((np.arange(n), negated))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    kth = np.partition(negated, k - 1)[k - 1]
+    better = np.flatnonzero(negated < kth)
+    # Among rows tied with the k-th score keep the earliest ones
+    chosen = np.concatenate([better, np.flatnonzero(negated == kth)[:k - len(better)]])
+    return chosen[np.lexsort((chosen, negated[chosen]))]
+
+
+def rank_properties(properties: List[Dict], criteria: Dict[str, Any], k: Optional[int] = None) -> List[Dict]:
+    """The k best matches for the query's preferences, best first.
+
+    Without budget, price, size or distance preferences the input order
+    stands (catalog order from the stores) and the first k are returned.
+    """
+    scores = preference_scores(RecordColumns(properties), criteria) if properties else None
+    if scores is None:
+        return list(properties[:k] if k is not None else properties)
+    return [properties[i] for i in top_k(scores, k)]
@@ -1,39 +1,51 @@
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
+from app.utils.lru_cache import LRUCache
+from app.utils.property_table import PropertyTable
+from app.utils.ranking import rank_properties
 
-def extract_search_criteria(query: str) -> Dict[str, Any]:
-    """
-    Extract search criteria from query using enhanced NLP patterns
-    Returns: Dict with extracted criteria
+# Conversational filler removed before matching (one pass over the query)
+_FILLER = re.compile(
+    r'\b(ada\s*ga|ada\s*tidak|ada\s*ngga|ada\s*enggak'
+    r'|kalau|kalo|gimana|bagaimana|berapa'
+    r'|rumah|properti|yang|dengan|punya|memiliki)\b'
+)
+
+_HAS_DIGIT = re.compile(r'\d')
+
+
+class _Vocabulary:
+    """Substring tests for a fixed set of terms in one regex pass.
+
+    A lookahead alternation (longest terms first) reports the longest term
+    starting at every position; every shorter term starting there is a
+    prefix of it, so found() returns exactly the terms ``term in text``
+    would find.
     """
-    query_lower = query.lower()
-    criteria = {}
-    
-    # Normalize common conversational patterns
-    query_lower = re.sub(r'\b(ada\s*ga|ada\s*tidak|ada\s*ngga|ada\s*enggak)\b', '', query_lower)
-    query_lower = re.sub(r'\b(kalau|kalo|gimana|bagaimana|berapa)\b', '', query_lower)
-    query_lower = re.sub(r'\b(rumah|properti|yang|dengan|punya|memiliki)\b', '', query_lower)
-    query_lower = query_lower.strip()
-    
-    # Extract budget (enhanced patterns)
-    budget_patterns = [
+
+    def __init__(self, terms: List[str]):
+        terms = sorted(set(terms), key=len, reverse=True)
+        self.regex = re.compile('(?=(' + '|'.join(re.escape(t) for t in terms) + '))')
+        self._prefixes = {t: frozenset(u for u in terms if t.startswith(u)) for t in terms}
+
+    def found(self, text: str) -> frozenset:
+        longest = set(self.regex.findall(text))
+        if not longest:
+            return frozenset()
+        return frozenset().union(*(self._prefixes[t] for t in longest))
+
+
+# (criteria key, keywords every pattern needs, patterns in priority order);
+# each pattern captures one number and the first pattern that matches wins
+_NUMBER_RULES = [
+    ('budget', ['juta', 'budget', 'm', 'harga'], [
         r'(\d+)\s*juta',  # "500 juta"
         r'budget\s*(\d+)',  # "budget 500"
         r'(\d+)\s*m\b',  # "500m"
         r'harga\s*(\d+)',  # "harga 500"
         r'(\d+)\s*milyar',  # "1 milyar"
-    ]
-    
-    for pattern in budget_patterns:
-        matches = re.findall(pattern, query_lower)
-        if matches:
-            budget = int(matches[0]) * 1000000
-            criteria['budget'] = budget
-            criteria['budget_range'] = (budget * 0.8, budget * 1.2)  # ±20%
-            break
-    
-    # Extract bedroom count (enhanced patterns)
-    room_patterns = [
+    ]),
+    ('kamar_tidur', ['kamar', 'kt', 'bedroom'], [
         r'(\d+)\s*kamar\s*tidur',  # "2 kamar tidur"
         r'(\d+)\s*kt\b',           # "2 kt"
         r'kt\s*(\d+)',             # "kt 2"
@@ -42,16 +54,8 @@ def extract_search_criteria(query: str) -> Dict[str, Any]:
         r'bedroom\s*(\d+)',        # "bedroom 2"
         # Handle cases where "kamar" might refer to bedroom in context
         r'(?<!mandi\s)(\d+)\s*kamar(?!\s*mandi)',  # "2 kamar" but not "2 kamar mandi"
-    ]
-    
-    for pattern in room_patterns:
-        matches = re.findall(pattern, query_lower)
-        if matches:
-            criteria['kamar_tidur'] = int(matches[0])
-            break
-    
-    # Extract bathroom count (enhanced patterns)
-    bathroom_patterns = [
+    ]),
+    ('kamar_mandi', ['kamar', 'km', 'bathroom', 'wc'], [
         r'(\d+)\s*kamar\s*mandi',  # "2 kamar mandi"
         r'(\d+)\s*km\b',           # "2 km"
         r'km\s*(\d+)',             # "km 2"
@@ -60,103 +64,123 @@ def extract_search_criteria(query: str) -> Dict[str, Any]:
         r'bathroom\s*(\d+)',       # "bathroom 2"
         r'(\d+)\s*wc\b',           # "2 wc"
         r'wc\s*(\d+)',             # "wc 2"
-    ]
-    
-    for pattern in bathroom_patterns:
-        matches = re.findall(pattern, query_lower)
-        if matches:
-            criteria['kamar_mandi'] = int(matches[0])
-            break
-    
-    # Extract area/size requirements
-    luas_patterns = [
+    ]),
+    ('min_luas_tanah', ['tanah'], [
         r'(\d+)\s*m2?\s*tanah',     # "100 m2 tanah"
         r'tanah\s*(\d+)\s*m2?',     # "tanah 100 m2"
         r'luas\s*tanah\s*(\d+)',    # "luas tanah 100"
         r'(\d+)\s*meter\s*tanah',   # "100 meter tanah"
-    ]
-    
-    for pattern in luas_patterns:
-        matches = re.findall(pattern, query_lower)
-        if matches:
-            criteria['min_luas_tanah'] = int(matches[0])
-            break
-    
-    building_patterns = [
+    ]),
+    ('min_luas_bangunan', ['bangunan'], [
         r'(\d+)\s*m2?\s*bangunan',     # "100 m2 bangunan"
         r'bangunan\s*(\d+)\s*m2?',     # "bangunan 100 m2"
         r'luas\s*bangunan\s*(\d+)',    # "luas bangunan 100"
         r'(\d+)\s*meter\s*bangunan',   # "100 meter bangunan"
-    ]
-    
-    for pattern in building_patterns:
-        matches = re.findall(pattern, query_lower)
-        if matches:
-            criteria['min_luas_bangunan'] = int(matches[0])
-            break
-    
-    # Extract carport requirements
-    carport_patterns = [
+    ]),
+    ('min_carport', ['carport', 'garasi'], [
         r'(\d+)\s*carport',         # "1 carport"
         r'carport\s*(\d+)',         # "carport 1"
         r'(\d+)\s*garasi',          # "1 garasi"
         r'garasi\s*(\d+)',          # "garasi 1"
-    ]
-    
-    for pattern in carport_patterns:
-        matches = re.findall(pattern, query_lower)
-        if matches:
-            criteria['min_carport'] = int(matches[0])
-            break
-    
-    # Extract location/facility requirements (enhanced)
-    if any(term in query_lower for term in ['dekat sekolah', 'near school', 'sekolah', 'deket sekolah']):
-        criteria['max_distance_school'] = 500  # 500m
-    
-    if any(term in query_lower for term in ['dekat rumah sakit', 'dekat rs', 'near hospital', 'hospital', 'deket rs']):
-        criteria['max_distance_hospital'] = 1000  # 1km
-    
-    if any(term in query_lower for term in ['dekat pasar', 'near market', 'pasar', 'deket pasar']):
-        criteria['max_distance_market'] = 800  # 800m
-    
-    # Extract condition preferences (enhanced)
-    if any(term in query_lower for term in ['baru', 'new', 'brand new']):
-        criteria['kondisi'] = 'baru'
-    elif any(term in query_lower for term in ['baik', 'good', 'bagus']):
-        criteria['kondisi'] = 'baik'
-    elif any(term in query_lower for term in ['renovasi', 'butuh renovasi']):
-        criteria['kondisi'] = 'butuh_renovasi'
+    ]),
+]
+
+# (criteria key, [(value, terms), ...]); the first value with a term in the
+# query wins, like an if/elif chain
+_TERM_RULES = [
+    ('max_distance_school', [(500, ['dekat sekolah', 'near school', 'sekolah', 'deket sekolah'])]),  # 500m
+    ('max_distance_hospital', [(1000, ['dekat rumah sakit', 'dekat rs', 'near hospital', 'hospital', 'deket rs'])]),  # 1km
+    ('max_distance_market', [(800, ['dekat pasar', 'near market', 'pasar', 'deket pasar'])]),  # 800m
+    ('kondisi', [
+        ('baru', ['baru', 'new', 'brand new']),
+        ('baik', ['baik', 'good', 'bagus']),
+        ('butuh_renovasi', ['renovasi', 'butuh renovasi']),
+    ]),
+    ('sertifikat', [
+        ('SHM', ['shm', 'sertifikat hak milik']),
+        ('HGB', ['hgb', 'hak guna bangunan']),
+    ]),
+    # Add more kelurahan as needed
+    ('kelurahan', [(name.title(), [name]) for name in ['majasari', 'sukaraja', 'kemiling', 'rajabasa']]),
+    ('price_preference', [
+        ('low', ['murah', 'cheap', 'ekonomis']),
+        ('high', ['mahal', 'expensive', 'mewah', 'luxury']),
+    ]),
+    ('size_preference', [
+        ('large', ['besar', 'luas', 'big', 'large']),
+        ('small', ['kecil', 'small', 'compact']),
+    ]),
+]
+
+_NUMBER_PATTERNS = [(key, frozenset(keywords), [re.compile(p) for p in patterns])
+                    for key, keywords, patterns in _NUMBER_RULES]
+# One pass finds every term and keyword in a query
+_TERMS = _Vocabulary([keyword for _, keywords, _ in _NUMBER_RULES for keyword in keywords]
+                     + [term for _, choices in _TERM_RULES for _, terms in choices for term in terms])
+
+# Parsed criteria by normalized query; the result depends on nothing else
+_criteria_cache = LRUCache(2048)
+
+def extract_search_criteria(query: str) -> Dict[str, Any]:
+    """
+    Extract search criteria from query using enhanced NLP patterns
+    Returns: Dict with extracted criteria (a fresh dict the caller may modify)
+    """
+    # Case and runs of whitespace do not change the criteria, so variants
+    # of one query share a cache entry
+    key = ' '.join(query.lower().split())
+    criteria = _criteria_cache.get(key)
+    if criteria is None:
+        criteria = _parse_criteria(key)
+        _criteria_cache.put(key, criteria)
+    return dict(criteria)
+
+def _parse_criteria(query_lower: str) -> Dict[str, Any]:
+    criteria = {}
     
-    # Extract certificate preferences
-    if any(term in query_lower for term in ['shm', 'sertifikat hak milik']):
-        criteria['sertifikat'] = 'SHM'
-    elif any(term in query_lower for term in ['hgb', 'hak guna bangunan']):
-        criteria['sertifikat'] = 'HGB'
+    # Normalize common conversational patterns
+    query_lower = _FILLER.sub('', query_lower).strip()
     
-    # Extract kelurahan/location preferences
-    kelurahan_list = ['majasari', 'sukaraja', 'kemiling', 'rajabasa']  # Add more as needed
-    for kelurahan in kelurahan_list:
-        if kelurahan in query_lower:
-            criteria['kelurahan'] = kelurahan.title()
-            break
+    found = _TERMS.found(query_lower)
+    if not found:
+        return criteria
     
-    # Extract price preferences
-    if any(term in query_lower for term in ['murah', 'cheap', 'ekonomis']):
-        criteria['price_preference'] = 'low'
-    elif any(term in query_lower for term in ['mahal', 'expensive', 'mewah', 'luxury']):
-        criteria['price_preference'] = 'high'
+    # Numeric criteria: budget, rooms, areas, carports
+    if _HAS_DIGIT.search(query_lower):
+        for key, keywords, patterns in _NUMBER_PATTERNS:
+            if found.isdisjoint(keywords):
+                continue
+            for pattern in patterns:
+                match = pattern.search(query_lower)
+                if match:
+                    value = int(match.group(1))
+                    if key == 'budget':
+                        value *= 1000000
+                        criteria['budget'] = value
+                        criteria['budget_range'] = (value * 0.8, value * 1.2)  # ±20%
+                    else:
+                        criteria[key] = value
+                    break
     
-    # Extract size preferences
-    if any(term in query_lower for term in ['besar', 'luas', 'big', 'large']):
-        criteria['size_preference'] = 'large'
-    elif any(term in query_lower for term in ['kecil', 'small', 'compact']):
-        criteria['size_preference'] = 'small'
+    # Facilities, condition, certificate, kelurahan and preferences
+    for key, choices in _TERM_RULES:
+        for value, terms in choices:
+            if not found.isdisjoint(terms):
+                criteria[key] = value
+                break
     
     return criteria
 
+def search_criteria_cache_info() -> Dict[str, Any]:
+    """Counters of the parsed-query cache"""
+    return _criteria_cache.info()
+
 def filter_properties_strict(properties: List[Dict], criteria: Dict[str, Any]) -> List[Dict]:
     """
     Apply strict deterministic filtering based on extracted criteria
+    Matches keep catalog order; ranking.rank_properties orders them by the
+    query's preferences. PropertyTable.mask applies the same rules to
+    columns.
     """
     if not criteria:
         return properties
@@ -242,21 +266,21 @@ def filter_properties_strict(properties: List[Dict], criteria: Dict[str, Any]) -
         if matches:
             filtered.append(prop)
     
-    # Apply preference-based sorting
-    if 'price_preference' in criteria:
-        if criteria['price_preference'] == 'low':
-            filtered.sort(key=lambda p: p.get('harga', float('inf')))
-        elif criteria['price_preference'] == 'high':
-            filtered.sort(key=lambda p: p.get('harga', 0), reverse=True)
-    
-    if 'size_preference' in criteria:
-        if criteria['size_preference'] == 'large':
-            filtered.sort(key=lambda p: p.get('luas_tanah', 0) + p.get('luas_bangunan', 0), reverse=True)
-        elif criteria['size_preference'] == 'small':
-            filtered.sort(key=lambda p: p.get('luas_tanah', 0) + p.get('luas_bangunan', 0))
-    
     return filtered
 
+def top_matches(properties: Union[List[Dict], PropertyTable], criteria: Dict[str, Any],
+                k: Optional[int] = None) -> Tuple[List[Dict], int]:
+    """
+    The k best matches for criteria, best first, and how many matched
+    A PropertyTable filters with vectorized column masks and its sorted
+    indexes and scores the matching rows from its columns; a plain list is
+    filtered and then ranked with ranking.rank_properties.
+    """
+    if isinstance(properties, PropertyTable):
+        return properties.top(criteria, k)
+    filtered = filter_properties_strict(properties, criteria)
+    return rank_properties(filtered, criteria, k), len(filtered)
+
 def is_property_related_query(query: str) -> bool:
     """Check if query contains property-related keywords (enhanced)"""
     property_keywords = [
@@ -0,0 +1,63 @@
+"""Compare the JSON and SQL property backends.
+
+Run from the repository root:  python benchmarks/bench_backends.py [sizes...]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.storage.json_store import JsonPropertyStore
+from app.storage.sql_store import SqlPropertyStore
+from app.utils.search_utils import extract_search_criteria
+from synthetic import make_properties
+
+QUERIES = ['3 kamar tidur 500 juta', 'rumah shm dekat sekolah', '2 kt 2 km majasari murah', 'tanah 200 m2 besar']
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def bench(store, ids, label):
+    rows = []
+    ms, _ = timed(store.load)
+    rows.append(('load (cold)', ms))
+    ms, _ = timed(store.load, repeat=20)
+    rows.append(('load (cached)', ms))
+    ms, _ = timed(lambda: [store.get(i) for i in ids])
+    rows.append((f'get x{len(ids)}', ms))
+    ms, _ = timed(lambda: store.query(300000000, 800000000, 3), repeat=5)
+    rows.append(('listing query', ms))
+    for q in QUERIES:
+        criteria = extract_search_criteria(q)
+        ms, (_, count) = timed(lambda: store.top_matches(criteria, 10), repeat=5)
+        rows.append((f'search "{q}" -> {count}', ms))
+    for name, ms in rows:
+        print(f'  {label:5} {name:45} {ms:10.2f} ms')
+
+
+def main(sizes):
+    for n in sizes:
+        properties = make_properties(n)
+        ids = [p['id'] for p in properties[::max(1, n // 1000)]]
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, 'properties.json')
+            with open(json_path, 'w') as f:
+                json.dump(properties, f, indent=2)
+            sql_store = SqlPropertyStore(f'sqlite:///{tmp}/properties.db')
+            ms, _ = timed(lambda: sql_store.save(properties))
+            print(f'{n} rows (sql bulk insert {ms:.0f} ms)')
+            bench(JsonPropertyStore(json_path), ids, 'json')
+            bench(sql_store, ids, 'sql')
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10000, 100000])
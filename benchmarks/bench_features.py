@@ -0,0 +1,66 @@
+"""Compare the per-record feature loop with the shared FeaturePipeline.
+
+Run from the repository root:  python benchmarks/bench_features.py [sizes...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import Config
+from app.services.features import FeaturePipeline
+from synthetic import make_properties
+
+
+def encode_categorical(value, mapping):
+    return mapping.get(value, 0)
+
+
+def legacy_features(properties):
+    """The row-at-a-time encoding MLPredictionService used before the pipeline"""
+    data = []
+    for prop in properties:
+        data.append([
+            float(prop.get('luas_tanah', 100)),
+            float(prop.get('luas_bangunan', 80)),
+            int(prop.get('kamar_tidur', 2)),
+            int(prop.get('kamar_mandi', 1)),
+            int(prop.get('carport', 0)),
+            int(prop.get('tahun_dibangun', 2020)),
+            int(prop.get('lantai', 1)),
+            float(prop.get('jarak_sekolah', 1000)),
+            float(prop.get('jarak_rs', 2000)),
+            float(prop.get('jarak_pasar', 1500)),
+            encode_categorical(prop.get('jenis_jalan'), Config.JENIS_JALAN_MAP),
+            encode_categorical(prop.get('kondisi'), Config.KONDISI_MAP),
+            encode_categorical(prop.get('sertifikat'), Config.SERTIFIKAT_MAP),
+        ])
+    return np.array(data, dtype=np.float64)
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main(sizes):
+    pipeline = FeaturePipeline()
+    for n in sizes:
+        properties = make_properties(n)
+        legacy_ms, expected = timed(lambda: legacy_features(properties))
+        pipeline_ms, actual = timed(lambda: pipeline.transform(properties))
+        assert np.array_equal(expected, actual), 'pipeline output differs from the legacy loop'
+        print(f'{n:>8} rows  loop {legacy_ms:9.1f} ms  pipeline {pipeline_ms:8.1f} ms  '
+              f'({legacy_ms / pipeline_ms:.1f}x)')
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,56 @@
+"""Compare sklearn's forest predict with the flattened CompiledForest engine.
+
+Run from the repository root:  python benchmarks/bench_forest_engine.py [training sizes...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.features import FeaturePipeline
+from app.services.forest_engine import CompiledForest
+from synthetic import make_properties
+
+
+def per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(sizes):
+    pipeline = FeaturePipeline()
+    records = make_properties(2000, seed=7)
+    queries = pipeline.transform(records)
+    for n in sizes:
+        properties = make_properties(n)
+        X = pipeline.transform(properties)
+        y = np.array([p['harga'] for p in properties])
+        scaler = StandardScaler().fit(X)
+        model = RandomForestRegressor(n_estimators=100, random_state=42).fit(scaler.transform(X), y)
+        engine = CompiledForest.from_model(model, scaler)
+
+        expected = model.predict(scaler.transform(queries))
+        actual = engine.predict(queries)
+        print(f'{n} training rows: {len(engine.value)} nodes, max depth {engine.depth}, '
+              f'max relative difference {np.max(np.abs(actual - expected) / expected):.2e}')
+        for rows in (1, 16, 128, 1024):
+            batch = queries[:rows]
+            repeat = 20 if rows > 16 else 50
+            sklearn_ms = per_call(lambda: model.predict(scaler.transform(batch)), repeat)
+            engine_ms = per_call(lambda: engine.predict(batch), repeat)
+            print(f'  {rows:5} rows  sklearn {sklearn_ms:8.3f} ms  engine {engine_ms:8.3f} ms')
+        # One prediction as the service makes it: encode the dict, then predict
+        single_ms = per_call(lambda: engine.predict(pipeline.transform_one(records[0])[np.newaxis, :]), 200)
+        print(f'  1 record, features + engine {single_ms * 1000:8.1f} us')
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [300, 3000])
@@ -0,0 +1,64 @@
+"""Compare top-K ranking with the sequential sorts it replaced.
+
+For each query the filtered matches are ordered four ways: the old
+price-then-size sorts over the whole list, a full weighted ranking of the
+records, top-K over the records (the SQL backend), and top-K straight from
+PropertyTable columns (the JSON backends).
+
+Run from the repository root:  python benchmarks/bench_ranking.py [size] [k]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.property_table import PropertyTable
+from app.utils.ranking import rank_properties
+from app.utils.search_utils import extract_search_criteria, filter_properties_strict
+from synthetic import make_properties
+
+QUERIES = ['rumah murah', 'rumah besar murah', '500 juta dekat sekolah', 'rumah mewah luas dekat pasar', '3 kamar tidur']
+
+
+def sequential_sorts(filtered, criteria):
+    """The ordering search used before: the size sort overrides the price sort"""
+    filtered = list(filtered)
+    if criteria.get('price_preference') == 'low':
+        filtered.sort(key=lambda p: p.get('harga', float('inf')))
+    elif criteria.get('price_preference') == 'high':
+        filtered.sort(key=lambda p: p.get('harga', 0), reverse=True)
+    if criteria.get('size_preference') == 'large':
+        filtered.sort(key=lambda p: p.get('luas_tanah', 0) + p.get('luas_bangunan', 0), reverse=True)
+    elif criteria.get('size_preference') == 'small':
+        filtered.sort(key=lambda p: p.get('luas_tanah', 0) + p.get('luas_bangunan', 0))
+    return filtered
+
+
+def timed(fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main(size, k):
+    properties = make_properties(size)
+    table = PropertyTable(properties)
+    print(f"{size} properties, k={k}")
+    for query in QUERIES:
+        criteria = extract_search_criteria(query)
+        matches = filter_properties_strict(properties, criteria)
+        sort_ms, _ = timed(lambda: sequential_sorts(matches, criteria)[:k])
+        full_ms, ranked = timed(lambda: rank_properties(matches, criteria))
+        top_ms, top = timed(lambda: rank_properties(matches, criteria, k))
+        table_ms, (table_top, count) = timed(lambda: table.top(criteria, k))
+        assert top == ranked[:k] == table_top and count == len(matches)
+        print(f"  {query!r:32} {len(matches):7} matches  sorts {sort_ms:7.2f}  full rank {full_ms:7.2f}  "
+              f"top-{k} {top_ms:7.2f}  table top-{k} {table_ms:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 10)
@@ -0,0 +1,48 @@
+"""Time extract_search_criteria against the sequential-regex version it replaced.
+
+Over a corpus of realistic and randomly combined queries this times the
+legacy parser, the compiled parser with an empty cache, and cache hits.
+tests/test_search_criteria.py holds the legacy parser and the corpus, and
+checks that both parsers agree. Run from the repository root:
+
+    python benchmarks/bench_search_criteria.py [queries] [seed]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from app.utils import search_utils  # noqa: E402
+from app.utils.lru_cache import LRUCache  # noqa: E402
+from test_search_criteria import legacy_extract_search_criteria, make_queries  # noqa: E402
+
+
+def timed(parse, queries) -> float:
+    started = time.perf_counter()
+    for query in queries:
+        parse(query)
+    return time.perf_counter() - started
+
+
+def main(count: int, seed: int) -> None:
+    queries = make_queries(count, seed)
+
+    legacy = timed(legacy_extract_search_criteria, queries)
+    search_utils._criteria_cache = LRUCache(0)
+    compiled = timed(search_utils.extract_search_criteria, queries)
+    search_utils._criteria_cache = LRUCache(len(queries))
+    timed(search_utils.extract_search_criteria, queries)
+    cached = timed(search_utils.extract_search_criteria, queries)
+
+    per_query = 1e6 / len(queries)
+    print(f"legacy            {legacy * per_query:7.1f} us/query")
+    print(f"compiled          {compiled * per_query:7.1f} us/query  ({legacy / compiled:.1f}x)")
+    print(f"compiled, cached  {cached * per_query:7.1f} us/query  ({legacy / cached:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 1)
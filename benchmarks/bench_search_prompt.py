@@ -0,0 +1,78 @@
+"""Compare the compact search prompt with the pretty-printed JSON one it replaced.
+
+For growing candidate lists this prints the estimated prompt tokens and
+build time of both encodings, and how many candidates the token budget
+lets into the compact prompt. Sizes use the same estimate as the app.
+Run from the repository root:
+
+    python benchmarks/bench_search_prompt.py [max tokens]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import Config
+from app.services.search_prompt import build_search_prompt, estimate_tokens
+from app.utils.ranking import rank_properties
+from app.utils.search_utils import extract_search_criteria, filter_properties_strict
+from synthetic import make_properties
+
+QUERY = 'rumah besar murah dekat sekolah'
+
+
+def json_prompt(query, candidates):
+    """The prompt search sent before: every candidate as indented JSON"""
+    property_context = [{
+        'index': i,
+        'alamat': prop.get('alamat', 'N/A'),
+        'harga': prop.get('harga', 0),
+        'kamar_tidur': prop.get('kamar_tidur', 0),
+        'kamar_mandi': prop.get('kamar_mandi', 0),
+        'luas_tanah': prop.get('luas_tanah', 0),
+        'luas_bangunan': prop.get('luas_bangunan', 0),
+    } for i, prop in enumerate(candidates)]
+    return f"""Anda adalah asisten properti yang membantu memilih dari properti yang SUDAH DIFILTER.
+
+Properti yang tersedia (sudah sesuai kriteria dasar):
+{json.dumps(property_context, indent=2)}
+
+Query pengguna: "{query}"
+
+TUGAS: Pilih maksimal 3 properti TERBAIK dari list di atas yang paling sesuai dengan query.
+
+ATURAN:
+- HANYA pilih dari properti yang sudah disediakan (index 0 hingga {len(candidates)-1})
+- Jika query menyebutkan "murah" → pilih yang harga terendah
+- Jika query menyebutkan "besar" → pilih yang luas terbesar
+- Jika tidak ada preferensi khusus → pilih 2-3 yang representatif
+
+Responlah HANYA dengan format JSON:
+{{"property_indices": [0, 1, 2], "explanation": "Penjelasan singkat mengapa dipilih"}}"""
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main(max_tokens):
+    properties = make_properties(20000)
+    criteria = extract_search_criteria(QUERY)
+    matches = rank_properties(filter_properties_strict(properties, criteria), criteria)
+    print(f"query {QUERY!r}: {len(matches)} matches, budget {max_tokens} tokens")
+    for n in (1, 10, 100, 1000, len(matches)):
+        candidates = matches[:n]
+        json_ms, old = timed(lambda: json_prompt(QUERY, candidates))
+        new_ms, (new, used, tokens) = timed(lambda: build_search_prompt(QUERY, candidates, max_tokens))
+        assert tokens == estimate_tokens(new) and tokens <= max_tokens or used == 1
+        print(f"  {n:6} candidates  json {estimate_tokens(old):8} tokens {json_ms:7.2f} ms   "
+              f"compact {tokens:5} tokens {new_ms:6.2f} ms, {used} candidates kept")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else Config.AI_PROMPT_MAX_TOKENS)
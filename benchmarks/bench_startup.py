@@ -0,0 +1,59 @@
+"""Measure worker startup: importing the app, warming it up, and the first request.
+
+Every figure comes from a fresh interpreter, since import caching is the
+point. Run from the repository root (it uses the real data/ and models/):
+
+    python benchmarks/bench_startup.py [repeats]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['pandas', 'sklearn', 'scipy', 'google.genai', 'sqlalchemy']
+
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter() - started
+loaded = [m for m in %(heavy)r if m in sys.modules]
+warm = None
+if %(warm)r:
+    from app.startup import warm_up
+    started = time.perf_counter()
+    warm_up()
+    warm = time.perf_counter() - started
+client = main.app.test_client()
+started = time.perf_counter()
+client.post('/api/predict', json={'luas_tanah': 120, 'luas_bangunan': 90, 'kamar_tidur': 3})
+first = time.perf_counter() - started
+print(json.dumps({'import': imported, 'warm_up': warm, 'first_request': first, 'loaded': loaded}))
+'''
+
+
+def probe(warm):
+    code = PROBE % {'heavy': HEAVY_MODULES, 'warm': warm}
+    out = subprocess.run([sys.executable, '-W', 'ignore', '-c', code], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(repeats):
+    for warm in (False, True):
+        runs = [probe(warm) for _ in range(repeats)]
+        label = 'warmed up ' if warm else 'cold      '
+        line = f"{label} import {statistics.median(r['import'] for r in runs) * 1000:7.0f} ms"
+        if warm:
+            line += f"  warm_up {statistics.median(r['warm_up'] for r in runs) * 1000:7.0f} ms"
+        line += f"  first /api/predict {statistics.median(r['first_request'] for r in runs) * 1000:7.0f} ms"
+        print(line)
+        if not warm:
+            print(f"           heavy modules loaded by 'import main': {', '.join(runs[0]['loaded']) or 'none'}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,50 @@
+"""Synthetic property catalogs for the benchmarks in this directory"""
+import random
+import uuid
+from datetime import datetime, timedelta
+
+KELURAHAN = ['Majasari', 'Sukaraja', 'Kemiling', 'Rajabasa', 'Gunung Ibul', 'Karang Raja']
+KONDISI = ['baru', 'baik', 'renovasi_ringan', 'butuh_renovasi']
+SERTIFIKAT = ['SHM', 'HGB', 'girik']
+JALAN = ['gang_kecil', 'jalan_sedang', 'jalan_besar']
+STATUS = ['available', 'available', 'available', 'pending', 'sold']
+
+
+def make_properties(n, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    properties = []
+    for i in range(n):
+        luas_tanah = rng.randint(60, 400)
+        luas_bangunan = rng.randint(36, min(luas_tanah * 2, 500))
+        kamar_tidur = rng.randint(1, 6)
+        properties.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'judul_properti': f'Rumah {i}',
+            'kelurahan': rng.choice(KELURAHAN),
+            'kecamatan': 'Prabumulih Timur',
+            'alamat': f'Jalan Contoh no {i}',
+            'luas_tanah': luas_tanah,
+            'luas_bangunan': luas_bangunan,
+            'kamar_tidur': kamar_tidur,
+            'kamar_mandi': rng.randint(1, max(1, kamar_tidur)),
+            'carport': rng.randint(0, 2),
+            'tahun_dibangun': rng.randint(1990, 2025),
+            'lantai': rng.randint(1, 3),
+            'kota': 'Prabumulih',
+            'harga': float(rng.randint(150, 3000) * 1000000),
+            'latitude': None,
+            'longitude': None,
+            'jarak_sekolah': float(rng.randint(100, 5000)),
+            'jarak_rs': float(rng.randint(200, 8000)),
+            'jarak_pasar': float(rng.randint(100, 6000)),
+            'jenis_jalan': rng.choice(JALAN),
+            'kondisi': rng.choice(KONDISI),
+            'sertifikat': rng.choice(SERTIFIKAT),
+            'nama_penjual': 'Penjual',
+            'nomor_penjual': '08123456789',
+            'image': None,
+            'created_at': (start + timedelta(minutes=i)).isoformat(),
+            'status': rng.choice(STATUS),
+        })
+    return properties
@@ -0,0 +1,19 @@
+"""Gunicorn settings, picked up automatically from the working directory.
+
+The app is imported once in the master (preload_app) and warmed up before
+any worker forks, so workers start with the catalog, search indexes and
+price model already in memory, shared copy-on-write.
+"""
+preload_app = True
+
+
+def when_ready(server):
+    from app.startup import warm_up
+    timings = warm_up()
+    server.log.info('Warm-up finished in %.2fs (%s)', sum(timings.values()),
+                    ', '.join(f'{name} {seconds:.2f}s' for name, seconds in timings.items()))
+
+
+def post_fork(server, worker):
+    from app.startup import after_fork
+    after_fork()
@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import Config
+from app.models import PropertyRepository
+from app.services import ai_service
+from app.services.ai_service import AIPropertySearch
+from app.services.recommendation_cache import RecommendationCache
+from app.services.search_prompt import PromptStats
+from app.utils.deadline_executor import DeadlineExecutor
+
+DEADLINE = 0.2
+
+CANDIDATES = [
+    {'id': f'p{i}', 'alamat': f'Jl. Contoh {i}', 'harga': 300000000 + i * 50000000,
+     'kamar_tidur': 3, 'kamar_mandi': 2, 'luas_tanah': 120, 'luas_bangunan': 90}
+    for i in range(4)
+]
+
+
+class FakeGeminiClient:
+    """Stands in for google.genai.Client; answers after ``latency`` seconds"""
+
+    def __init__(self, latency=0.0, answer=None):
+        self.latency = latency
+        self.answer = answer if answer is not None else {'property_indices': [1, 0], 'explanation': 'fake'}
+        self.requests = 0
+        self.answered = threading.Event()
+        self.models = self
+
+    def generate_content(self, model, contents):
+        self.requests += 1
+        time.sleep(self.latency)
+        self.answered.set()
+        return SimpleNamespace(text=json.dumps(self.answer))
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """A fake client behind fresh executor, cache and stats, over fixed candidates"""
+    client = FakeGeminiClient()
+    monkeypatch.setattr(Config, 'AI_SEARCH_TIMEOUT', DEADLINE)
+    monkeypatch.setattr(ai_service, 'gemini_calls', DeadlineExecutor(2, name='gemini-test'))
+    monkeypatch.setattr(ai_service, 'recommendation_cache', RecommendationCache(16, 60))
+    monkeypatch.setattr(ai_service, 'prompt_stats', PromptStats())
+    monkeypatch.setattr(PropertyRepository, 'top_matches',
+                        staticmethod(lambda criteria, k=None: (CANDIDATES[:k], len(CANDIDATES))))
+    monkeypatch.setattr(PropertyRepository, 'data_version', staticmethod(lambda: 'test'))
+    ai_service.set_gemini_client(client)
+    yield client
+    ai_service.set_gemini_client(None)
+
+
+def _search(query):
+    started = time.perf_counter()
+    result = AIPropertySearch.search_properties(query)
+    return time.perf_counter() - started, result
+
+
+def _ids(result):
+    return [p['id'] for p in result['properties']]
+
+
+def test_fast_answer_is_used(fake):
+    fake.latency = 0.01
+    elapsed, result = _search('rumah murah')
+
+    assert result['ai_powered'] and _ids(result) == ['p1', 'p0']
+    assert elapsed < DEADLINE
+    info = ai_service.gemini_calls.info()
+    assert (info['calls'], info['timeouts'], info['late']) == (1, 0, 0)
+    assert 10 <= info['p50_ms'] < DEADLINE * 1000
+
+
+def test_slow_answer_falls_back_then_fills_the_cache(fake):
+    fake.latency = DEADLINE * 3
+    elapsed, result = _search('rumah murah')
+
+    # The deterministic ranking is served once the deadline passes
+    assert elapsed < DEADLINE * 2
+    assert not result['ai_powered']
+    assert _ids(result) == [p['id'] for p in CANDIDATES[:Config.SEARCH_RESULTS]]
+    info = ai_service.gemini_calls.info()
+    assert (info['calls'], info['timeouts'], info['late']) == (1, 1, 0)
+    assert info['p50_ms'] is None
+
+    # The call keeps running and its answer lands in the cache
+    assert fake.answered.wait(DEADLINE * 5)
+    deadline = time.monotonic() + DEADLINE * 5
+    while ai_service.gemini_calls.info()['late'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    info = ai_service.gemini_calls.info()
+    assert (info['timeouts'], info['late'], info['timeout_rate']) == (1, 1, 1.0)
+    assert info['p50_ms'] >= DEADLINE * 3 * 1000
+
+    # The same query, in another case and spacing, is answered from the cache
+    elapsed, result = _search('  Rumah   MURAH ')
+    assert result['ai_powered'] and _ids(result) == ['p1', 'p0']
+    assert elapsed < DEADLINE
+    assert fake.requests == 1
+    assert ai_service.gemini_calls.info()['calls'] == 1
+
+
+@pytest.mark.parametrize('answer', [[0, 1], 'p0', 3])
+def test_non_object_answer_is_invalid(fake, answer):
+    fake.answer = answer
+    _, result = _search('rumah murah')
+
+    assert not result['ai_powered']
+    assert ai_service.prompt_stats.info()['invalid'] == 1
+    assert ai_service.gemini_calls.info()['errors'] == 0
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from app.services.features import FeaturePipeline
+
+FULL = {'luas_tanah': 120, 'luas_bangunan': 90.5, 'kamar_tidur': 3, 'kamar_mandi': 2, 'carport': 1,
+        'tahun_dibangun': 2015, 'lantai': 2, 'jarak_sekolah': 500, 'jarak_rs': 1200.5, 'jarak_pasar': 700,
+        'jenis_jalan': 'jalan_besar', 'kondisi': 'baik', 'sertifikat': 'shm'}
+
+
+@pytest.mark.parametrize('row', [
+    FULL,
+    {},
+    {'luas_tanah': '120.5', 'kamar_tidur': '3.7', 'lantai': ' 2 ', 'kondisi': None},
+    {'kamar_tidur': -2.5, 'kamar_mandi': True, 'carport': np.int64(2), 'jarak_rs': np.float64(10.5)},
+    {'lantai': float('nan'), 'tahun_dibangun': float('inf'), 'luas_bangunan': None},
+    {'luas_tanah': 'abc', 'kamar_mandi': [1], 'sertifikat': ['shm'], 'jenis_jalan': 3},
+    {'kondisi': float('nan'), 'sertifikat': 'SHM', 'jenis_jalan': ''},
+], ids=range(7))
+def test_transform_one_matches_transform(row):
+    pipeline = FeaturePipeline()
+    one = pipeline.transform_one(row)
+    assert one.dtype == np.float64 and one.shape == (len(pipeline.columns),)
+    assert np.array_equal(one, pipeline.transform([row])[0], equal_nan=True)
@@ -0,0 +1,34 @@
+import json
+from types import SimpleNamespace
+
+from app.storage import journal_store
+from app.storage.journal_store import JournalPropertyStore
+
+
+def _store(tmp_path):
+    path = tmp_path / 'properties.json'
+    if not path.exists():
+        path.write_text('[]')
+    return JournalPropertyStore(str(path), str(tmp_path / 'properties.journal'), compact_interval=3600)
+
+
+def test_compact_keeps_entries_appended_by_another_store(tmp_path, monkeypatch):
+    a = _store(tmp_path)
+    b = _store(tmp_path)
+    a.add({'id': 'a1'})
+
+    def dump_then_append(items, f, **kwargs):
+        # Another worker writes while A serializes its snapshot
+        json.dump(items, f, **kwargs)
+        b.add({'id': 'b1'})
+
+    monkeypatch.setattr(journal_store, 'json', SimpleNamespace(dump=dump_then_append, dumps=json.dumps,
+                                                               loads=json.loads))
+    assert a.compact()
+    monkeypatch.undo()
+
+    assert [p['id'] for p in a.load()] == ['a1', 'b1']
+    assert [p['id'] for p in _store(tmp_path).load()] == ['a1', 'b1']
+    # The carried-over entry is replayed once, not twice
+    a.add({'id': 'a2'})
+    assert [p['id'] for p in b.load()] == ['a1', 'b1', 'a2']
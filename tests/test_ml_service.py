@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from app.config import Config
+from app.services.ml_service import MLPredictionService
+from app.services.model_registry import ModelRegistry
+
+
+def _save_version(registry, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(20, len(Config.FEATURE_COLUMNS)))
+    y = rng.normal(size=20)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(n_estimators=2, random_state=seed).fit(scaler.transform(X), y)
+    return registry.save(model, scaler, None, {'dataset_fingerprint': f'{seed:08d}',
+                                               'metrics': {'seed': seed}})
+
+
+def test_training_status_follows_the_active_version(tmp_path):
+    registry_dir = str(tmp_path / 'registry')
+    service = MLPredictionService(str(tmp_path / 'price_model.pkl'), registry_dir)
+    other = ModelRegistry(registry_dir)
+    first = _save_version(other, 1)
+    second = _save_version(other, 2)
+
+    # Activated elsewhere before this process loaded any model
+    other.activate(second)
+    status = service.training_status()
+    assert (status['model_version'], status['metrics']) == (second, {'seed': 2})
+
+    # Rolled back from another worker, with no prediction in between
+    assert other.rollback() == first
+    status = service.training_status()
+    assert (status['model_version'], status['metrics']) == (first, {'seed': 1})
+
+
+def test_training_status_does_not_train_without_a_model(tmp_path):
+    service = MLPredictionService(str(tmp_path / 'price_model.pkl'), str(tmp_path / 'registry'))
+    status = service.training_status()
+    assert not status['model_loaded'] and status['model_version'] is None
+    assert not (tmp_path / 'registry').exists()
+
+
+def _finished_pid():
+    child = subprocess.Popen([sys.executable, '-c', 'pass'])
+    child.wait()
+    return child.pid
+
+
+def test_selection_runs_once_across_workers(tmp_path, monkeypatch):
+    registry_dir = str(tmp_path / 'registry')
+    service = MLPredictionService(str(tmp_path / 'price_model.pkl'), registry_dir)
+    registry = ModelRegistry(registry_dir)
+
+    # Another live worker is running one
+    with registry.status_lock:
+        registry.save_status('selection', {'state': 'running', 'pid': os.getppid()})
+    assert not service.request_model_selection()
+    assert service.selection_status()['state'] == 'running'
+
+    # A run whose worker died no longer blocks a new one
+    with registry.status_lock:
+        registry.save_status('selection', {'state': 'running', 'pid': _finished_pid()})
+    assert service.selection_status()['state'] == 'failed'
+    release = threading.Event()
+    monkeypatch.setattr(service, 'run_model_selection', lambda: release.wait(5) and None)
+    assert service.request_model_selection()
+    assert not service.request_model_selection()
+
+    # Any worker sees the run and its outcome
+    reader = MLPredictionService(str(tmp_path / 'price_model.pkl'), registry_dir)
+    assert reader.selection_status()['state'] == 'running'
+    release.set()
+    service._selection_thread.join(5)
+    assert reader.selection_status()['state'] == 'skipped'
+
+
+def test_training_state_is_shared_across_workers(tmp_path):
+    registry_dir = str(tmp_path / 'registry')
+    trainer = MLPredictionService(str(tmp_path / 'price_model.pkl'), registry_dir)
+    reader = MLPredictionService(str(tmp_path / 'price_model.pkl'), registry_dir)
+
+    trainer._set_training_state('training')
+    assert reader.training_status()['state'] == 'training'
+    trainer._set_training_state('idle', last_error='boom', last_duration=1.5)
+    status = reader.training_status()
+    assert (status['state'], status['last_error'], status['last_duration']) == ('idle', 'boom', 1.5)
+
+    # A worker that died mid-fit is not reported as training
+    registry = ModelRegistry(registry_dir)
+    with registry.status_lock:
+        registry.save_status('training', {'workers': {str(_finished_pid()): 'training'}})
+    assert reader.training_status()['state'] == 'idle'
+
+
+def test_prediction_miss_encodes_the_row_once(tmp_path, monkeypatch):
+    registry_dir = str(tmp_path / 'registry')
+    service = MLPredictionService(str(tmp_path / 'price_model.pkl'), registry_dir)
+    ModelRegistry(registry_dir).activate(_save_version(ModelRegistry(registry_dir), 1))
+    calls = []
+    pipeline = service.pipeline
+    monkeypatch.setattr(service, 'pipeline', SimpleNamespace(
+        transform=pipeline.transform, transform_one=lambda data: calls.append(data) or pipeline.transform_one(data)))
+
+    listing = {'luas_tanah': 120, 'luas_bangunan': 90, 'kamar_tidur': 3, 'kondisi': 'baik'}
+    price = service.predict_price(listing)
+    assert len(calls) == 1
+    assert price is not None and price == service.predict_prices([listing])[0]
+    assert service.predict_price(dict(listing)) == price
+    assert service.cache_info()['hits'] == 1
@@ -0,0 +1,26 @@
+import io
+
+import pytest
+
+from app.services.property_io import iter_rows, parse_import_row
+
+HEADER = 'judul_properti,kelurahan,kecamatan,alamat,kota,luas_tanah,luas_bangunan,kamar_tidur,kamar_mandi,carport,lantai,harga\n'
+
+
+def _rows(body):
+    return [row for _, row in iter_rows(io.StringIO(HEADER + body), 'csv')]
+
+
+def test_float_formatted_counts_are_accepted():
+    row, = _rows('Rumah A,Majasari,Cibeber,Jl. A,Cilegon,120.0,90.0,3.0,2.0,1.0,1.0,450000000.0\n')
+    record = parse_import_row(row)
+    assert (record['luas_tanah'], record['luas_bangunan'], record['kamar_tidur'],
+            record['kamar_mandi'], record['carport'], record['lantai']) == (120, 90, 3, 2, 1, 1)
+    assert isinstance(record['kamar_tidur'], int)
+    assert record['harga'] == 450000000.0
+
+
+def test_fractional_counts_are_rejected():
+    row, = _rows('Rumah B,Majasari,Cibeber,Jl. B,Cilegon,120,90,2.5,2,1,1,450000000\n')
+    with pytest.raises(ValueError, match='not a whole number'):
+        parse_import_row(row)
@@ -0,0 +1,27 @@
+import pytest
+
+from app.storage.journal_store import JournalPropertyStore
+from app.storage.json_store import JsonPropertyStore
+from app.storage.sql_store import SqlPropertyStore
+
+
+@pytest.fixture(params=['json', 'journal', 'sql'])
+def store(request, tmp_path):
+    if request.param == 'json':
+        (tmp_path / 'properties.json').write_text('[]')
+        return JsonPropertyStore(str(tmp_path / 'properties.json'))
+    if request.param == 'journal':
+        (tmp_path / 'properties.json').write_text('[]')
+        return JournalPropertyStore(str(tmp_path / 'properties.json'), str(tmp_path / 'properties.journal'),
+                                    compact_interval=3600)
+    return SqlPropertyStore(f"sqlite:///{tmp_path / 'properties.db'}")
+
+
+def test_others_skips_the_record_and_stops_at_limit(store):
+    store.add_many([{'id': f'p{i}', 'harga': i} for i in range(6)])
+
+    assert [p['id'] for p in store.others('p1', 3)] == ['p0', 'p2', 'p3']
+    assert [p['id'] for p in store.others('p9', 2)] == ['p0', 'p1']
+    assert [p['id'] for p in store.others('p4', 10)] == ['p0', 'p1', 'p2', 'p3', 'p5']
+    store.delete('p0')
+    assert [p['id'] for p in store.others('p2', 2)] == ['p1', 'p3']
@@ -0,0 +1,263 @@
+import random
+import re
+from typing import Any, Dict
+
+import pytest
+
+from app.utils import search_utils
+from app.utils.lru_cache import LRUCache
+from app.utils.search_utils import extract_search_criteria
+
+
+# The parser as it was before patterns were compiled; kept verbatim as the reference
+def legacy_extract_search_criteria(query: str) -> Dict[str, Any]:
+    """
+    Extract search criteria from query using enhanced NLP patterns
+    Returns: Dict with extracted criteria
+    """
+    query_lower = query.lower()
+    criteria = {}
+    
+    # Normalize common conversational patterns
+    query_lower = re.sub(r'\b(ada\s*ga|ada\s*tidak|ada\s*ngga|ada\s*enggak)\b', '', query_lower)
+    query_lower = re.sub(r'\b(kalau|kalo|gimana|bagaimana|berapa)\b', '', query_lower)
+    query_lower = re.sub(r'\b(rumah|properti|yang|dengan|punya|memiliki)\b', '', query_lower)
+    query_lower = query_lower.strip()
+    
+    # Extract budget (enhanced patterns)
+    budget_patterns = [
+        r'(\d+)\s*juta',  # "500 juta"
+        r'budget\s*(\d+)',  # "budget 500"
+        r'(\d+)\s*m\b',  # "500m"
+        r'harga\s*(\d+)',  # "harga 500"
+        r'(\d+)\s*milyar',  # "1 milyar"
+    ]
+    
+    for pattern in budget_patterns:
+        matches = re.findall(pattern, query_lower)
+        if matches:
+            budget = int(matches[0]) * 1000000
+            criteria['budget'] = budget
+            criteria['budget_range'] = (budget * 0.8, budget * 1.2)  # ±20%
+            break
+    
+    # Extract bedroom count (enhanced patterns)
+    room_patterns = [
+        r'(\d+)\s*kamar\s*tidur',  # "2 kamar tidur"
+        r'(\d+)\s*kt\b',           # "2 kt"
+        r'kt\s*(\d+)',             # "kt 2"
+        r'kamar\s*tidur\s*(\d+)',  # "kamar tidur 2"
+        r'(\d+)\s*bedroom',        # "2 bedroom"
+        r'bedroom\s*(\d+)',        # "bedroom 2"
+        # Handle cases where "kamar" might refer to bedroom in context
+        r'(?<!mandi\s)(\d+)\s*kamar(?!\s*mandi)',  # "2 kamar" but not "2 kamar mandi"
+    ]
+    
+    for pattern in room_patterns:
+        matches = re.findall(pattern, query_lower)
+        if matches:
+            criteria['kamar_tidur'] = int(matches[0])
+            break
+    
+    # Extract bathroom count (enhanced patterns)
+    bathroom_patterns = [
+        r'(\d+)\s*kamar\s*mandi',  # "2 kamar mandi"
+        r'(\d+)\s*km\b',           # "2 km"
+        r'km\s*(\d+)',             # "km 2"
+        r'kamar\s*mandi\s*(\d+)',  # "kamar mandi 2"
+        r'(\d+)\s*bathroom',       # "2 bathroom"
+        r'bathroom\s*(\d+)',       # "bathroom 2"
+        r'(\d+)\s*wc\b',           # "2 wc"
+        r'wc\s*(\d+)',             # "wc 2"
+    ]
+    
+    for pattern in bathroom_patterns:
+        matches = re.findall(pattern, query_lower)
+        if matches:
+            criteria['kamar_mandi'] = int(matches[0])
+            break
+    
+    # Extract area/size requirements
+    luas_patterns = [
+        r'(\d+)\s*m2?\s*tanah',     # "100 m2 tanah"
+        r'tanah\s*(\d+)\s*m2?',     # "tanah 100 m2"
+        r'luas\s*tanah\s*(\d+)',    # "luas tanah 100"
+        r'(\d+)\s*meter\s*tanah',   # "100 meter tanah"
+    ]
+    
+    for pattern in luas_patterns:
+        matches = re.findall(pattern, query_lower)
+        if matches:
+            criteria['min_luas_tanah'] = int(matches[0])
+            break
+    
+    building_patterns = [
+        r'(\d+)\s*m2?\s*bangunan',     # "100 m2 bangunan"
+        r'bangunan\s*(\d+)\s*m2?',     # "bangunan 100 m2"
+        r'luas\s*bangunan\s*(\d+)',    # "luas bangunan 100"
+        r'(\d+)\s*meter\s*bangunan',   # "100 meter bangunan"
+    ]
+    
+    for pattern in building_patterns:
+        matches = re.findall(pattern, query_lower)
+        if matches:
+            criteria['min_luas_bangunan'] = int(matches[0])
+            break
+    
+    # Extract carport requirements
+    carport_patterns = [
+        r'(\d+)\s*carport',         # "1 carport"
+        r'carport\s*(\d+)',         # "carport 1"
+        r'(\d+)\s*garasi',          # "1 garasi"
+        r'garasi\s*(\d+)',          # "garasi 1"
+    ]
+    
+    for pattern in carport_patterns:
+        matches = re.findall(pattern, query_lower)
+        if matches:
+            criteria['min_carport'] = int(matches[0])
+            break
+    
+    # Extract location/facility requirements (enhanced)
+    if any(term in query_lower for term in ['dekat sekolah', 'near school', 'sekolah', 'deket sekolah']):
+        criteria['max_distance_school'] = 500  # 500m
+    
+    if any(term in query_lower for term in ['dekat rumah sakit', 'dekat rs', 'near hospital', 'hospital', 'deket rs']):
+        criteria['max_distance_hospital'] = 1000  # 1km
+    
+    if any(term in query_lower for term in ['dekat pasar', 'near market', 'pasar', 'deket pasar']):
+        criteria['max_distance_market'] = 800  # 800m
+    
+    # Extract condition preferences (enhanced)
+    if any(term in query_lower for term in ['baru', 'new', 'brand new']):
+        criteria['kondisi'] = 'baru'
+    elif any(term in query_lower for term in ['baik', 'good', 'bagus']):
+        criteria['kondisi'] = 'baik'
+    elif any(term in query_lower for term in ['renovasi', 'butuh renovasi']):
+        criteria['kondisi'] = 'butuh_renovasi'
+    
+    # Extract certificate preferences
+    if any(term in query_lower for term in ['shm', 'sertifikat hak milik']):
+        criteria['sertifikat'] = 'SHM'
+    elif any(term in query_lower for term in ['hgb', 'hak guna bangunan']):
+        criteria['sertifikat'] = 'HGB'
+    
+    # Extract kelurahan/location preferences
+    kelurahan_list = ['majasari', 'sukaraja', 'kemiling', 'rajabasa']  # Add more as needed
+    for kelurahan in kelurahan_list:
+        if kelurahan in query_lower:
+            criteria['kelurahan'] = kelurahan.title()
+            break
+    
+    # Extract price preferences
+    if any(term in query_lower for term in ['murah', 'cheap', 'ekonomis']):
+        criteria['price_preference'] = 'low'
+    elif any(term in query_lower for term in ['mahal', 'expensive', 'mewah', 'luxury']):
+        criteria['price_preference'] = 'high'
+    
+    # Extract size preferences
+    if any(term in query_lower for term in ['besar', 'luas', 'big', 'large']):
+        criteria['size_preference'] = 'large'
+    elif any(term in query_lower for term in ['kecil', 'small', 'compact']):
+        criteria['size_preference'] = 'small'
+    
+    return criteria
+
+
+QUERIES = [
+    'Rumah 3 kamar tidur dekat sekolah di Majasari harga 500 juta',
+    'ada ga rumah murah yang dekat pasar?',
+    'cari properti 2 kt 1 km shm',
+    'rumah mewah luas tanah 200 bangunan 150 m2',
+    'kalo budget 750 ada yang baru dengan 2 carport',
+    'rumah kecil di kemiling kondisi baik hgb',
+    'berapa harga rumah 4 bedroom 3 bathroom dekat rs',
+    'rumah 1 milyar di rajabasa',
+    'properti butuh renovasi ekonomis 100 meter tanah',
+    'gimana kalau rumah 2 kamar dekat rumah sakit',
+    'rumah di sukaraja 300m 3 kamar mandi garasi 1',
+    'Brand New house near school, large, 2 wc',
+    '',
+    'harga',
+    '12345',
+]
+
+FRAGMENTS = [
+    'rumah', 'properti', 'yang', 'dengan', 'ada ga', 'ada tidak', 'ada ngga', 'ada enggak', 'kalau',
+    'kalo', 'gimana', 'bagaimana', 'berapa', 'punya', 'memiliki', 'di', 'cari', 'mau', 'dan', ',', '?',
+    'juta', 'budget', 'harga', 'm', 'milyar', 'kamar', 'tidur', 'mandi', 'kt', 'km', 'bedroom',
+    'bathroom', 'wc', 'tanah', 'bangunan', 'luas', 'meter', 'm2', 'carport', 'garasi',
+    'dekat', 'deket', 'sekolah', 'near', 'school', 'rs', 'rumah sakit', 'hospital', 'pasar', 'market',
+    'baru', 'new', 'brand new', 'baik', 'good', 'bagus', 'renovasi', 'butuh renovasi',
+    'shm', 'sertifikat hak milik', 'hgb', 'hak guna bangunan',
+    'majasari', 'sukaraja', 'kemiling', 'rajabasa', 'Majasari', 'KEMILING',
+    'murah', 'cheap', 'ekonomis', 'mahal', 'expensive', 'mewah', 'luxury',
+    'besar', 'big', 'large', 'kecil', 'small', 'compact', 'newest', 'pasaraya', 'kmx',
+]
+
+
+def make_queries(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    queries = list(QUERIES)
+    while len(queries) < count:
+        parts = []
+        for _ in range(rng.randint(1, 10)):
+            if rng.random() < 0.35:
+                parts.append(str(rng.choice([1, 2, 3, 4, 5, 10, 90, 120, 250, 500, 1500])))
+            else:
+                parts.append(rng.choice(FRAGMENTS))
+        # Vary the spacing too: several patterns allow or require none
+        queries.append(''.join(part + rng.choice([' ', ' ', ' ', '', '  ']) for part in parts).strip())
+    return queries
+
+
+EDGE_QUERIES = [
+    # Kelurahan names inside longer words still count, as substring tests
+    'rumah di majasariraya', 'sukarajaya 2 kamar', 'perumahan kemilingan murah', 'xrajabasax',
+    # Budgets in juta and milyar together: the first budget pattern wins
+    'rumah 1 milyar atau 800 juta', '2 milyar 500 juta', 'budget 750 juta 1 milyar',
+    '900m atau 1 milyar', 'harga 300 juta 2 milyar', 'milyar 3 juta',
+    # Facilities repeated or listed together
+    'dekat sekolah dekat sekolah', 'pasar pasar dekat pasar deket pasar',
+    'dekat sekolah, dekat rs, dekat pasar dan dekat sekolah lagi', 'hospital hospital near school',
+]
+
+
+def _legacy(query):
+    """The legacy parser on the query with whitespace runs collapsed, as
+    the current parser sees it; single-spaced queries pass unchanged"""
+    return legacy_extract_search_criteria(' '.join(query.split()))
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(search_utils, '_criteria_cache', LRUCache(64))
+
+
+@pytest.mark.parametrize('query', QUERIES + EDGE_QUERIES)
+def test_matches_legacy_parser(query):
+    assert extract_search_criteria(query) == _legacy(query)
+
+
+def test_matches_legacy_parser_on_generated_queries():
+    mismatches = [q for q in make_queries(5000, 1) if extract_search_criteria(q) != _legacy(q)]
+    assert mismatches == []
+
+
+def test_single_spaced_queries_match_legacy_parser_unchanged():
+    queries = [q for q in make_queries(5000, 2) + EDGE_QUERIES if q == ' '.join(q.split())]
+    assert [extract_search_criteria(q) for q in queries] == [legacy_extract_search_criteria(q) for q in queries]
+
+
+@pytest.mark.parametrize('variant', ['Rumah Murah Dekat Sekolah 500 Juta', '  rumah   murah\tdekat sekolah 500 juta ',
+                                     'RUMAH MURAH DEKAT  SEKOLAH\n500 JUTA'])
+def test_cache_serves_case_and_whitespace_variants(variant):
+    expected = extract_search_criteria('rumah murah dekat sekolah 500 juta')
+    assert extract_search_criteria(variant) == expected
+    info = search_utils.search_criteria_cache_info()
+    assert (info['hits'], info['misses']) == (1, 1)
+
+
+def test_cached_result_is_a_copy():
+    extract_search_criteria('rumah murah')['price_preference'] = 'high'
+    assert extract_search_criteria('rumah murah')['price_preference'] == 'low'